@@ -18,9 +18,32 @@ if str(ROOT) not in sys.path:
 # -------------------------------------------------
 # Imports internos
 # -------------------------------------------------
-from services.app_context import get_context, init_context
+from services.app_context import get_context, init_context, get_github_service
 from services.data_loader import load_all, listar_categorias
-from services.finance_core import normalizar_tx, saldo_atual
+from services.snapshot import (
+    consumo_orcamentos_snapshot,
+    frame_transacoes,
+    projecao_caixa,
+    resumos_snapshot,
+    saldos_contas,
+    saldos_diarios,
+    transacoes_tipadas,
+)
+from services.projecao import mensal, projetar, resumo_projecao
+from services.orcamentos import LIMIAR_ALERTA, alertas
+from services.resumos import Resumos
+from services.finance_queries import (
+    concatenar,
+    cubo_kpis,
+    despesas_por_categoria,
+    entre,
+    kpis_de_somas,
+    preparar_transacoes_df,
+    relatorio_memoria,
+    somas_cubo,
+)
+from services.competencia import competencia_from_date
+from services.recorrencia import expandir
 from services.utils import fmt_brl, fmt_date_br
 from services.layout import responsive_columns, is_mobile
 from services.ui import section
@@ -75,12 +98,11 @@ with st.sidebar:
     )
 
     if st.button("Conectar", use_container_width=True):
-        from github_service import GitHubService
         try:
-            ctx["gh"] = GitHubService(
-                token=st.session_state["github_token"],
-                repo_full_name=st.session_state["repo_full_name"],
-                branch=st.session_state["branch_name"],
+            ctx["gh"] = get_github_service(
+                st.session_state["github_token"],
+                st.session_state["repo_full_name"],
+                st.session_state["branch_name"],
             )
             ctx["connected"] = True
             st.cache_data.clear()
@@ -99,67 +121,14 @@ with st.sidebar:
     st.selectbox("Perfil", ["admin", "comum"], key="perfil")
 
 
-# -------------------------------------------------
-# Helpers locais (normalização robusta)
-# -------------------------------------------------
-def _parse_date_any(series: pd.Series) -> pd.Series:
-    """
-    Tenta converter para date com duas passadas:
-    1) ISO/geral
-    2) Formato brasileiro (dayfirst=True)
-    Retorna uma Series de objetos date (ou NaT quando não possível).
-    """
-    s1 = pd.to_datetime(series, errors="coerce")
-    mask = s1.isna()
-    if mask.any():
-        s2 = pd.to_datetime(series[mask], errors="coerce", dayfirst=True)
-        s1 = s1.copy()
-        s1[mask] = s2
-    return s1.dt.date
-
-def _normalizar_df(transacoes: list[dict]) -> pd.DataFrame:
-    df = pd.DataFrame(transacoes)
-    if df.empty:
-        return df
-
-    # Valor
-    df["valor"] = pd.to_numeric(df.get("valor"), errors="coerce").fillna(0.0)
-
-    # Soft-delete
-    df["excluido"] = df.get("excluido", False)
-    df["excluido"] = df["excluido"].fillna(False)
-    df = df[df["excluido"] == False]
-
-    # Tipo normalizado
-    df["tipo"] = (
-        df.get("tipo")
-          .astype(str)
-          .str.strip()
-          .str.lower()
-    )
-    df = df[df["tipo"].isin(["despesa", "receita"])]
-
-    # Datas com tolerância (ISO + dd/mm/aaaa)
-    df["data_prevista"] = _parse_date_any(df.get("data_prevista"))
-    df["data_efetiva"]  = _parse_date_any(df.get("data_efetiva"))
-
-    # Data de referência única
-    df["data_ref"] = df["data_efetiva"].combine_first(df["data_prevista"])
-
-    # Remover linhas sem referência de data
-    df = df.dropna(subset=["data_ref"])
-
-    return df.reset_index(drop=True)
-
 # -------------------------------------------------
 # Carregamento de dados
 # -------------------------------------------------
 data = load_all((ctx["repo_full_name"], ctx["branch_name"]))
 
-transacoes = [
-    t for t in (normalizar_tx(x) for x in data["data/transacoes.json"]["content"])
-    if t is not None
-]
+trans_map = data["data/transacoes.json"]
+# Registros normalizados uma vez por versão (sha) do arquivo
+transacoes = transacoes_tipadas(trans_map["sha"], trans_map["content"])
 contas = data["data/contas.json"]["content"]
 
 # -------------------------------------------------
@@ -172,32 +141,44 @@ fim_mes = date(hoje.year, hoje.month, calendar.monthrange(hoje.year, hoje.month)
 # -------------------------------------------------
 # DataFrame normalizado
 # -------------------------------------------------
-df = _normalizar_df(transacoes)
-
-rec_real = des_real = rec_prev = des_prev = 0.0
-
-if not df.empty:
-    # Período corrente (até hoje) para realizados
-    periodo_real = df[df["data_ref"].between(inicio, hoje)]
-    realizadas = periodo_real[periodo_real["data_efetiva"].notna()]
-
-    # Período do mês inteiro para previstas (planejamento)
-    periodo_prev = df[df["data_ref"].between(inicio, fim_mes)]
-    previstas = periodo_prev[periodo_prev["data_efetiva"].isna()]
+# Ocorrências virtuais de recorrentes entram como previstas do mês
+# (frame do snapshot compartilhado + frame pequeno das virtuais do mês)
+virtuais = expandir(transacoes, inicio, fim_mes)
+df_virtuais = preparar_transacoes_df(virtuais)
+df = concatenar(frame_transacoes(trans_map["sha"], transacoes), df_virtuais)
 
-    rec_real = realizadas.query("tipo == 'receita'")["valor"].sum()
-    des_real = realizadas.query("tipo == 'despesa'")["valor"].sum()
+# -------------------------------------------------
+# KPIs do mês — lidos do resumo por competência (data/resumos.json,
+# regravado a cada escrita; reconstruído só se estiver defasado)
+# -------------------------------------------------
+comp_atual = competencia_from_date(hoje)
+res_map = data["data/resumos.json"]
+resumos = resumos_snapshot(trans_map["sha"], res_map["sha"], res_map["content"], transacoes)
+somas = resumos.somas(comp_atual)
+if not df_virtuais.empty:
+    # Virtuais são poucas e dependem do mês: cubo pequeno somado por rerun,
+    # em centavos; a conversão para reais acontece uma vez, no fim
+    for k, v in somas_cubo(cubo_kpis(df_virtuais), comp_atual).items():
+        somas[k] = somas.get(k, 0) + v
+kpis = kpis_de_somas(somas)
 
-    rec_prev = previstas.query("tipo == 'receita'")["valor"].sum()
-    des_prev = previstas.query("tipo == 'despesa'")["valor"].sum()
+# Realizadas: baixas são datadas no dia do pagamento, logo a competência
+# corrente equivale ao intervalo início → hoje
+rec_real, des_real = kpis["rec_real"], kpis["des_real"]
+rec_prev, des_prev = kpis["rec_prev"], kpis["des_prev"]
 
 saldo_real = rec_real - des_real
 saldo_prev = rec_prev - des_prev
 
 # -------------------------------------------------
-# Saldo total das contas (caixa real)
+# Saldo total das contas (caixa real) — uma passada por versão dos dados
 # -------------------------------------------------
-saldo_total = sum(saldo_atual(c, transacoes) for c in contas)
+saldo_total = saldos_contas(
+    data["data/transacoes.json"]["sha"],
+    data["data/contas.json"]["sha"],
+    transacoes,
+    contas,
+).total()
 
 # -------------------------------------------------
 # Helper: renderização segura de KPIs em N colunas
@@ -248,44 +229,83 @@ render_kpis(kpis_previsto, desktop_cols=3, mobile_cols=1)
 st.divider()
 
 # -------------------------------------------------
-# Gráfico de saldo acumulado
+# Gráfico de saldo das contas no mês (extrato diário)
 # -------------------------------------------------
-section("📈 Tendência de saldo no mês")
+section("📈 Tendência de saldo no mês", "Saldo das contas ao fim de cada dia")
 
 incluir_previstas = st.checkbox("Incluir previstas (projeção)", value=False)
 
-if not df.empty:
-    base = df.copy()
+if contas:
+    # Saldo efetivado de cada dia: busca binária no índice diário do
+    # snapshot (mantido por delta nas escritas). Com previstas, soma o
+    # acumulado das em aberto do mês (inclui recorrências virtuais)
+    fim_serie = fim_mes if incluir_previstas else hoje
+    serie = saldos_diarios(
+        trans_map["sha"],
+        data["data/contas.json"]["sha"],
+        transacoes,
+        contas,
+    ).serie(None, inicio, fim_serie)
+    if incluir_previstas:
+        abertas = projetar(
+            df,
+            {c.get("id"): 0 for c in contas if isinstance(c, dict)},
+            inicio,
+            fim_serie,
+            incluir_vencidas=False,
+        )
+        serie = serie.add(abertas.sum(axis=1), fill_value=0)
+    st.line_chart(
+        pd.DataFrame({"Saldo": serie}),
+        height=240 if is_mobile() else 420,
+    )
+else:
+    st.info("Cadastre contas para acompanhar o saldo.")
 
-    # Se não incluir previstas, mantenha apenas efetivadas e até hoje
-    if not incluir_previstas:
-        base = base[base["data_efetiva"].notna()]
-        base = base[base["data_ref"].between(inicio, hoje)]
-    else:
-        # Com previstas, considere o mês inteiro
-        base = base[base["data_ref"].between(inicio, fim_mes)]
+st.divider()
 
-    if base.empty:
-        st.info("Sem dados suficientes para gerar o gráfico.")
-    else:
-        base["signed"] = base.apply(
-            lambda r: r["valor"] if r["tipo"] == "receita" else -r["valor"],
-            axis=1,
-        )
+# -------------------------------------------------
+# Projeção de caixa (próximos N meses)
+# -------------------------------------------------
+section("🔮 Projeção de caixa", "Saldo atual + agendadas, parcelas e recorrências em aberto")
 
-        serie = (
-            base.groupby("data_ref")["signed"]
-            .sum()
-            .sort_index()
-            .cumsum()
-        )
+cols_proj = responsive_columns(desktop=3, mobile=1)
+meses_proj = cols_proj[0].slider("Meses à frente", min_value=1, max_value=24, value=6)
+granularidade = cols_proj[-1].radio("Granularidade", ["Diária", "Mensal"], horizontal=True)
+conta_map = {c.get("id"): c.get("nome") or c.get("id") for c in contas if isinstance(c, dict)}
+conta_proj = cols_proj[min(1, len(cols_proj) - 1)].selectbox(
+    "Conta",
+    ["Todas"] + list(conta_map),
+    format_func=lambda cid: conta_map.get(cid, cid),
+)
 
-        st.line_chart(
-            pd.DataFrame({"Saldo acumulado": serie}),
-            height=240 if is_mobile() else 420,
-        )
+diario = projecao_caixa(
+    trans_map["sha"],
+    data["data/contas.json"]["sha"],
+    hoje,
+    meses_proj,
+    transacoes,
+    contas,
+)
+
+if diario.empty or diario.columns.empty:
+    st.info("Cadastre contas para projetar o caixa.")
 else:
-    st.info("Sem dados suficientes para gerar o gráfico.")
+    serie_proj = diario.sum(axis=1) if conta_proj == "Todas" else diario[conta_proj]
+    info = resumo_projecao(serie_proj)
+
+    render_kpis([
+        ("Saldo projetado", fmt_brl(info["final"]), f"em {fmt_date_br(serie_proj.index[-1].date())}"),
+        ("Menor saldo", fmt_brl(info["minimo"]), fmt_date_br(info["data_minimo"])),
+    ], desktop_cols=2, mobile_cols=1)
+
+    if info["primeiro_negativo"]:
+        st.warning(f"⚠️ Saldo fica negativo a partir de {fmt_date_br(info['primeiro_negativo'])}.")
+
+    grafico = serie_proj.to_frame("Saldo projetado")
+    if granularidade == "Mensal":
+        grafico = mensal(grafico)
+    st.line_chart(grafico, height=240 if is_mobile() else 360)
 
 st.divider()
 
@@ -298,27 +318,11 @@ if not df.empty:
     cats, _ = listar_categorias(ctx["gh"])
     cat_map = {c["id"]: c["nome"] for c in cats}
 
-    despesas_mes = df[
-        (df["tipo"] == "despesa") &
-        (df["data_ref"].between(inicio, fim_mes))
-    ].copy()
+    graf = despesas_por_categoria(df, inicio, fim_mes, cat_map)
 
-    if despesas_mes.empty:
+    if graf.empty:
         st.info("Sem despesas no período.")
     else:
-        despesas_mes["Categoria"] = (
-            despesas_mes["categoria_id"]
-            .map(cat_map)
-            .fillna("Sem categoria")
-        )
-
-        graf = (
-            despesas_mes
-            .groupby("Categoria")["valor"]
-            .sum()
-            .sort_values(ascending=False)
-        )
-
         st.bar_chart(
             graf,
             height=240 if is_mobile() else 420,
@@ -326,17 +330,103 @@ if not df.empty:
 else:
     st.info("Sem dados para agrupamento.")
 
+# -------------------------------------------------
+# Alertas de orçamento (mês)
+# -------------------------------------------------
+orc_map = data["data/orcamentos.json"]
+consumo_mes = consumo_orcamentos_snapshot(
+    trans_map["sha"],
+    orc_map["sha"],
+    (comp_atual,),
+    transacoes,
+    [o for o in orc_map["content"] if isinstance(o, dict)],
+)
+
+if not consumo_mes.empty:
+    st.divider()
+    section("🚦 Orçamentos do mês", f"Atenção a partir de {LIMIAR_ALERTA:.0%} do limite")
+
+    nomes_cat = {c["id"]: c["nome"] for c in listar_categorias(ctx["gh"])[0]}
+    avisos = alertas(consumo_mes)
+    if avisos.empty:
+        st.success("Todos os orçamentos dentro do limite.")
+    for a in avisos.to_dict(orient="records"):
+        msg = (
+            f"{nomes_cat.get(a['categoria_id'], 'Sem categoria')}: "
+            f"{a['pct']:.0%} do limite gasto ({fmt_brl(a['gasto'])} de {fmt_brl(a['limite'])}); "
+            f"com previstas, {a['pct_comprometido']:.0%}"
+        )
+        if a["nivel"] == "estourado":
+            st.error(f"🔴 {msg}")
+        else:
+            st.warning(f"🟡 {msg}")
+
+st.divider()
+
+# -------------------------------------------------
+# Histórico mensal (data/resumos.json)
+# -------------------------------------------------
+section("🗓️ Histórico mensal", "Últimas 12 competências — realizado")
+
+historico = resumos.historico(ultimas=12, ate=comp_atual)
+
+if historico.empty:
+    st.info("Sem histórico.")
+else:
+    # Índice 'aaaa-mm' mantém a ordem cronológica no eixo
+    graf_hist = historico[["rec_real", "des_real"]].rename(
+        columns={"rec_real": "Receitas", "des_real": "Despesas"},
+    )
+    st.bar_chart(
+        graf_hist,
+        stack=False,
+        height=240 if is_mobile() else 360,
+    )
+
 # -------------------------------------------------
 # 🔍 Diagnóstico (opcional)
 # -------------------------------------------------
 with st.expander("🔍 Diagnóstico (use para conferir filtros)", expanded=False):
     st.write("Registros totais em DF normalizado:", len(df))
     if not df.empty:
-        st.write("Receitas realizadas (até hoje):", int(((df["tipo"] == "receita") & (df["data_efetiva"].notna()) & (df["data_ref"].between(inicio, hoje))).sum()))
-        st.write("Despesas realizadas (até hoje):", int(((df["tipo"] == "despesa") & (df["data_efetiva"].notna()) & (df["data_ref"].between(inicio, hoje))).sum()))
-        st.write("Receitas previstas (mês inteiro):", int(((df["tipo"] == "receita") & (df["data_efetiva"].isna()) & (df["data_ref"].between(inicio, fim_mes))).sum()))
-        st.write("Despesas previstas (mês inteiro):", int(((df["tipo"] == "despesa") & (df["data_efetiva"].isna()) & (df["data_ref"].between(inicio, fim_mes))).sum()))
+        st.write("Receitas realizadas (até hoje):", int(((df["tipo"] == "receita") & (df["data_efetiva"].notna()) & entre(df["data_ref"], inicio, hoje)).sum()))
+        st.write("Despesas realizadas (até hoje):", int(((df["tipo"] == "despesa") & (df["data_efetiva"].notna()) & entre(df["data_ref"], inicio, hoje)).sum()))
+        st.write("Receitas previstas (mês inteiro):", int(((df["tipo"] == "receita") & (df["data_efetiva"].isna()) & entre(df["data_ref"], inicio, fim_mes)).sum()))
+        st.write("Despesas previstas (mês inteiro):", int(((df["tipo"] == "despesa") & (df["data_efetiva"].isna()) & entre(df["data_ref"], inicio, fim_mes)).sum()))
 
         st.write("Amostra de despesas (mês inteiro):")
-        amostra = df[(df["tipo"] == "despesa") & (df["data_ref"].between(inicio, fim_mes))].head(10)
+        amostra = df[(df["tipo"] == "despesa") & entre(df["data_ref"], inicio, fim_mes)].head(10)
         st.dataframe(amostra[["descricao", "valor", "data_prevista", "data_efetiva", "data_ref", "categoria_id"]])
+
+        st.write("Memória do DataFrame (por sessão):")
+        st.dataframe(relatorio_memoria(df), use_container_width=True)
+
+    # Resumo persistido: em dia quando reflete a versão atual de transacoes.json
+    st.write("Resumos (data/resumos.json):")
+    arquivo = Resumos(res_map["content"])
+    if arquivo.sha_transacoes == trans_map["sha"]:
+        st.caption("✅ Em dia com transacoes.json")
+    else:
+        st.caption("⚠️ Desatualizado — KPIs e histórico vêm do resumo mantido em memória")
+
+    c1, c2 = st.columns(2)
+    if c1.button("Verificar resumos", use_container_width=True):
+        divergencias = arquivo.verificar(transacoes)
+        if divergencias:
+            st.warning(f"{len(divergencias)} divergência(s) encontrada(s).")
+            st.dataframe(pd.DataFrame(divergencias), use_container_width=True)
+        else:
+            st.success("Sem divergências.")
+    if c2.button(
+        "Reconstruir resumos",
+        disabled=ctx.get("perfil") != "admin",
+        use_container_width=True,
+    ):
+        ctx["gh"].put_json(
+            "data/resumos.json",
+            Resumos.construir(transacoes).to_dict(trans_map["sha"]),
+            "Reconstrói resumos.json",
+            sha=res_map["sha"],
+        )
+        st.cache_data.clear()
+        st.rerun()
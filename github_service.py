@@ -1,13 +1,18 @@
 
 # github_service.py
 import base64
+import hashlib
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+import tarfile
+import threading
 import time
 import random
 from time import sleep
-from typing import Tuple, Any, Optional, Callable
+from typing import Tuple, Any, Optional, Callable, Dict
 
 logger = logging.getLogger("financeiro")
 if not logger.handlers:
@@ -33,11 +38,31 @@ class GitHubService:
         max_retries: int = 2,
         user_agent: str = "financeiro-familiar-streamlit",
         api_base: str = "https://api.github.com",
+        pool_size: int = 10,
     ):
         if not token or not repo_full_name:
             raise ValueError("Token e repo_full_name são obrigatórios.")
 
         self.session = requests.Session()
+        # Pool keep-alive compartilhável entre sessões. O adapter só repete
+        # 5xx transitórios em leituras; timeouts e falhas de conexão ficam
+        # com o laço de _request() (uma única camada de retry por erro).
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=max_retries,
+                connect=0,
+                read=0,
+                status=max_retries,
+                backoff_factor=0.3,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github+json",
@@ -50,14 +75,30 @@ class GitHubService:
         self.timeout = request_timeout
         self.max_retries = max_retries
 
+        # Single-flight: leituras concorrentes de (path, ref, geração) compartilham 1 GET.
+        # A geração do path sobe a cada put_json, então uma leitura iniciada
+        # depois de uma escrita nunca reaproveita um GET anterior a ela.
+        self._inflight: Dict[Tuple[str, str, int], "_InFlight"] = {}
+        self._geracoes: Dict[str, int] = {}
+        self._inflight_lock = threading.Lock()
+
     def _contents_url(self, path: str) -> str:
         return f"{self.api_base}/repos/{self.repo}/contents/{path}"
 
     # Rate limit com backoff + jitter + secondary limit
     def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Requisição com espera em rate limit. Se todas as tentativas caírem
+        em rate limit, devolve a última resposta (403/429) para o chamador
+        tratar o status — nunca None.
+        """
+        resp = None
         for attempt in range(self.max_retries + 1):
             try:
                 resp = self.session.request(method, url, timeout=self.timeout, **kwargs)
+                # elapsed = envio da requisição até o fim dos cabeçalhos (TTFB);
+                # registrado por requisição (a instância é compartilhada entre threads)
+                logger.debug(f"{method} {url} -> {resp.status_code} TTFB {_ttfb_ms(resp):.0f}ms")
 
                 remaining = int(resp.headers.get("X-RateLimit-Remaining", "1"))
                 if remaining <= 0:
@@ -94,29 +135,68 @@ class GitHubService:
                     continue
                 raise e
 
+        return resp
+
+    def _fetch_contents(self, path: str) -> Tuple[int, Optional[str], Optional[str], str]:
+        """
+        GET na Contents API com deduplicação de chamadas concorrentes.
+
+        Se já existe uma leitura em andamento para (path, branch) iniciada
+        depois da última escrita local no path, aguarda o resultado dela em
+        vez de emitir outra requisição idêntica.
+        Retorna (status, texto_decodificado, sha, corpo_erro).
+        """
+        with self._inflight_lock:
+            key = (path, self.branch, self._geracoes.get(path, 0))
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._inflight[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            r = self._request("GET", self._contents_url(path), params={"ref": self.branch})
+            if r.status_code == 200:
+                data = r.json()
+                decoded = base64.b64decode(data.get("content", "")).decode("utf-8")
+                call.result = (200, decoded, data.get("sha"), "")
+            else:
+                call.result = (r.status_code, None, None, r.text)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
     def get_json(self, path: str, default: Optional[Any] = None) -> Tuple[Any, Optional[str]]:
         """
         Lê um arquivo JSON do branch. Se 404 e houver default, inicializa e relê.
         Retorna (objeto, sha).
+
+        Leituras concorrentes do mesmo arquivo compartilham uma única requisição;
+        cada chamador recebe sua própria cópia do objeto (pode alterá-la).
         """
-        url = self._contents_url(path)
-        params = {"ref": self.branch}
-        r = self._request("GET", url, params=params)
+        status, decoded, sha, body = self._fetch_contents(path)
 
-        if r.status_code == 200:
-            data = r.json()
-            content_b64 = data.get("content", "")
-            decoded = base64.b64decode(content_b64)
-            obj = json.loads(decoded.decode("utf-8"))
-            return obj, data.get("sha")
+        if status == 200:
+            return json.loads(decoded), sha
 
-        if r.status_code == 404:
+        if status == 404:
             if default is not None:
                 self.put_json(path, default, f"Inicializa {path}")
                 return self.get_json(path, default=None)
             return default, None
 
-        raise RuntimeError(f"Erro ao ler {path}: {r.status_code}\n{r.text}")
+        raise RuntimeError(f"Erro ao ler {path}: {status}\n{body}")
 
     def put_json(self, path: str, obj: Any, message: str, sha: Optional[str] = None) -> str:
         """
@@ -134,6 +214,7 @@ class GitHubService:
         r = self._request("PUT", url, json=payload)
 
         if r.status_code in (200, 201):
+            self._nova_geracao(path)
             return r.json()["content"]["sha"]
 
         if r.status_code == 409:
@@ -141,11 +222,17 @@ class GitHubService:
             payload["sha"] = current_sha
             r2 = self._request("PUT", url, json=payload)
             if r2.status_code in (200, 201):
+                self._nova_geracao(path)
                 return r2.json()["content"]["sha"]
             raise RuntimeError(f"Conflito ao salvar {path}: {r2.status_code}\n{r2.text}")
 
         raise RuntimeError(f"Erro ao salvar {path}: {r.status_code}\n{r.text}")
 
+    def _nova_geracao(self, path: str) -> None:
+        """Invalida leituras em andamento do path para quem chegar depois da escrita."""
+        with self._inflight_lock:
+            self._geracoes[path] = self._geracoes.get(path, 0) + 1
+
     # ✅ NECESSÁRIO: usado em load_all()
     def ensure_file(self, path: str, default: Any) -> Tuple[Any, Optional[str]]:
         """Garante que o arquivo exista; se não existir, cria com default e retorna (obj, sha)."""
@@ -178,7 +265,112 @@ class GitHubService:
         self.put_json(path, arr, f"{commit_message_prefix}: {item_id} -> {new_status}", sha=sha)
         return True
 
+    # Leitura em lote (bootstrap a frio / atualização incremental)
+    def list_dir(self, path: str) -> Dict[str, str]:
+        """
+        Lista um diretório do branch em UMA chamada.
+        Retorna {caminho: sha} apenas para arquivos (ignora subdiretórios).
+        """
+        url = self._contents_url(path.rstrip("/"))
+        r = self._request("GET", url, params={"ref": self.branch})
+
+        if r.status_code == 404:
+            return {}
+        if r.status_code != 200:
+            raise RuntimeError(f"Erro ao listar {path}: {r.status_code}\n{r.text}")
+
+        entries = r.json()
+        if not isinstance(entries, list):
+            return {}
+        return {e["path"]: e["sha"] for e in entries if e.get("type") == "file"}
+
+    def download_archive(self, prefix: str = "data/") -> Dict[str, Tuple[Any, str]]:
+        """
+        Baixa o tarball do branch em streaming (uma única transferência) e
+        extrai somente os JSON sob `prefix`, sem gravar nada em disco.
+
+        Retorna {caminho: (objeto, sha)}. O sha é o SHA do blob git,
+        calculado localmente, compatível com o usado por put_json().
+        """
+        url = f"{self.api_base}/repos/{self.repo}/tarball/{self.branch}"
+        r = self._request("GET", url, stream=True)
+
+        if r.status_code != 200:
+            r.close()
+            raise RuntimeError(f"Erro ao baixar arquivo do repositório: {r.status_code}")
+
+        out: Dict[str, Tuple[Any, str]] = {}
+        try:
+            r.raw.decode_content = True
+            with tarfile.open(fileobj=r.raw, mode="r|gz") as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+                    # Entradas vêm como "<owner>-<repo>-<commit>/data/x.json"
+                    _, _, rel = member.name.partition("/")
+                    if not rel.startswith(prefix) or not rel.endswith(".json"):
+                        continue
+                    fh = tar.extractfile(member)
+                    if fh is None:
+                        continue
+                    raw = fh.read()
+                    try:
+                        obj = json.loads(raw.decode("utf-8"))
+                    except ValueError:
+                        logger.warning(f"JSON inválido no arquivo do repositório: {rel}")
+                        continue
+                    out[rel] = (obj, _git_blob_sha(raw))
+        finally:
+            r.close()
+
+        return out
+
     def ping(self) -> bool:
         url = f"{self.api_base}/repos/{self.repo}"
         r = self._request("GET", url)
         return r.status_code == 200
+
+    def warm_up(self) -> Optional[Tuple[float, float]]:
+        """
+        Abre a conexão TLS do pool antecipadamente (chamado ao criar o cliente)
+        e mede o efeito do pool: TTFB da 1ª requisição (conexão nova, com
+        handshake) e da 2ª (conexão reaproveitada do pool).
+        Retorna (frio_ms, pool_ms), ou None se falhar.
+        """
+        url = f"{self.api_base}/repos/{self.repo}"
+        medidas = []
+        for _ in range(2):
+            try:
+                r = self._request("GET", url)
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Warm-up falhou: {e}")
+                return None
+            if r is None or r.status_code != 200:
+                logger.warning(f"Warm-up falhou: {getattr(r, 'status_code', 'sem resposta')}")
+                return None
+            medidas.append(_ttfb_ms(r))
+        frio, pool = medidas
+        logger.info(f"Warm-up {self.repo}@{self.branch}: TTFB {frio:.0f}ms (conexão nova) → {pool:.0f}ms (pool)")
+        return frio, pool
+
+
+class _InFlight:
+    """Leitura em andamento compartilhada entre chamadores concorrentes."""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Tuple[int, Optional[str], Optional[str], str]] = None
+        self.error: Optional[BaseException] = None
+
+
+def _ttfb_ms(resp: requests.Response) -> float:
+    return resp.elapsed.total_seconds() * 1000
+
+
+def _git_blob_sha(raw: bytes) -> str:
+    """SHA-1 de blob no formato do git (o mesmo retornado pela Contents API)."""
+    h = hashlib.sha1()
+    h.update(b"blob %d\0" % len(raw))
+    h.update(raw)
+    return h.hexdigest()
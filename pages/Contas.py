@@ -7,19 +7,20 @@ from datetime import date, timedelta
 # Imports internos
 # --------------------------------------------------
 from services.app_context import init_context, get_context
-from services.data_loader import load_all
+from services.data_loader import load_all, salvar_transacoes
 from services.permissions import require_admin
-from services.finance_core import normalizar_tx, atualizar, estornar
-from services.status import derivar_status
+from services.finance_core import TransactionStore
+from services.dinheiro import centavos, reais
+from services.snapshot import indice_vencimentos, seguir_escritas, transacoes_tipadas
+from services.status import status_em
 from services.utils import (
     fmt_brl,
-    parse_date_safe,
     clear_cache_and_rerun,
     fmt_date_br,
     key_for,
 )
-from services.layout import responsive_columns, is_mobile
-from services.ui import section, card
+from services.layout import responsive_columns
+from services.ui import section, card, lista_paginada
 
 # --------------------------------------------------
 # Configuração da página
@@ -54,31 +55,42 @@ usuario = ctx.get("usuario_id", "u1")
 data = load_all((ctx["repo_full_name"], ctx["branch_name"]))
 
 trans_map = data["data/transacoes.json"]
-transacoes = [
-    t for t in (normalizar_tx(x) for x in trans_map["content"])
-    if t is not None
-]
 sha_trans = trans_map["sha"]
+registros = transacoes_tipadas(sha_trans, trans_map["content"])
+transacoes = TransactionStore.from_records(registros)
+
+# Saldos/índices/resumos do snapshot seguem as escritas por delta e viram o próximo snapshot
+derivados = seguir_escritas(transacoes, data, registros)
+
+# Itens em aberto por vencimento (índice do snapshot, mantido por delta nas escritas)
+vencimentos = indice_vencimentos(sha_trans, registros)
+hoje = date.today()
 
 # --------------------------------------------------
 # Helper de salvamento
 # --------------------------------------------------
 def salvar(msg: str):
-    gh.put_json(
-        "data/transacoes.json",
+    novo_sha = salvar_transacoes(
+        gh,
         transacoes,
         f"[{usuario}] {msg}",
         sha=sha_trans,
+        resumos=derivados["resumos"],
+        sha_resumos=data["data/resumos.json"]["sha"],
     )
+    derivados.semear(novo_sha)
     clear_cache_and_rerun()
 
 # --------------------------------------------------
 # Badge amigável
 # --------------------------------------------------
+def status_de(tx) -> str:
+    return status_em(tx.prevista, tx.get("data_efetiva"), hoje)
+
+
 def badge_text(tx: dict) -> str:
-    status = derivar_status(tx.get("data_prevista"), tx.get("data_efetiva"))
-    d = parse_date_safe(tx.get("data_prevista"))
-    hoje = date.today()
+    status = status_de(tx)
+    d = tx.prevista
 
     if status == "paga":
         return "✅ Paga"
@@ -91,6 +103,26 @@ def badge_text(tx: dict) -> str:
 
     return "🟢 Em aberto"
 
+def listar(tipo: str, incluir_pagas: bool) -> list:
+    """Em aberto por vencimento (índice); pagas só quando pedidas."""
+    itens = vencimentos.abertas(tipo)
+    if incluir_pagas:
+        itens += [
+            tx for tx in transacoes
+            if tx.get("tipo") == tipo and not tx.get("excluido") and tx.get("data_efetiva")
+        ]
+    return itens
+
+
+# Ordenação das listas (sem data prevista vai para o fim)
+ORDENACOES = {
+    "Vencimento (mais antigo)": (lambda tx: tx.prevista or date.max, False),
+    "Vencimento (mais distante)": (lambda tx: tx.prevista or date.min, True),
+    "Maior valor": (lambda tx: centavos(tx.get("valor", 0)), True),
+    "Menor valor": (lambda tx: centavos(tx.get("valor", 0)), False),
+    "Descrição": (lambda tx: (tx.get("descricao") or "").lower(), False),
+}
+
 # --------------------------------------------------
 # Tabs
 # --------------------------------------------------
@@ -104,89 +136,78 @@ with tab_pagar:
 
     mostrar_pagas = st.checkbox("Mostrar contas pagas", value=False)
 
-    itens = []
-    for tx in transacoes:
-        if tx.get("tipo") != "despesa":
-            continue
-        if tx.get("excluido"):
-            continue
-        status = derivar_status(tx.get("data_prevista"), tx.get("data_efetiva"))
-        if not mostrar_pagas and status == "paga":
-            continue
-        itens.append(tx)
-
-    if not itens:
-        st.info("Nenhuma conta a pagar.")
-    else:
-        for tx in itens:
-            prev = parse_date_safe(tx.get("data_prevista"))
-            status = derivar_status(tx.get("data_prevista"), tx.get("data_efetiva"))
-
-            # -------------------------------
-            # MOBILE
-            # -------------------------------
-            if is_mobile():
-                card(
-                    tx.get("descricao", "Despesa"),
-                    [
-                        f"Valor: {fmt_brl(tx.get('valor', 0))}",
-                        f"Previsto: {fmt_date_br(prev)}",
-                        badge_text(tx),
-                    ],
-                )
-
-                cols = responsive_columns(desktop=2, mobile=1)
-
-                if cols[0].button(
-                    "✅ Marcar paga",
-                    key=key_for("pagar", tx["id"]),
-                    disabled=(status == "paga"),
-                ):
-                    tx["data_efetiva"] = date.today().isoformat()
-                    atualizar(transacoes, tx)
-                    salvar(f"Baixa pagar {tx.get('descricao')}")
-
-                if cols[1].button(
-                    "↩️ Estornar",
-                    key=key_for("estornar", tx["id"]),
-                    disabled=(status != "paga"),
-                ):
-                    estornar(tx)
-                    atualizar(transacoes, tx)
-                    salvar(f"Estorno pagar {tx.get('descricao')}")
-
-                nova_prev = st.date_input(
-                    "Reagendar",
-                    value=prev or date.today(),
-                    key=key_for("prev", tx["id"]),
-                )
-
-                if st.button(
-                    "Salvar nova data",
-                    key=key_for("save-prev", tx["id"]),
-                    disabled=(status == "paga"),
-                ):
-                    tx["data_prevista"] = nova_prev.isoformat()
-                    atualizar(transacoes, tx)
-                    salvar(f"Reagendamento pagar {tx.get('descricao')}")
-
-                st.divider()
-
-            # -------------------------------
-            # DESKTOP
-            # -------------------------------
-            else:
-                c1, c2, c3, c4, c5 = st.columns([4, 2, 2, 2, 2])
-
-                c1.write(f"**{tx.get('descricao','—')}**")
-                c2.write(fmt_brl(tx.get("valor", 0)))
-                c3.write(fmt_date_br(prev))
-                c4.write(badge_text(tx))
-
-                if c5.button("✅ Pagar", key=key_for("pay-d", tx["id"]), disabled=(status == "paga")):
-                    tx["data_efetiva"] = date.today().isoformat()
-                    atualizar(transacoes, tx)
-                    salvar(f"Baixa pagar {tx.get('descricao')}")
+    itens = listar("despesa", mostrar_pagas)
+
+    def pagar_mobile(tx):
+        prev = tx.prevista
+        status = status_de(tx)
+
+        card(
+            tx.get("descricao", "Despesa"),
+            [
+                f"Valor: {fmt_brl(tx.get('valor', 0))}",
+                f"Previsto: {fmt_date_br(prev)}",
+                badge_text(tx),
+            ],
+        )
+
+        cols = responsive_columns(desktop=2, mobile=1)
+
+        if cols[0].button(
+            "✅ Marcar paga",
+            key=key_for("pagar", tx["id"]),
+            disabled=(status == "paga"),
+        ):
+            transacoes.baixar(tx["id"])
+            salvar(f"Baixa pagar {tx.get('descricao')}")
+
+        if cols[1].button(
+            "↩️ Estornar",
+            key=key_for("estornar", tx["id"]),
+            disabled=(status != "paga"),
+        ):
+            transacoes.estornar(tx["id"])
+            salvar(f"Estorno pagar {tx.get('descricao')}")
+
+        nova_prev = st.date_input(
+            "Reagendar",
+            value=prev or date.today(),
+            key=key_for("prev", tx["id"]),
+        )
+
+        if st.button(
+            "Salvar nova data",
+            key=key_for("save-prev", tx["id"]),
+            disabled=(status == "paga"),
+        ):
+            transacoes.reagendar(tx["id"], nova_prev.isoformat())
+            salvar(f"Reagendamento pagar {tx.get('descricao')}")
+
+        st.divider()
+
+    def pagar_desktop(tx):
+        prev = tx.prevista
+        status = status_de(tx)
+
+        c1, c2, c3, c4, c5 = st.columns([4, 2, 2, 2, 2])
+
+        c1.write(f"**{tx.get('descricao','—')}**")
+        c2.write(fmt_brl(tx.get("valor", 0)))
+        c3.write(fmt_date_br(prev))
+        c4.write(badge_text(tx))
+
+        if c5.button("✅ Pagar", key=key_for("pay-d", tx["id"]), disabled=(status == "paga")):
+            transacoes.baixar(tx["id"])
+            salvar(f"Baixa pagar {tx.get('descricao')}")
+
+    lista_paginada(
+        itens,
+        "pagar",
+        desktop=pagar_desktop,
+        mobile=pagar_mobile,
+        ordenacoes=ORDENACOES,
+        vazio="Nenhuma conta a pagar.",
+    )
 
 # ==================================================
 # A RECEBER
@@ -196,83 +217,78 @@ with tab_receber:
 
     mostrar_recebidas = st.checkbox("Mostrar recebidas", value=False)
 
-    itens = []
-    for tx in transacoes:
-        if tx.get("tipo") != "receita":
-            continue
-        if tx.get("excluido"):
-            continue
-        status = derivar_status(tx.get("data_prevista"), tx.get("data_efetiva"))
-        if not mostrar_recebidas and status == "paga":
-            continue
-        itens.append(tx)
-
-    if not itens:
-        st.info("Nenhuma conta a receber.")
-    else:
-        for tx in itens:
-            prev = parse_date_safe(tx.get("data_prevista"))
-            status = derivar_status(tx.get("data_prevista"), tx.get("data_efetiva"))
-
-            if is_mobile():
-                card(
-                    tx.get("descricao", "Receita"),
-                    [
-                        f"Valor: {fmt_brl(tx.get('valor', 0))}",
-                        f"Previsto: {fmt_date_br(prev)}",
-                        badge_text(tx),
-                    ],
-                )
-
-                cols = responsive_columns(desktop=2, mobile=1)
-
-                if cols[0].button(
-                    "✅ Marcar recebida",
-                    key=key_for("recv", tx["id"]),
-                    disabled=(status == "paga"),
-                ):
-                    tx["data_efetiva"] = date.today().isoformat()
-                    atualizar(transacoes, tx)
-                    salvar(f"Baixa receber {tx.get('descricao')}")
-
-                if cols[1].button(
-                    "↩️ Estornar",
-                    key=key_for("undo-rec", tx["id"]),
-                    disabled=(status != "paga"),
-                ):
-                    estornar(tx)
-                    atualizar(transacoes, tx)
-                    salvar(f"Estorno receber {tx.get('descricao')}")
-
-                nova_prev = st.date_input(
-                    "Reagendar",
-                    value=prev or date.today(),
-                    key=key_for("prev-rec", tx["id"]),
-                )
-
-                if st.button(
-                    "Salvar nova data",
-                    key=key_for("save-prev-rec", tx["id"]),
-                    disabled=(status == "paga"),
-                ):
-                    tx["data_prevista"] = nova_prev.isoformat()
-                    atualizar(transacoes, tx)
-                    salvar(f"Reagendamento receber {tx.get('descricao')}")
-
-                st.divider()
-
-            else:
-                c1, c2, c3, c4, c5 = st.columns([4, 2, 2, 2, 2])
-
-                c1.write(f"**{tx.get('descricao','—')}**")
-                c2.write(fmt_brl(tx.get("valor", 0)))
-                c3.write(fmt_date_br(prev))
-                c4.write(badge_text(tx))
-
-                if c5.button("✅ Receber", key=key_for("recv-d", tx["id"]), disabled=(status == "paga")):
-                    tx["data_efetiva"] = date.today().isoformat()
-                    atualizar(transacoes, tx)
-                    salvar(f"Baixa receber {tx.get('descricao')}")
+    itens = listar("receita", mostrar_recebidas)
+
+    def receber_mobile(tx):
+        prev = tx.prevista
+        status = status_de(tx)
+
+        card(
+            tx.get("descricao", "Receita"),
+            [
+                f"Valor: {fmt_brl(tx.get('valor', 0))}",
+                f"Previsto: {fmt_date_br(prev)}",
+                badge_text(tx),
+            ],
+        )
+
+        cols = responsive_columns(desktop=2, mobile=1)
+
+        if cols[0].button(
+            "✅ Marcar recebida",
+            key=key_for("recv", tx["id"]),
+            disabled=(status == "paga"),
+        ):
+            transacoes.baixar(tx["id"])
+            salvar(f"Baixa receber {tx.get('descricao')}")
+
+        if cols[1].button(
+            "↩️ Estornar",
+            key=key_for("undo-rec", tx["id"]),
+            disabled=(status != "paga"),
+        ):
+            transacoes.estornar(tx["id"])
+            salvar(f"Estorno receber {tx.get('descricao')}")
+
+        nova_prev = st.date_input(
+            "Reagendar",
+            value=prev or date.today(),
+            key=key_for("prev-rec", tx["id"]),
+        )
+
+        if st.button(
+            "Salvar nova data",
+            key=key_for("save-prev-rec", tx["id"]),
+            disabled=(status == "paga"),
+        ):
+            transacoes.reagendar(tx["id"], nova_prev.isoformat())
+            salvar(f"Reagendamento receber {tx.get('descricao')}")
+
+        st.divider()
+
+    def receber_desktop(tx):
+        prev = tx.prevista
+        status = status_de(tx)
+
+        c1, c2, c3, c4, c5 = st.columns([4, 2, 2, 2, 2])
+
+        c1.write(f"**{tx.get('descricao','—')}**")
+        c2.write(fmt_brl(tx.get("valor", 0)))
+        c3.write(fmt_date_br(prev))
+        c4.write(badge_text(tx))
+
+        if c5.button("✅ Receber", key=key_for("recv-d", tx["id"]), disabled=(status == "paga")):
+            transacoes.baixar(tx["id"])
+            salvar(f"Baixa receber {tx.get('descricao')}")
+
+    lista_paginada(
+        itens,
+        "receber",
+        desktop=receber_desktop,
+        mobile=receber_mobile,
+        ordenacoes=ORDENACOES,
+        vazio="Nenhuma conta a receber.",
+    )
 
 # --------------------------------------------------
 # Resumo futuro
@@ -280,31 +296,9 @@ with tab_receber:
 st.divider()
 section("📊 Planejamento futuro")
 
-hoje = date.today()
-
 def resumo(tipo):
-    total, vencido, prox7 = 0.0, 0.0, 0.0
-    for tx in transacoes:
-        if tx.get("tipo") != tipo:
-            continue
-        if tx.get("excluido"):
-            continue
-        status = derivar_status(tx.get("data_prevista"), tx.get("data_efetiva"))
-        if status == "paga":
-            continue
-
-        v = float(tx.get("valor", 0))
-        d = parse_date_safe(tx.get("data_prevista"))
-        if not d:
-            continue
-
-        total += v
-        if d < hoje:
-            vencido += v
-        elif d <= hoje + timedelta(days=7):
-            prox7 += v
-
-    return total, vencido, prox7
+    total, vencido, prox7 = vencimentos.totais(tipo, hoje, dias=7)
+    return reais(total), reais(vencido), reais(prox7)
 
 p_aberto, p_vencido, p_prox7 = resumo("despesa")
 r_aberto, r_vencido, r_prox7 = resumo("receita")
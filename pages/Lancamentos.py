@@ -1,7 +1,7 @@
 
 # pages/1_Lancamentos.py
+import calendar
 import streamlit as st
-import pandas as pd
 from datetime import date, datetime
 from typing import Optional
 
@@ -9,28 +9,37 @@ from typing import Optional
 # Imports internos
 # --------------------------------------------------
 from services.app_context import init_context, get_context
-from services.data_loader import load_all
+from services.data_loader import load_all, salvar_transacoes
 from services.permissions import require_admin
 from services.finance_core import (
     novo_id,
     criar,
-    atualizar,
     excluir,
     gerar_parcelas,
-    normalizar_tx,
-    baixar,
-    estornar,
+    TransactionStore,
 )
-from services.status import derivar_status, status_badge
+from services.dinheiro import centavos, reais
+from services.recorrencia import expandir, materializar
+from services.busca import normalizar
+from services.snapshot import (
+    frame_com_status,
+    indice_busca,
+    indice_datas,
+    seguir_escritas,
+    transacoes_tipadas,
+)
+from services.status import status_badge, status_em
 from services.competencia import competencia_from_date, label_competencia
 from services.utils import (
     fmt_brl,
+    fmt_brl_series,
     clear_cache_and_rerun,
     fmt_date_br,
+    fmt_series_date_br,
     key_for,
 )
-from services.layout import responsive_columns, is_mobile
-from services.ui import section, responsive_dataframe, card
+from services.layout import responsive_columns
+from services.ui import section, responsive_dataframe, card, lista_paginada
 
 # --------------------------------------------------
 # Helper local
@@ -42,6 +51,28 @@ def _parse_br_date(raw: str) -> Optional[date]:
         return None
 
 
+# Intervalo entre parcelas: rótulo -> (meses, dias)
+INTERVALOS_PARCELA = {
+    "Mensal": (1, None),
+    "Bimestral": (2, None),
+    "Quinzenal": (1, 15),
+    "Semanal": (1, 7),
+}
+
+# Máximo de resultados listados na busca em todas as competências
+# (os totais do resumo somam todos os resultados)
+LIMITE_BUSCA = 200
+
+# Ordenação da lista de ações ("Padrão": data no mês, relevância na busca)
+ORDENACOES = {
+    "Padrão": (None, False),
+    "Data prevista (mais recente)": (lambda tx: tx.prevista or date.min, True),
+    "Data prevista (mais antiga)": (lambda tx: tx.prevista or date.max, False),
+    "Maior valor": (lambda tx: centavos(tx.get("valor", 0)), True),
+    "Código": (lambda tx: tx.get("codigo") or 0, False),
+}
+
+
 # --------------------------------------------------
 # Configuração da página
 # --------------------------------------------------
@@ -75,15 +106,35 @@ usuario = ctx.get("usuario_id", "u1")
 data = load_all((ctx["repo_full_name"], ctx["branch_name"]))
 
 trans_map = data["data/transacoes.json"]
-transacoes = [
-    t for t in (normalizar_tx(x) for x in trans_map["content"])
-    if t is not None
-]
 sha_trans = trans_map["sha"]
+registros = transacoes_tipadas(sha_trans, trans_map["content"])
+transacoes = TransactionStore.from_records(registros)
+
+# Saldos/índices/resumos do snapshot seguem as escritas por delta e viram o próximo snapshot
+derivados = seguir_escritas(transacoes, data, registros)
+
+# Competência da tela = data prevista (fallback: efetiva), ordenada uma vez por sha,
+# com totais por (tipo, paga) de cada mês
+indice = indice_datas(sha_trans, "prevista", registros)
 
 categorias = data.get("data/categorias.json", {}).get("content", [])
 contas = data.get("data/contas.json", {}).get("content", [])
 
+# --------------------------------------------------
+# Helper de salvamento
+# --------------------------------------------------
+def gravar(msg: str):
+    novo_sha = salvar_transacoes(
+        gh,
+        transacoes,
+        f"[{usuario}] {msg}",
+        sha=sha_trans,
+        resumos=derivados["resumos"],
+        sha_resumos=data["data/resumos.json"]["sha"],
+    )
+    derivados.semear(novo_sha)
+    clear_cache_and_rerun()
+
 # --------------------------------------------------
 # Utilitários locais
 # --------------------------------------------------
@@ -93,19 +144,13 @@ inv_cat = {v: k for k, v in cat_map.items()}
 conta_map = {c.get("id"): c.get("nome") for c in contas}
 inv_conta = {v: k for k, v in conta_map.items()}
 
+metas = [m for m in data.get("data/metas.json", {}).get("content", []) if isinstance(m, dict)]
+meta_map = {m.get("id"): m.get("nome") for m in metas}
+
 # --------------------------------------------------
 # Filtros
 # --------------------------------------------------
-competencias = sorted(
-    {
-        competencia_from_date(
-            pd.to_datetime(x.get("data_prevista") or x.get("data_efetiva")).date()
-        )
-        for x in transacoes
-        if (x.get("data_prevista") or x.get("data_efetiva"))
-    },
-    reverse=True,
-)
+competencias = indice.competencias()
 
 default_comp = competencia_from_date(date.today())
 if default_comp not in competencias:
@@ -121,7 +166,11 @@ comp_select = colf[0].selectbox(
     format_func=label_competencia,
 )
 
-busca_texto = colf[1].text_input("Buscar por descrição")
+busca_texto = colf[1].text_input(
+    "Buscar",
+    help="Descrição, categoria ou conta — sem acentos, por prefixo ou aproximado.",
+)
+busca_global = colf[1].checkbox("Buscar em todas as competências")
 
 somente_aberto = colf[2].checkbox("Somente em aberto")
 
@@ -136,52 +185,57 @@ tipo_filter = colf[3].selectbox(
 def filtrar(ds):
     out = []
     for d in ds:
-        dt_ref = d.get("data_prevista") or d.get("data_efetiva")
-        if not dt_ref:
-            continue
-
-        comp = competencia_from_date(pd.to_datetime(dt_ref).date())
-        if comp != comp_select:
-            continue
-
         if tipo_filter != "todos" and d.get("tipo") != tipo_filter:
             continue
 
-        if busca_texto and busca_texto.lower() not in d.get("descricao", "").lower():
-            continue
-
-        if somente_aberto and derivar_status(
-            d.get("data_prevista"),
-            d.get("data_efetiva"),
-        ) == "paga":
+        if somente_aberto and d.get("data_efetiva"):
             continue
 
         out.append(d)
     return out
 
 
-lista_mes = filtrar(transacoes)
+escopo_global = bool(busca_texto) and busca_global
+titulo_escopo = "todas as competências" if escopo_global else label_competencia(comp_select)
+
+if busca_texto:
+    # Índice de busca do snapshot; resultados por relevância
+    busca = indice_busca(
+        sha_trans,
+        data.get("data/categorias.json", {}).get("sha"),
+        data.get("data/contas.json", {}).get("sha"),
+        registros,
+        categorias,
+        contas,
+    )
+    ids_mes = None if escopo_global else {t["id"] for t in indice.competencia(comp_select)}
+    # Todos os resultados entram nos totais; a lista mostra só os mais relevantes
+    resultados = filtrar(busca.transacoes(busca_texto, limite=None, ids=ids_mes))
+    lista_mes = resultados[:LIMITE_BUSCA] if escopo_global else resultados
+else:
+    resultados = lista_mes = filtrar(indice.competencia(comp_select))
 
 # --------------------------------------------------
 # Resumo
 # --------------------------------------------------
-section(f"📅 Resumo — {label_competencia(comp_select)}")
+section(f"📅 Resumo — {titulo_escopo}")
 
-def soma(tipo: str, status: Optional[str] = None):
-    total = 0.0
-    for t in lista_mes:
-        if t.get("tipo") != tipo:
-            continue
-        st_calc = derivar_status(t.get("data_prevista"), t.get("data_efetiva"))
-        if status and st_calc != status:
-            continue
-        total += float(t.get("valor", 0))
-    return total
+def soma(tipo: str, paga: bool = True):
+    if tipo_filter not in ("todos", tipo) or (paga and somente_aberto):
+        return 0.0
+    # Sem busca textual, os totais do mês já estão no índice
+    if not busca_texto:
+        return reais(indice.totais(comp_select).get((tipo, paga), 0))
+    return reais(sum(
+        centavos(t.get("valor", 0))
+        for t in resultados
+        if t.get("tipo") == tipo and bool(t.get("data_efetiva")) == paga
+    ))
 
 
 cols_resumo = responsive_columns(desktop=2, mobile=1)
-cols_resumo[0].metric("📥 Receitas pagas", fmt_brl(soma("receita", "paga")))
-cols_resumo[1].metric("💸 Despesas pagas", fmt_brl(soma("despesa", "paga")))
+cols_resumo[0].metric("📥 Receitas pagas", fmt_brl(soma("receita")))
+cols_resumo[1].metric("💸 Despesas pagas", fmt_brl(soma("despesa")))
 
 st.divider()
 
@@ -210,17 +264,35 @@ with st.form("nova_tx"):
     )
     descricao = cols2[1].text_input("Descrição")
 
-    cols3 = responsive_columns(desktop=2, mobile=1)
+    cols3 = responsive_columns(desktop=3, mobile=1)
     parcelar = cols3[0].checkbox("Parcelar?")
     qtd_parc = cols3[1].number_input(
         "Qtd. parcelas",
         min_value=1,
-        max_value=60,
+        max_value=480,
         value=1,
-        disabled=not parcelar,
+        help="Usado quando 'Parcelar?' está marcado.",
+    )
+    intervalo_parc = cols3[2].selectbox(
+        "Intervalo",
+        list(INTERVALOS_PARCELA),
+    )
+
+    cols4 = responsive_columns(desktop=2, mobile=1)
+    pagar_agora = cols4[0].checkbox("Marcar como paga/recebida")
+    recorrente = cols4[1].checkbox(
+        "Repetir todo mês",
+        help="Gera as próximas ocorrências automaticamente (sem gravar). Ignorado ao parcelar.",
     )
 
-    pagar_agora = st.checkbox("Marcar como paga/recebida")
+    meta_id = None
+    if meta_map:
+        meta_id = st.selectbox(
+            "Meta (opcional)",
+            [None] + list(meta_map),
+            format_func=lambda mid: "—" if mid is None else meta_map.get(mid, mid),
+            help="Despesa efetivada conta como aporte na meta; receita, como resgate.",
+        )
 
     salvar = st.form_submit_button("Salvar")
 
@@ -229,12 +301,7 @@ if salvar:
     if not dt:
         st.error("Data inválida.")
     else:
-        codigos = [
-            t.get("codigo")
-            for t in transacoes
-            if isinstance(t.get("codigo"), int)
-        ]
-        next_code = max(codigos) + 1 if codigos else 1
+        next_code = transacoes.proximo_codigo()
 
         base = {
             "id": novo_id("tx"),
@@ -247,133 +314,169 @@ if salvar:
             "conta_id": inv_conta.get(conta_nome),
             "categoria_id": inv_cat.get(categoria_nome),
             "excluido": False,
+            "recorrente": bool(recorrente and not parcelar),
         }
+        if meta_id:
+            base["meta_id"] = meta_id
 
         if parcelar and qtd_parc > 1:
-            parcelas = gerar_parcelas(base, int(qtd_parc))
+            meses, dias = INTERVALOS_PARCELA[intervalo_parc]
+            parcelas = gerar_parcelas(
+                base,
+                int(qtd_parc),
+                intervalo_meses=meses,
+                intervalo_dias=dias,
+            )
             for p in parcelas:
                 criar(transacoes, p)
-            gh.put_json(
-                "data/transacoes.json",
-                transacoes,
-                f"[{usuario}] Parcelamento x{qtd_parc}",
-                sha=sha_trans,
-            )
+            gravar(f"Parcelamento x{qtd_parc}")
         else:
             criar(transacoes, base)
-            gh.put_json(
-                "data/transacoes.json",
-                transacoes,
-                f"[{usuario}] Nova transação",
-                sha=sha_trans,
-            )
-
-        clear_cache_and_rerun()
+            gravar("Nova transação")
 
 st.divider()
 
 # --------------------------------------------------
 # Lista
 # --------------------------------------------------
-section("📋 Lançamentos do mês")
+section("📋 Lançamentos do mês" if not escopo_global else f"📋 Resultados da busca — {titulo_escopo}")
+
+if len(resultados) > len(lista_mes):
+    st.caption(
+        f"Mostrando os {len(lista_mes)} resultados mais relevantes de {len(resultados)}; "
+        "os totais do resumo consideram todos."
+    )
 
 if not lista_mes:
     st.info("Nenhum lançamento.")
 else:
-    df = pd.DataFrame(lista_mes)
-    df["Status"] = df.apply(
-        lambda r: status_badge(
-            derivar_status(
-                r.get("data_prevista"),
-                r.get("data_efetiva"),
-            )
-        ),
-        axis=1,
-    )
-    df["Valor"] = df["valor"].apply(fmt_brl)
-    df["Prevista"] = df["data_prevista"].apply(fmt_date_br)
+    # Linhas do frame canônico do snapshot, na ordem da lista (máscara por id:
+    # ids repetidos ou vazios não multiplicam linhas como um .loc faria)
+    frame = frame_com_status(sha_trans, date.today(), registros)
+    ordem = {}
+    for i, t in enumerate(lista_mes):
+        ordem.setdefault(t["id"], i)
+    df = frame[frame["id"].isin(ordem.keys())]
+    df = df.iloc[df["id"].map(ordem).argsort(kind="stable")].reset_index(drop=True)
+    df["Status"] = df["status"].map(status_badge).astype(str)
+    df["Valor"] = fmt_brl_series(df["valor"])
+    df["Prevista"] = fmt_series_date_br(df["data_prevista"])
 
     show = df[["codigo", "descricao", "Valor", "Prevista", "Status"]].rename(
         columns={"descricao": "Descrição"}
     )
 
-    responsive_dataframe(show)
+    responsive_dataframe(show, chave="tabela-lancamentos")
 
     st.divider()
 
-    # Ações individuais (cards no mobile)
-    for tx in lista_mes:
-        status = derivar_status(tx.get("data_prevista"), tx.get("data_efetiva"))
-
-        if is_mobile():
-            card(
-                f"{tx.get('codigo')} — {tx.get('descricao')}",
-                [
-                    fmt_brl(tx.get("valor")),
-                    status_badge(status),
-                ],
-            )
+    # Ações individuais (cards no mobile), paginadas
+    hoje = date.today()
+
+    def acoes_mobile(tx):
+        status = status_em(tx.prevista, tx.get("data_efetiva"), hoje)
+        card(
+            f"{tx.get('codigo')} — {tx.get('descricao')}",
+            [
+                fmt_brl(tx.get("valor")),
+                status_badge(status),
+            ],
+        )
 
-            c1, c2 = responsive_columns(desktop=2, mobile=1)
-            if c1.button(
-                "Marcar paga/recebida",
-                disabled=(status == "paga"),
-                key=key_for("pay", tx["id"]),
-            ):
-                baixar(tx)
-                atualizar(transacoes, tx)
-                gh.put_json(
-                    "data/transacoes.json",
-                    transacoes,
-                    f"[{usuario}] Baixa {tx['id']}",
-                    sha=sha_trans,
-                )
-                clear_cache_and_rerun()
-
-            if c2.button(
-                "Estornar",
-                disabled=(status != "paga"),
-                key=key_for("undo", tx["id"]),
-            ):
-                estornar(tx)
-                atualizar(transacoes, tx)
-                gh.put_json(
-                    "data/transacoes.json",
-                    transacoes,
-                    f"[{usuario}] Estorno {tx['id']}",
-                    sha=sha_trans,
-                )
-                clear_cache_and_rerun()
+        c1, c2 = responsive_columns(desktop=2, mobile=1)
+        if c1.button(
+            "Marcar paga/recebida",
+            disabled=(status == "paga"),
+            key=key_for("pay", tx["id"]),
+        ):
+            transacoes.baixar(tx["id"])
+            gravar(f"Baixa {tx['id']}")
+
+        if c2.button(
+            "Estornar",
+            disabled=(status != "paga"),
+            key=key_for("undo", tx["id"]),
+        ):
+            transacoes.estornar(tx["id"])
+            gravar(f"Estorno {tx['id']}")
+
+    def acoes_desktop(tx):
+        status = status_em(tx.prevista, tx.get("data_efetiva"), hoje)
+        with st.expander(
+            f"{tx.get('codigo')} — {tx.get('descricao')}",
+            expanded=False,
+        ):
+            cols = responsive_columns(desktop=3)
+            cols[0].write(fmt_brl(tx.get("valor")))
+            cols[1].write(fmt_date_br(tx.get("data_prevista")))
+            cols[2].write(status_badge(status))
+
+            b1, b2 = st.columns(2)
+            if b1.button("✅ Baixar", key=key_for("pay-d", tx["id"])):
+                transacoes.baixar(tx["id"])
+                gravar(f"Baixa {tx['id']}")
+
+            if b2.button("↩️ Estornar", key=key_for("undo-d", tx["id"])):
+                transacoes.estornar(tx["id"])
+                gravar(f"Estorno {tx['id']}")
+
+    lista_paginada(
+        lista_mes,
+        "lancamentos",
+        desktop=acoes_desktop,
+        mobile=acoes_mobile,
+        ordenacoes=ORDENACOES,
+    )
 
-        else:
-            with st.expander(
-                f"{tx.get('codigo')} — {tx.get('descricao')}",
-                expanded=False,
-            ):
-                cols = responsive_columns(desktop=3)
-                cols[0].write(fmt_brl(tx.get("valor")))
-                cols[1].write(fmt_date_br(tx.get("data_prevista")))
-                cols[2].write(status_badge(status))
-
-                b1, b2 = st.columns(2)
-                if b1.button("✅ Baixar", key=key_for("pay-d", tx["id"])):
-                    baixar(tx)
-                    atualizar(transacoes, tx)
-                    gh.put_json(
-                        "data/transacoes.json",
-                        transacoes,
-                        f"[{usuario}] Baixa {tx['id']}",
-                        sha=sha_trans,
-                    )
-                    clear_cache_and_rerun()
-
-                if b2.button("↩️ Estornar", key=key_for("undo-d", tx["id"])):
-                    estornar(tx)
-                    atualizar(transacoes, tx)
-                    gh.put_json(
-                        "data/transacoes.json",
-                        transacoes,
-                        f"[{usuario}] Estorno {tx['id']}",
-                        sha=sha_trans,
-                    )
-                    clear_cache_and_rerun()
+# --------------------------------------------------
+# Recorrências previstas (virtuais — gravadas só ao baixar)
+# --------------------------------------------------
+ano_sel, mes_sel = (int(x) for x in comp_select.split("-"))
+virtuais = [
+    v for v in expandir(
+        transacoes,
+        date(ano_sel, mes_sel, 1),
+        date(ano_sel, mes_sel, calendar.monthrange(ano_sel, mes_sel)[1]),
+    )
+    if (tipo_filter == "todos" or v.get("tipo") == tipo_filter)
+    and (not busca_texto or normalizar(busca_texto) in normalizar(v.get("descricao")))
+]
+
+if virtuais:
+    st.divider()
+    section("🔁 Recorrências previstas", "Lançadas automaticamente ao baixar")
+
+    def baixar_ocorrencia(oc):
+        real = criar(
+            transacoes,
+            materializar(oc, novo_id("tx"), transacoes.proximo_codigo()),
+        )
+        transacoes.baixar(real["id"])
+        gravar(f"Baixa recorrência {oc['id']}")
+
+    def ocorrencia_desktop(oc):
+        c1, c2, c3, c4 = st.columns([4, 2, 2, 2])
+        c1.write(f"**{oc.get('descricao') or '—'}**")
+        c2.write(fmt_brl(oc.get("valor")))
+        c3.write(fmt_date_br(oc.get("data_prevista")))
+
+        if c4.button("✅ Baixar", key=key_for("pay-rec", oc["id"])):
+            baixar_ocorrencia(oc)
+
+    def ocorrencia_mobile(oc):
+        card(
+            oc.get("descricao") or "—",
+            [
+                fmt_brl(oc.get("valor")),
+                fmt_date_br(oc.get("data_prevista")),
+            ],
+        )
+        if st.button("✅ Baixar", key=key_for("pay-rec-m", oc["id"])):
+            baixar_ocorrencia(oc)
+
+    lista_paginada(
+        virtuais,
+        "recorrencias",
+        desktop=ocorrencia_desktop,
+        mobile=ocorrencia_mobile,
+    )
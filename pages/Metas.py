@@ -1,6 +1,7 @@
 
 # pages/3_Metas.py
 import streamlit as st
+import pandas as pd
 from datetime import date
 
 # --------------------------------------------------
@@ -8,6 +9,7 @@ from datetime import date
 # --------------------------------------------------
 from services.app_context import init_context, get_context
 from services.data_loader import load_all
+from services.snapshot import progresso_metas, transacoes_tipadas
 from services.utils import fmt_brl, fmt_date_br
 from services.layout import responsive_columns, is_mobile
 from services.ui import section, card
@@ -46,6 +48,18 @@ metas_map = data.get("data/metas.json", {"content": [], "sha": None})
 metas = [m for m in metas_map.get("content", []) if isinstance(m, dict)]
 sha = metas_map.get("sha")
 
+categorias = [c for c in data.get("data/categorias.json", {}).get("content", []) if isinstance(c, dict)]
+cat_map = {c.get("id"): c.get("nome") for c in categorias}
+
+# Acumulado das metas vinculadas (categoria ou meta_id nas transações)
+trans_map = data["data/transacoes.json"]
+prog = progresso_metas(
+    trans_map["sha"],
+    sha,
+    transacoes_tipadas(trans_map["sha"], trans_map["content"]),
+    metas,
+)
+
 # --------------------------------------------------
 # Helpers
 # --------------------------------------------------
@@ -80,6 +94,20 @@ def aporte_sugerido(meta: dict) -> float:
 
     return faltante / meses
 
+
+def mostrar_vinculo(meta: dict):
+    """Origem do acumulado e aportes por mês de uma meta vinculada."""
+    cat = meta.get("categoria_id")
+    st.caption(
+        f"🔗 Categoria: {cat_map.get(cat, cat)}" if cat else "🔗 Lançamentos com esta meta"
+    )
+    aportes = prog.aportes_mensais(meta.get("id"))
+    if aportes:
+        with st.expander("Aportes por mês", expanded=False):
+            serie = pd.Series(aportes, name="Aporte").tail(12)
+            st.bar_chart(serie, height=200)
+            st.caption(f"Média dos últimos 3 meses: {fmt_brl(serie.tail(3).mean())}")
+
 # --------------------------------------------------
 # Cadastro de nova meta (ADMIN)
 # --------------------------------------------------
@@ -97,11 +125,26 @@ if is_admin:
         )
         data_meta = cols[2].date_input("Data limite")
 
+        categoria_vinc = st.selectbox(
+            "Vincular à categoria (opcional)",
+            [None] + list(cat_map),
+            format_func=lambda cid: "— (valor manual ou meta_id nos lançamentos)" if cid is None else cat_map.get(cid, cid),
+            help="Despesas efetivadas na categoria contam como aporte; receitas, como resgate.",
+        )
+
         salvar = st.form_submit_button("Salvar")
 
+    # Uma categoria alimenta uma única meta
+    meta_da_categoria = {m.get("categoria_id"): m.get("nome") for m in metas if m.get("categoria_id")}
+
     if salvar:
         if not nome.strip():
             st.error("Informe um nome válido.")
+        elif categoria_vinc in meta_da_categoria:
+            st.error(
+                f"A categoria {cat_map.get(categoria_vinc, categoria_vinc)} já está "
+                f"vinculada à meta {meta_da_categoria[categoria_vinc]}."
+            )
         else:
             metas.append({
                 "id": f"m-{len(metas)+1}",
@@ -110,6 +153,7 @@ if is_admin:
                 "valor_atual": 0.0,
                 "data_meta": data_meta.isoformat(),
                 "ativa": True,
+                "categoria_id": categoria_vinc,
             })
 
             gh.put_json(
@@ -135,6 +179,10 @@ section("📌 Suas metas")
 
 for meta in metas:
     nome = meta.get("nome", "Meta")
+    vinculada = prog.vinculada(meta)
+    if vinculada:
+        # Calculado das transações: sem digitação nem gravação de metas.json
+        meta = {**meta, "valor_atual": prog.acumulado(meta.get("id"))}
     valor_meta = float(meta.get("valor_meta", 0))
     valor_atual = float(meta.get("valor_atual", 0))
     data_limite = meta.get("data_meta")
@@ -165,7 +213,9 @@ for meta in metas:
         if meses == 0 and valor_atual < valor_meta:
             st.error("🔴 Meta vencida sem atingir o valor.")
 
-        if is_admin:
+        if vinculada:
+            mostrar_vinculo(meta)
+        elif is_admin:
             novo_valor = st.number_input(
                 "Atualizar valor acumulado",
                 min_value=0.0,
@@ -213,7 +263,9 @@ for meta in metas:
             else:
                 st.success("✅ Meta atingida ou sem aporte necessário.")
 
-            if is_admin:
+            if vinculada:
+                mostrar_vinculo(meta)
+            elif is_admin:
                 novo_valor = st.number_input(
                     "Atualizar valor acumulado",
                     min_value=0.0,
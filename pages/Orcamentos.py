@@ -2,6 +2,7 @@
 # pages/Orcamentos.py
 import streamlit as st
 import pandas as pd
+from datetime import date
 
 # --------------------------------------------------
 # Imports internos
@@ -9,10 +10,13 @@ import pandas as pd
 from services.app_context import init_context, get_context
 from services.data_loader import load_all, listar_categorias
 from services.permissions import require_admin
-from services.utils import fmt_brl, key_for
-from services.finance_core import novo_id
+from services.utils import fmt_brl, fmt_brl_series, key_for
+from services.finance_core import add_months, novo_id
+from services.competencia import competencia_from_date, label_competencia
+from services.orcamentos import agregar, nivel_badge
+from services.snapshot import consumo_orcamentos_snapshot, transacoes_tipadas
 from services.layout import responsive_columns, is_mobile
-from services.ui import section, card
+from services.ui import section, card, responsive_dataframe
 
 # --------------------------------------------------
 # Configuração da página
@@ -135,6 +139,45 @@ if salvar:
 
 st.divider()
 
+# --------------------------------------------------
+# Consumo (gasto × limite)
+# --------------------------------------------------
+section("📈 Consumo do orçamento", "Gasto realizado e previsto contra o limite mensal")
+
+hoje = date.today()
+opcoes_comp = [competencia_from_date(add_months(hoje.replace(day=1), k)) for k in range(-12, 4)]
+comps_sel = st.multiselect(
+    "Competências",
+    opcoes_comp,
+    default=[competencia_from_date(hoje)],
+    format_func=label_competencia,
+)
+
+trans_map = data["data/transacoes.json"]
+consumo = consumo_orcamentos_snapshot(
+    trans_map["sha"],
+    sha,
+    tuple(sorted(comps_sel)),
+    transacoes_tipadas(trans_map["sha"], trans_map["content"]),
+    orcamentos,
+)
+
+if consumo.empty:
+    st.info("Sem orçamentos ativos ou competências selecionadas.")
+else:
+    tabela = agregar(consumo)
+    responsive_dataframe(pd.DataFrame({
+        "Categoria": tabela["categoria_id"].map(cat_map).fillna("Sem categoria"),
+        "Limite": fmt_brl_series(tabela["limite"]),
+        "Gasto": fmt_brl_series(tabela["gasto"]),
+        "Previsto": fmt_brl_series(tabela["previsto"]),
+        "Restante": fmt_brl_series(tabela["restante"]),
+        "% gasto": tabela["pct"].map("{:.0%}".format),
+        "Situação": tabela["nivel"].astype(str).map(nivel_badge),
+    }))
+
+st.divider()
+
 # --------------------------------------------------
 # Filtros
 # --------------------------------------------------
@@ -240,11 +283,12 @@ else:
         rows = [{
             "ID": o["id"],
             "Categoria": cat_map.get(o["categoria_id"], "Sem categoria"),
-            "Limite Mensal": fmt_brl(o["limite_mensal"]),
+            "Limite Mensal": o["limite_mensal"],
             "Ativo": ativo(o),
         } for o in filtrados]
 
         df = pd.DataFrame(rows)
+        df["Limite Mensal"] = fmt_brl_series(df["Limite Mensal"])
         st.dataframe(df, use_container_width=True)
 
         csv = df.to_csv(index=False).encode("utf-8")
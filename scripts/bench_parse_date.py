@@ -0,0 +1,84 @@
+"""
+Microbenchmark de utils.parse_date_safe.
+
+Compara o parser anterior (pd.to_datetime por chamada) com o caminho
+rápido atual, com cache frio (valores distintos) e quente (valores
+repetidos, caso típico: poucas datas distintas em milhares de linhas).
+
+    python scripts/bench_parse_date.py [n]
+
+Saída de referência (n = 20 000, Python 3.11, pandas 3.0; custo por chamada,
+melhor de 3 — os valores variam com a máquina, a ordem de grandeza não):
+
+    caso            formato     anterior       atual   ganho
+    distintas       iso         398.72µs      1.41µs    284x
+    distintas       br          282.17µs      1.41µs    200x
+    repetidas       iso         269.44µs      0.23µs   1158x
+    repetidas       br          386.99µs      0.23µs   1659x
+"""
+
+import random
+import sys
+import timeit
+import warnings
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd  # noqa: E402
+
+from services.utils import _parse_date_str, parse_date_safe  # noqa: E402
+
+
+def parse_date_safe_anterior(d):
+    """Implementação anterior, só para comparação."""
+    if d is None:
+        return None
+    try:
+        if isinstance(d, date) and not isinstance(d, datetime):
+            return d
+        if isinstance(d, datetime):
+            return d.date()
+        return pd.to_datetime(d, errors="coerce").date()
+    except Exception:
+        return None
+
+
+def amostras(n: int, distintas: int) -> dict[str, list[str]]:
+    base = date(2020, 1, 1)
+    dias = [base + timedelta(days=random.randrange(distintas)) for _ in range(n)]
+    return {
+        "iso": [d.isoformat() for d in dias],
+        "br": [d.strftime("%d/%m/%Y") for d in dias],
+    }
+
+
+def medir(fn, valores: list, limpar: bool) -> float:
+    """Custo médio por chamada, em microssegundos."""
+    def rodar():
+        if limpar:
+            _parse_date_str.cache_clear()
+        for v in valores:
+            fn(v)
+    return min(timeit.repeat(rodar, number=1, repeat=3)) / len(valores) * 1e6
+
+
+def main(n: int = 20_000) -> None:
+    # O parser anterior avisa a cada dd/mm/aaaa (dayfirst implícito)
+    warnings.simplefilter("ignore", UserWarning)
+    random.seed(0)
+    casos = {
+        "distintas": amostras(n, distintas=n * 10),
+        "repetidas": amostras(n, distintas=365),
+    }
+    print(f"{'caso':<16}{'formato':<8}{'anterior':>12}{'atual':>12}{'ganho':>8}")
+    for caso, por_formato in casos.items():
+        for formato, valores in por_formato.items():
+            antes = medir(parse_date_safe_anterior, valores, limpar=False)
+            depois = medir(parse_date_safe, valores, limpar=(caso == "distintas"))
+            print(f"{caso:<16}{formato:<8}{antes:>10.2f}µs{depois:>10.2f}µs{antes / depois:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -6,7 +6,7 @@ Contexto e estado da aplicação (Streamlit Session State).
 - Lê defaults de st.secrets
 - Define usuário/perfil locais
 - Controla o modo mobile (toggle global)
-- Instancia GitHubService quando possível
+- Obtém GitHubService do registro compartilhado do processo
 - Expõe get_context() para uso em páginas e serviços
 """
 
@@ -14,6 +14,25 @@ import streamlit as st
 from github_service import GitHubService
 
 
+@st.cache_resource(show_spinner=False)
+def get_github_service(token: str, repo_full_name: str, branch: str) -> GitHubService:
+    """
+    Registro de clientes em nível de processo, chaveado por (token, repo, branch).
+
+    Todas as sessões do navegador reutilizam o mesmo requests.Session e,
+    portanto, o mesmo pool keep-alive (sem novo handshake TLS por sessão).
+    O tamanho do pool vem de st.secrets["http_pool_size"] (padrão 10).
+    """
+    gh = GitHubService(
+        token=token,
+        repo_full_name=repo_full_name,
+        branch=branch,
+        pool_size=int(st.secrets.get("http_pool_size", 10)),
+    )
+    gh.warm_up()
+    return gh
+
+
 def init_context():
     """
     Inicializa o estado de sessão do Streamlit.
@@ -22,7 +41,7 @@ def init_context():
     - Carrega valores padrão de st.secrets (repo, token, branch)
     - Define chaves estáveis de usuário/perfil
     - Define 'modo_mobile' (toggle global de UI)
-    - Instancia GitHubService se há credenciais
+    - Obtém o GitHubService compartilhado se há credenciais
     - Sinaliza 'connected' e 'gh_error' conforme resultado
     """
     ss = st.session_state
@@ -50,10 +69,10 @@ def init_context():
     # -------------------------------------------------
     if "gh" not in ss and ss["repo_full_name"] and ss["github_token"]:
         try:
-            ss["gh"] = GitHubService(
-                token=ss["github_token"],
-                repo_full_name=ss["repo_full_name"],
-                branch=ss["branch_name"],
+            ss["gh"] = get_github_service(
+                ss["github_token"],
+                ss["repo_full_name"],
+                ss["branch_name"],
             )
             ss["connected"] = True
             ss.pop("gh_error", None)
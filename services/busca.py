@@ -0,0 +1,166 @@
+"""
+Busca textual nas transações (descrição, nome da categoria, nome da conta).
+
+Índice invertido construído uma vez por snapshot (snapshot.indice_busca):
+- texto normalizado: sem acentos, minúsculo, só letras e dígitos
+- token → {posição: peso do campo} (descrição pesa mais que categoria e conta);
+  documentos por posição, já que registros legados podem repetir o id ""
+- vocabulário ordenado para prefixo (busca binária)
+- trigramas → tokens para trechos no meio da palavra e erros de digitação
+
+Cada termo da consulta precisa casar (E lógico). A pontuação de um termo
+é a qualidade do casamento (exato > prefixo > trecho > aproximado) vezes
+o peso do campo; empates saem pela data mais recente.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from services.schemas import parse_data
+
+PESOS = {"descricao": 3.0, "categoria": 2.0, "conta": 1.0}
+
+# Qualidade do casamento de um termo com um token do índice
+EXATO, PREFIXO, TRECHO, APROXIMADO = 1.0, 0.8, 0.7, 0.6
+
+# Similaridade mínima (Jaccard de trigramas) para casamento aproximado
+SIM_MINIMA = 0.45
+
+_NAO_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar(texto) -> str:
+    """'Café  da Manhã!' → 'cafe da manha'."""
+    s = unicodedata.normalize("NFKD", str(texto or ""))
+    s = "".join(c for c in s if not unicodedata.combining(c)).lower()
+    return _NAO_ALNUM.sub(" ", s).strip()
+
+
+def tokens(texto) -> list[str]:
+    return normalizar(texto).split()
+
+
+def trigramas(token: str) -> set[str]:
+    """Trigramas com borda ('  ca', ' caf', ...) — palavras curtas também geram alguns."""
+    t = f"  {token} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+class IndiceBusca:
+    """Índice de busca das transações não excluídas de um snapshot."""
+
+    def __init__(self, transacoes: Iterable, categorias: Iterable = (), contas: Iterable = ()):
+        cat_nome = {c.get("id"): c.get("nome") for c in categorias if isinstance(c, dict)}
+        conta_nome = {c.get("id"): c.get("nome") for c in contas if isinstance(c, dict)}
+
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._rows: list = []
+        self._ords: list[int] = []
+
+        for tx in transacoes:
+            if tx is None or tx.get("excluido"):
+                continue
+            doc = len(self._rows)
+            self._rows.append(tx)
+            d = tx.data_ref if hasattr(tx, "data_ref") else parse_data(
+                tx.get("data_efetiva") or tx.get("data_prevista")
+            )
+            self._ords.append(d.toordinal() if d else 0)
+
+            campos = {
+                "descricao": tx.get("descricao"),
+                "categoria": cat_nome.get(tx.get("categoria_id")),
+                "conta": conta_nome.get(tx.get("conta_id")),
+            }
+            for campo, texto in campos.items():
+                peso = PESOS[campo]
+                for tok in tokens(texto):
+                    docs = self._postings[tok]
+                    if docs.get(doc, 0.0) < peso:
+                        docs[doc] = peso
+
+        self._vocab = sorted(self._postings)
+        self._trigramas: dict[str, set[str]] = defaultdict(set)
+        self._n_trigramas: dict[str, int] = {}
+        for tok in self._vocab:
+            gs = trigramas(tok)
+            self._n_trigramas[tok] = len(gs)
+            for g in gs:
+                self._trigramas[g].add(tok)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ---------------- consulta ----------------
+    def buscar(
+        self,
+        consulta: str,
+        limite: Optional[int] = 50,
+        ids: Optional[set] = None,
+    ) -> list[tuple[str, float]]:
+        """
+        [(id, pontuação)] da melhor para a pior. `ids` restringe o universo
+        (ex.: transações de uma competência); limite=None devolve todas.
+        """
+        return [(self._rows[doc].get("id"), s) for doc, s in self._ranking(consulta, limite, ids)]
+
+    def transacoes(self, consulta: str, limite: Optional[int] = 50, ids: Optional[set] = None) -> list:
+        """Mesmo que buscar(), devolvendo os registros."""
+        return [self._rows[doc] for doc, _ in self._ranking(consulta, limite, ids)]
+
+    def _ranking(self, consulta: str, limite: Optional[int], ids: Optional[set]) -> list[tuple[int, float]]:
+        """[(posição, pontuação)] da melhor para a pior."""
+        placar: Optional[dict[int, float]] = None
+        for termo in dict.fromkeys(tokens(consulta)):
+            achados = self._termo(termo)
+            if placar is None:
+                placar = achados
+            else:
+                placar = {doc: s + achados[doc] for doc, s in placar.items() if doc in achados}
+            if not placar:
+                return []
+        if not placar:
+            return []
+        if ids is not None:
+            placar = {doc: s for doc, s in placar.items() if self._rows[doc].get("id") in ids}
+        ordem = sorted(placar.items(), key=lambda kv: (-kv[1], -self._ords[kv[0]]))
+        return ordem[:limite] if limite else ordem
+
+    def _termo(self, termo: str) -> dict[int, float]:
+        """posição → melhor pontuação do termo entre os tokens que casam com ele."""
+        qualidade: dict[str, float] = {}
+
+        # Exato e prefixo: fatia contígua do vocabulário ordenado
+        i = bisect_left(self._vocab, termo)
+        while i < len(self._vocab) and self._vocab[i].startswith(termo):
+            tok = self._vocab[i]
+            qualidade[tok] = EXATO if tok == termo else PREFIXO
+            i += 1
+
+        # Trecho no meio da palavra e aproximado: candidatos por trigramas
+        if len(termo) >= 3:
+            gs = trigramas(termo)
+            comuns = Counter()
+            for g in gs:
+                for tok in self._trigramas.get(g, ()):
+                    comuns[tok] += 1
+            for tok, n in comuns.items():
+                if tok in qualidade:
+                    continue
+                if termo in tok:
+                    qualidade[tok] = TRECHO
+                    continue
+                sim = n / (len(gs) + self._n_trigramas[tok] - n)
+                if sim >= SIM_MINIMA:
+                    qualidade[tok] = APROXIMADO * sim
+
+        out: dict[int, float] = {}
+        for tok, q in qualidade.items():
+            for doc, peso in self._postings[tok].items():
+                s = q * peso
+                if s > out.get(doc, 0.0):
+                    out[doc] = s
+        return out
@@ -1,10 +1,16 @@
 
 # services/competencia.py
+import calendar
 from datetime import date
 
 def competencia_from_date(d: date) -> str:
     return f"{d.year}-{d.month:02d}"
 
+def limites_competencia(comp: str) -> tuple[date, date]:
+    """'aaaa-mm' → (primeiro dia, último dia) do mês."""
+    y, m = (int(x) for x in comp.split("-"))
+    return date(y, m, 1), date(y, m, calendar.monthrange(y, m)[1])
+
 def label_competencia(comp: str) -> str:
     try:
         y, m = comp.split("-")
@@ -1,8 +1,15 @@
 
 # services/data_loader.py
+import copy
+import logging
+import threading
+
 import streamlit as st
 from services.app_context import get_context
 from services.finance_core import novo_id
+from services.resumos import Resumos
+
+logger = logging.getLogger("financeiro")
 
 DEFAULTS = {
     "data/usuarios.json": [
@@ -29,8 +36,64 @@ DEFAULTS = {
     "data/contas_pagar.json": [],
     "data/contas_receber.json": [],
     "data/orcamentos.json": [],
+    "data/resumos.json": Resumos().to_dict(),
 }
 
+# ---------- Snapshot em memória (nível de processo) ----------
+# {(repo, branch): {path: (obj, sha)}}
+_SNAPSHOTS: dict = {}
+_SNAPSHOT_LOCK = threading.Lock()
+
+def _atualizar_snapshot(gh, snap_key: tuple) -> dict:
+    """
+    Mantém o snapshot de `data/` do processo:
+    - Frio (processo novo / snapshot vazio): baixa o tarball do branch uma vez.
+    - Quente: lista `data/` (1 chamada) e relê apenas arquivos com sha diferente.
+    """
+    with _SNAPSHOT_LOCK:
+        snap = _SNAPSHOTS.get(snap_key)
+        if not snap:
+            try:
+                snap = gh.download_archive("data/")
+                logger.info(f"Bootstrap via tarball: {len(snap)} arquivo(s) de data/.")
+            except Exception as e:
+                logger.warning(f"Bootstrap via tarball falhou, usando leitura por arquivo: {e}")
+                snap = {}
+            _SNAPSHOTS[snap_key] = snap
+            return snap
+
+        try:
+            remotos = gh.list_dir("data")
+        except Exception as e:
+            logger.warning(f"Falha ao listar data/: {e}")
+            return snap
+
+        for path in list(snap):
+            if path not in remotos:
+                snap.pop(path)
+        for path, sha in remotos.items():
+            if not path.endswith(".json"):
+                continue
+            if path in snap and snap[path][1] == sha:
+                continue
+            obj, new_sha = gh.get_json(path)
+            if new_sha:
+                snap[path] = (obj, new_sha)
+        return snap
+
+def _ler_arquivo(gh, snap: dict, path: str, default):
+    with _SNAPSHOT_LOCK:
+        entrada = snap.get(path)
+    if entrada is not None:
+        obj, sha = entrada
+        # Cópia: load_all() normaliza in-place e não pode alterar o snapshot
+        return copy.deepcopy(obj), sha
+    obj, sha = gh.ensure_file(path, default)
+    if sha:
+        with _SNAPSHOT_LOCK:
+            snap[path] = (copy.deepcopy(obj), sha)
+    return obj, sha
+
 def _sanitizar_lista(gh, path: str, obj, sha: str, commit_msg: str):
     if not isinstance(obj, list):
         clean = []
@@ -104,9 +167,10 @@ def load_all(cache_key: tuple):
     if not ctx.get("connected"):
         raise RuntimeError("Não conectado ao GitHub.")
     gh = ctx.get("gh")
+    snap = _atualizar_snapshot(gh, (gh.repo, gh.branch))
     data = {}
     for path, default in DEFAULTS.items():
-        obj, sha = gh.ensure_file(path, default)
+        obj, sha = _ler_arquivo(gh, snap, path, default)
         data[path] = {"content": obj, "sha": sha}
 
     _migrar_legado(gh, data)
@@ -125,6 +189,34 @@ def load_all(cache_key: tuple):
     return data
 
 # ---------- Helpers públicos ----------
+def salvar_transacoes(
+    gh,
+    transacoes,
+    mensagem: str,
+    sha: str,
+    resumos: Resumos | None = None,
+    sha_resumos: str | None = None,
+) -> str:
+    """
+    Grava transacoes.json (TransactionStore) e retorna o novo sha.
+
+    Com `resumos` (o Resumos já atualizado por delta, ex.:
+    derivados["resumos"]), grava em seguida resumos.json marcado com o
+    novo sha, para que o próximo carregamento use o arquivo em vez de
+    reconstruir. Se essa segunda gravação falhar, o arquivo fica
+    defasado e Resumos.carregar reconstrói — a escrita das transações
+    não é desfeita.
+    """
+    novo_sha = gh.put_json("data/transacoes.json", transacoes.to_list(), mensagem, sha=sha)
+    if resumos is not None:
+        conteudo = resumos.to_dict()
+        conteudo["sha_transacoes"] = novo_sha
+        try:
+            gh.put_json("data/resumos.json", conteudo, f"{mensagem} (resumos)", sha=sha_resumos)
+        except Exception as e:
+            logger.warning(f"Falha ao gravar resumos.json: {e}")
+    return novo_sha
+
 def listar_categorias(gh):
     cats, sha = gh.ensure_file("data/categorias.json", DEFAULTS["data/categorias.json"])
     cats = [c for c in cats if isinstance(c, dict)]
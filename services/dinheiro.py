@@ -0,0 +1,68 @@
+"""
+Valores monetários em centavos inteiros.
+
+O JSON continua guardando reais (`"valor": 192.49`); a conversão para
+centavos acontece na leitura e somas/saldos são feitos em int (exatos,
+sem deriva de float). A volta para reais só ocorre na exibição/gravação.
+
+Regra única de arredondamento, para str, float, Decimal e Series: meio
+centavo arredonda para longe do zero (ROUND_HALF_UP) sobre o valor como
+escrito no JSON, ou seja, pela representação decimal mais curta do float
+(centavos("0.125") == centavos(0.125) == 13; centavos(1.005) == 101).
+"""
+
+import math
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# |fração - 0,5| abaixo disso é tratado como empate e decidido em Decimal
+_EMPATE = 1e-6
+
+
+def centavos(v: Any) -> int:
+    """
+    Converte um valor em reais (int, float, str numérica, Decimal) para
+    centavos. Inválidos/None viram 0.
+    """
+    if isinstance(v, bool) or v is None:
+        return 0
+    if isinstance(v, int):
+        return v * 100
+    if isinstance(v, float):
+        if not math.isfinite(v):
+            return 0
+        x = abs(v * 100)
+        if abs(x - math.floor(x) - 0.5) >= _EMPATE:
+            return int(round(v * 100))  # sem empate: round() já é exato
+        v = repr(v)
+    try:
+        return int((Decimal(str(v).strip()) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):
+        return 0
+
+
+def reais(c: int) -> float:
+    """Centavos → reais (float com no máximo 2 casas, para JSON/gráficos)."""
+    return c / 100
+
+
+def centavos_series(s: pd.Series) -> pd.Series:
+    """Versão vetorizada de centavos() para uma coluna de valores (int64), mesma regra."""
+    v = pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    v = np.where(np.isfinite(v), v, 0.0)
+    x = np.abs(v * 100)
+    out = np.sign(v) * np.floor(x + 0.5)
+    empate = np.abs(x - np.floor(x) - 0.5) < _EMPATE
+    if empate.any():
+        out[empate] = [centavos(float(f)) for f in v[empate]]
+    return pd.Series(out.astype("int64"), index=s.index, name=s.name)
+
+
+def fmt_centavos(c: int) -> str:
+    """Formata centavos como BRL ('R$ 1.234,56', '-R$ 0,50')."""
+    inteiro, cent = divmod(abs(int(c)), 100)
+    prefix = "-" if c < 0 else ""
+    return f"{prefix}R$ {inteiro:,}".replace(",", ".") + f",{cent:02d}"
@@ -1,13 +1,15 @@
 
 # services/finance_core.py
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import uuid
-import copy
 import calendar
-from decimal import Decimal, ROUND_HALF_UP, getcontext
-from typing import Optional  # CHANGE: compatibilidade Python 3.9+
+import random
+import threading
+from typing import Callable, Iterator, Optional  # CHANGE: compatibilidade Python 3.9+
 
-getcontext().rounding = ROUND_HALF_UP
+from services.dinheiro import centavos, reais
+from services.indices import IndiceDatas
+from services.schemas import Transacao, parse_data
 
 # ---------------------------------------------------------
 # Utilitário: adicionar meses mantendo o dia válido
@@ -23,24 +25,57 @@ def add_months(d: date, months: int) -> date:
 # ---------------------------------------------------------
 # IDs rastreáveis
 # ---------------------------------------------------------
+class _AlocadorIds:
+    """
+    Sufixos monotônicos por segundo (sem colisão dentro do processo).
+    Começa de um offset aleatório a cada segundo para reduzir colisões
+    entre processos, como o sufixo aleatório fazia.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ts = ""
+        self._seq = 0
+
+    def proximos(self, prefix: str, n: int) -> list[str]:
+        with self._lock:
+            ts = datetime.now().strftime("%Y%m%d%H%M%S")
+            if ts > self._ts:
+                self._ts = ts
+                self._seq = random.randrange(0x8000)
+            inicio = self._seq
+            self._seq += n
+            return [f"{prefix}-{self._ts}-{i:04x}" for i in range(inicio, inicio + n)]
+
+
+_ALOCADOR_IDS = _AlocadorIds()
+
+
 def novo_id(prefix: str) -> str:
     """Gera ID único com prefixo e timestamp (ex.: 'tx-20260108123045-abcd')."""
-    ts = datetime.now().strftime("%Y%m%d%H%M%S")
-    rand = uuid.uuid4().hex[:4]
-    return f"{prefix}-{ts}-{rand}"
+    return _ALOCADOR_IDS.proximos(prefix, 1)[0]
+
+
+def novos_ids(prefix: str, n: int) -> list[str]:
+    """Gera `n` IDs únicos e crescentes de uma vez (mesmo formato de novo_id)."""
+    return _ALOCADOR_IDS.proximos(prefix, n)
 
 
 # ---------------------------------------------------------
 # CRUD básico (imutável no contrato)
 # ---------------------------------------------------------
-def criar(lista: list, item: dict):
-    """Append do item na lista."""
+def criar(lista, item: dict):
+    """Append do item na lista (ou TransactionStore)."""
+    if isinstance(lista, TransactionStore):
+        return lista.criar(item)
     lista.append(item)
     return item
 
 
-def atualizar(lista: list, item_atualizado: dict) -> bool:
-    """Atualiza item da lista por ID e marca 'atualizado_em'."""
+def atualizar(lista, item_atualizado: dict) -> bool:
+    """Atualiza item da lista (ou TransactionStore) por ID e marca 'atualizado_em'."""
+    if isinstance(lista, TransactionStore):
+        return lista.atualizar(item_atualizado)
     for i, x in enumerate(lista):
         if x.get("id") == item_atualizado.get("id"):
             lista[i] = item_atualizado
@@ -49,8 +84,10 @@ def atualizar(lista: list, item_atualizado: dict) -> bool:
     return False
 
 
-def excluir(lista: list, item_id: str) -> bool:
+def excluir(lista, item_id: str) -> bool:
     """Marca o item como excluído (soft-delete) e armazena 'excluido_em'."""
+    if isinstance(lista, TransactionStore):
+        return lista.excluir(item_id)
     for x in lista:
         if x.get("id") == item_id and not x.get("excluido", False):
             x["excluido"] = True
@@ -61,6 +98,7 @@ def excluir(lista: list, item_id: str) -> bool:
 
 # ---------------------------------------------------------
 # Baixar / Estornar
+# (aceitam dict ou Transacao — ambos suportam [] / pop)
 # ---------------------------------------------------------
 def baixar(tx: dict, forma_pagamento: Optional[str] = None) -> None:
     """
@@ -82,39 +120,209 @@ def estornar(tx: dict) -> None:
     tx.pop("forma_pagamento", None)
 
 
+# ---------------------------------------------------------
+# Store em memória com índice por id e por código
+# ---------------------------------------------------------
+Observador = Callable[[Optional[Transacao], Optional[Transacao]], None]
+
+
+class TransactionStore:
+    """
+    Transações como registros `Transacao` (__slots__) com índices O(1)
+    por `id` e por `codigo`.
+
+    - from_list()/to_list() fazem round-trip com o JSON de transacoes.json
+    - from_records() reaproveita registros já normalizados (cache por sha)
+      sem copiá-los; cada registro só é copiado na sua primeira escrita
+    - criar/atualizar/excluir/baixar/estornar/reagendar alteram o registro
+      no lugar (sem copiar a lista) e notificam os observadores com
+      (antes, depois) — antes=None em criações.
+
+    Não altere registros diretamente: use os métodos do store para que
+    índices e observadores vejam a mudança.
+    """
+
+    def __init__(self, rows: Optional[list] = None, compartilhado: bool = False):
+        self._rows: list[Transacao] = []
+        self._pos: dict[str, int] = {}
+        self._pos_codigo: dict[int, int] = {}
+        self._observadores: list[Observador] = []
+        # Registros compartilhados (cache) são copiados antes da 1ª escrita
+        self._compartilhado = compartilhado
+        self._proprios: set[int] = set()
+        for r in rows or []:
+            self._indexar(r)
+
+    @classmethod
+    def from_list(cls, itens: list) -> "TransactionStore":
+        """Cria o store a partir do JSON (ignora itens não-dict)."""
+        return cls([Transacao.from_dict(x) for x in itens if isinstance(x, dict)])
+
+    @classmethod
+    def from_records(cls, rows) -> "TransactionStore":
+        """Cria o store sobre registros compartilhados (copy-on-write)."""
+        return cls(list(rows), compartilhado=True)
+
+    def to_list(self) -> list[dict]:
+        return [r.to_dict() for r in self._rows]
+
+    # ---------------- leitura ----------------
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[Transacao]:
+        return iter(self._rows)
+
+    def get(self, tx_id: str) -> Optional[Transacao]:
+        i = self._pos.get(tx_id)
+        return None if i is None else self._rows[i]
+
+    def por_codigo(self, codigo: int) -> Optional[Transacao]:
+        i = self._pos_codigo.get(codigo)
+        return None if i is None else self._rows[i]
+
+    def proximo_codigo(self) -> int:
+        return max(self._pos_codigo, default=0) + 1
+
+    def observar(self, fn: Observador) -> None:
+        """Registra fn(antes, depois), chamado após cada alteração."""
+        self._observadores.append(fn)
+
+    # ---------------- escrita ----------------
+    def criar(self, item) -> Transacao:
+        row = item if isinstance(item, Transacao) else Transacao.from_dict(item)
+        self._indexar(row)
+        self._proprios.add(len(self._rows) - 1)
+        self._notificar(None, row)
+        return row
+
+    def atualizar(self, item) -> bool:
+        """Substitui o registro de mesmo id e marca 'atualizado_em'."""
+        atual = self._editavel(item.get("id"))
+        if atual is None:
+            return False
+        novo = Transacao.from_dict(item.to_dict() if isinstance(item, Transacao) else item)
+        novo["atualizado_em"] = datetime.now().isoformat()
+        antes = atual.copia()
+        for k in Transacao.__slots__:
+            setattr(atual, k, getattr(novo, k))
+        if antes.codigo != atual.codigo:
+            self._pos_codigo.pop(antes.codigo, None)
+            if isinstance(atual.codigo, int):
+                self._pos_codigo[atual.codigo] = self._pos[atual.id]
+        self._notificar(antes, atual)
+        return True
+
+    def excluir(self, tx_id: str) -> bool:
+        row = self.get(tx_id)
+        if row is None or row.excluido:
+            return False
+        return self._alterar(tx_id, _marcar_excluido, carimbo=False)
+
+    def baixar(self, tx_id: str, forma_pagamento: Optional[str] = None) -> bool:
+        return self._alterar(tx_id, lambda r: baixar(r, forma_pagamento))
+
+    def estornar(self, tx_id: str) -> bool:
+        return self._alterar(tx_id, estornar)
+
+    def reagendar(self, tx_id: str, data_prevista: str) -> bool:
+        return self._alterar(tx_id, lambda r: r.__setitem__("data_prevista", data_prevista))
+
+    # ---------------- internos ----------------
+    def _indexar(self, row: Transacao) -> None:
+        i = len(self._rows)
+        self._rows.append(row)
+        if row.id:
+            self._pos[row.id] = i
+        if isinstance(row.codigo, int):
+            self._pos_codigo[row.codigo] = i
+
+    def _editavel(self, tx_id: str) -> Optional[Transacao]:
+        i = self._pos.get(tx_id)
+        if i is None:
+            return None
+        if self._compartilhado and i not in self._proprios:
+            self._rows[i] = self._rows[i].copia()
+            self._proprios.add(i)
+        return self._rows[i]
+
+    def _alterar(self, tx_id: str, fn: Callable[[Transacao], None], carimbo: bool = True) -> bool:
+        row = self._editavel(tx_id)
+        if row is None:
+            return False
+        antes = row.copia()
+        fn(row)
+        if carimbo:
+            row["atualizado_em"] = datetime.now().isoformat()
+        self._notificar(antes, row)
+        return True
+
+    def _notificar(self, antes: Optional[Transacao], depois: Optional[Transacao]) -> None:
+        for fn in self._observadores:
+            fn(antes, depois)
+
+
+def _marcar_excluido(row: Transacao) -> None:
+    row["excluido"] = True
+    row["excluido_em"] = datetime.now().isoformat()
+
+
 # ---------------------------------------------------------
 # Parcelamento com precisão contábil
 # ---------------------------------------------------------
-def gerar_parcelas(item_base: dict, qtd_parcelas: int, intervalo_meses: int = 1) -> list:
+def gerar_parcelas(
+    item_base: dict,
+    qtd_parcelas: int,
+    intervalo_meses: int = 1,
+    intervalo_dias: Optional[int] = None,
+) -> list:
     """
-    Gera parcelas com divisão em Decimal e ajuste na última parcela.
-    Mantém o grupo de parcelamento e incrementa data prevista por mês.
+    Gera parcelas com divisão exata em centavos e ajuste na última parcela:
+    as primeiras valem o piso da divisão e a última leva o resto, então
+    nunca fica negativa (R$ 10,00 em 3 → 3,33 + 3,33 + 3,34).
+    Mantém o grupo de parcelamento e incrementa a data prevista a cada
+    `intervalo_meses` meses (ou `intervalo_dias` dias, se informado).
+
+    As parcelas compartilham os valores não alterados do item base (cópia
+    rasa); só id, código, valor, datas e parcelamento são próprios de cada uma.
+    Se o item base tem `codigo`, as parcelas recebem códigos sequenciais.
     """
     if qtd_parcelas < 1:
         raise ValueError("Qtd de parcelas deve ser >= 1")
 
-    total = Decimal(str(item_base["valor"]))
-    base_valor = (total / Decimal(qtd_parcelas)).quantize(Decimal("0.01"))
-
-    valores = [base_valor] * qtd_parcelas
-    ajuste_final = (total - sum(valores)).quantize(Decimal("0.01"))
-    valores[-1] += ajuste_final
+    # Divisão inteira (piso): a última parcela leva o resto
+    total = centavos(item_base["valor"])
+    base_c = total // qtd_parcelas
+    valor_comum = reais(base_c)
+    valor_ultima = reais(total - base_c * (qtd_parcelas - 1))
 
-    group_id = item_base.get("parcelamento", {}).get("grupo_id") or f"parc-{uuid.uuid4().hex[:8]}"
+    group_id = (item_base.get("parcelamento") or {}).get("grupo_id") or f"parc-{uuid.uuid4().hex[:8]}"
     data_ref = datetime.fromisoformat(item_base["data_prevista"]).date()
+    codigo = item_base.get("codigo")
+    ids = novos_ids("tx", qtd_parcelas)
+
+    if intervalo_dias:
+        passo = timedelta(days=intervalo_dias)
+        datas = [(data_ref + passo * i).isoformat() for i in range(qtd_parcelas)]
+    else:
+        datas = [add_months(data_ref, i * intervalo_meses).isoformat() for i in range(qtd_parcelas)]
+
+    template = dict(item_base)
+    template["data_efetiva"] = None
 
     parcelas = []
     for i in range(qtd_parcelas):
-        p = copy.deepcopy(item_base)
-        p["id"] = novo_id("tx")
-        p["valor"] = float(valores[i])
+        p = template.copy()
+        p["id"] = ids[i]
+        if isinstance(codigo, int):
+            p["codigo"] = codigo + i
+        p["valor"] = valor_ultima if i == qtd_parcelas - 1 else valor_comum
         p["parcelamento"] = {
             "grupo_id": group_id,
             "parcela": i + 1,
             "total_parcelas": qtd_parcelas,
         }
-        p["data_prevista"] = add_months(data_ref, i * intervalo_meses).isoformat()
-        p["data_efetiva"] = None
+        p["data_prevista"] = datas[i]
         parcelas.append(p)
 
     return parcelas
@@ -126,9 +334,9 @@ def gerar_parcelas(item_base: dict, qtd_parcelas: int, intervalo_meses: int = 1)
 def saldo_atual(conta: dict, transacoes: list) -> float:
     """
     Calcula saldo atual de uma conta considerando apenas transações efetivadas
-    (receitas somam, despesas subtraem).
+    (receitas somam, despesas subtraem). Soma exata em centavos.
     """
-    saldo = float(conta.get("saldo_inicial", 0.0))
+    saldo = centavos(conta.get("saldo_inicial", 0.0))
 
     for tx in transacoes:
         if tx.get("conta_id") != conta.get("id"):
@@ -138,10 +346,10 @@ def saldo_atual(conta: dict, transacoes: list) -> float:
         if not tx.get("data_efetiva"):
             continue
 
-        v = float(tx.get("valor", 0.0))
+        v = centavos(tx.get("valor", 0.0))
         saldo += v if tx.get("tipo") == "receita" else -v
 
-    return round(saldo, 2)
+    return reais(saldo)
 
 
 # ---------------------------------------------------------
@@ -178,18 +386,21 @@ def ativos(lista: list) -> list:
     return [x for x in lista if isinstance(x, dict) and not x.get("excluido")]
 
 
-def filtrar_periodo(lista: list, ini: date, fim: date) -> list:
+def filtrar_periodo(lista, ini: date, fim: date) -> list:
     """
     Filtra transações pela data de referência:
     - Prioriza data_efetiva; senão usa data_prevista.
     - Inclui somente itens não excluídos dentro do intervalo [ini, fim].
+
+    Com um IndiceDatas a consulta é por busca binária (sem varrer a lista).
     """
+    if isinstance(lista, IndiceDatas):
+        return lista.periodo(ini, fim)
     out = []
     for x in lista:
-        try:
-            d = datetime.fromisoformat(x.get("data_efetiva") or x.get("data_prevista")).date()
-            if ini <= d <= fim and not x.get("excluido"):
-                out.append(x)
-        except Exception:
-            pass
+        if x.get("excluido"):
+            continue
+        d = x.data_ref if isinstance(x, Transacao) else parse_data(x.get("data_efetiva") or x.get("data_prevista"))
+        if d is not None and ini <= d <= fim:
+            out.append(x)
     return out
@@ -13,20 +13,124 @@ Este módulo centraliza:
 """
 
 from datetime import date
+import numpy as np
 import pandas as pd
 
+from services.dinheiro import centavos, centavos_series
+from services.status import STATUS
+
+
+# ---------------------------------------------------------
+# Esquema compacto do DataFrame
+# ---------------------------------------------------------
+# Datas em datetime64[s] normalizado (o pandas não tem resolução [D]):
+# 8 bytes por linha contra ~50 de um objeto `date`, e comparações
+# vetorizadas. Limites `date` devem virar Timestamp (ver entre()).
+TIPO_DTYPE = pd.CategoricalDtype(["despesa", "receita"])
+STATUS_DTYPE = pd.CategoricalDtype(list(STATUS))
+COLUNAS_DATA = ("data_prevista", "data_efetiva", "data_ref")
+COLUNAS_CATEGORIA = ("conta_id", "categoria_id")
+
+
+def datas64(s) -> pd.Series:
+    """Converte para datetime64[s] à meia-noite (inválidos → NaT)."""
+    return pd.to_datetime(s, errors="coerce").dt.normalize().astype("datetime64[s]")
+
+
+def compactar_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica o esquema compacto às colunas presentes:
+    - datas: datetime64[s]
+    - tipo / status / conta_id / categoria_id: category
+    - excluido: bool
+    - centavos: int64 (valor segue float64 para gráficos e exibição)
+    """
+    for col in COLUNAS_DATA:
+        if col in df and not pd.api.types.is_datetime64_dtype(df[col]):
+            df[col] = datas64(df[col])
+    if "tipo" in df:
+        df["tipo"] = df["tipo"].astype(TIPO_DTYPE)
+    if "status" in df:
+        df["status"] = df["status"].astype(STATUS_DTYPE)
+    for col in COLUNAS_CATEGORIA:
+        if col in df:
+            df[col] = df[col].astype("category")
+    if "excluido" in df:
+        df["excluido"] = df["excluido"].fillna(False).astype(bool)
+    if "centavos" in df:
+        df["centavos"] = df["centavos"].astype("int64")
+    if "valor" in df:
+        df["valor"] = df["valor"].astype("float64")
+    return df
+
+
+def entre(s: pd.Series, inicio: date, fim: date) -> pd.Series:
+    """s.between(inicio, fim) para colunas datetime64 com limites `date`."""
+    return s.between(pd.Timestamp(inicio), pd.Timestamp(fim))
+
+
+def coluna_status(df: pd.DataFrame, hoje: date) -> pd.Series:
+    """
+    status (STATUS_DTYPE) de todas as linhas de uma vez — mesma regra de
+    status.derivar_status, com `hoje` fixo. Por versão dos dados e dia use
+    snapshot.frame_com_status.
+    """
+    if df.empty:
+        return pd.Series(pd.Categorical([], dtype=STATUS_DTYPE), index=df.index)
+    h = pd.Timestamp(hoje)
+    prev = df["data_prevista"]
+    rotulos = np.select(
+        [df["data_efetiva"].notna(), prev < h, prev == h],
+        ["paga", "vencida", "vencendo"],
+        default="planejada",
+    )
+    return pd.Series(pd.Categorical(rotulos, dtype=STATUS_DTYPE), index=df.index)
+
+
+def relatorio_memoria(df: pd.DataFrame) -> pd.DataFrame:
+    """Bytes por coluna (deep=True), do maior para o menor, com linha TOTAL."""
+    uso = df.memory_usage(deep=True, index=True)
+    rel = pd.DataFrame({
+        "dtype": [("index" if c == "Index" else str(df[c].dtype)) for c in uso.index],
+        "bytes": uso.to_numpy(),
+    }, index=uso.index).sort_values("bytes", ascending=False)
+    rel.loc["TOTAL"] = ["", int(uso.sum())]
+    rel["KiB"] = (rel["bytes"] / 1024).round(1)
+    return rel
+
 
 # ---------------------------------------------------------
 # Normalização base (DEVE ser chamada uma única vez)
 # ---------------------------------------------------------
+def parse_datas(series) -> pd.Series:
+    """
+    Converte datas em duas passadas:
+    1) ISO 8601 (aaaa-mm-dd[Thh:mm...])
+    2) Formato brasileiro (dayfirst=True) só para o que falhou
+    Retorna datetime64[s] à meia-noite (NaT quando não possível).
+    """
+    if series is None:
+        return pd.Series(dtype="datetime64[s]")
+    s1 = pd.to_datetime(series, errors="coerce", format="ISO8601")
+    mask = s1.isna() & series.notna()
+    if mask.any():
+        s1 = s1.copy()
+        s1[mask] = pd.to_datetime(series[mask], errors="coerce", dayfirst=True)
+    return datas64(s1)
+
+
 def preparar_transacoes_df(transacoes: list[dict]) -> pd.DataFrame:
     """
-    Constrói um DataFrame seguro e consistente a partir das transações.
+    Constrói o DataFrame canônico das transações (único construtor do app;
+    por versão dos dados use snapshot.frame_transacoes).
 
     Regras:
     - remove registros excluídos
-    - converte campos de data corretamente
-    - cria coluna `data_ref` (efetiva > prevista)
+    - tipo normalizado (strip/lower); tipos inválidos são descartados
+    - datas ISO ou dd/mm/aaaa (parse_datas)
+    - cria coluna `data_ref` (efetiva > prevista); linhas sem data são descartadas
+    - cria coluna `centavos` (int64) — somas exatas, sem deriva de float
+    - esquema compacto (compactar_df): datas datetime64, categorias
     """
     if not transacoes:
         return pd.DataFrame()
@@ -34,25 +138,42 @@ def preparar_transacoes_df(transacoes: list[dict]) -> pd.DataFrame:
     df = pd.DataFrame(transacoes)
 
     # Campos obrigatórios defensivos
-    for col in ("valor", "excluido"):
+    for col, default in (("valor", 0.0), ("excluido", False), ("tipo", ""),
+                         ("data_prevista", None), ("data_efetiva", None)):
         if col not in df:
-            df[col] = 0 if col == "valor" else False
+            df[col] = default
 
-    # Tipos
+    # Valor (reais) + centavos inteiros
     df["valor"] = pd.to_numeric(df["valor"], errors="coerce").fillna(0.0)
-    df["excluido"] = df["excluido"].fillna(False)
-
-    # Datas
-    df["data_prevista"] = pd.to_datetime(df.get("data_prevista"), errors="coerce").dt.date
-    df["data_efetiva"] = pd.to_datetime(df.get("data_efetiva"), errors="coerce").dt.date
+    df["centavos"] = centavos_series(df["valor"])
 
     # Remove soft-deletes
-    df = df[df["excluido"] == False]
+    df["excluido"] = df["excluido"].fillna(False).astype(bool)
+    df = df[~df["excluido"]]
+
+    # Tipo normalizado
+    df["tipo"] = df["tipo"].astype(str).str.strip().str.lower()
+    df = df[df["tipo"].isin(TIPO_DTYPE.categories)]
+
+    # Datas com tolerância (ISO + dd/mm/aaaa)
+    df["data_prevista"] = parse_datas(df["data_prevista"])
+    df["data_efetiva"] = parse_datas(df["data_efetiva"])
 
     # Data de referência única
     df["data_ref"] = df["data_efetiva"].combine_first(df["data_prevista"])
+    df = df.dropna(subset=["data_ref"])
+
+    return compactar_df(df.reset_index(drop=True))
 
-    return df.reset_index(drop=True)
+
+def concatenar(*frames: pd.DataFrame) -> pd.DataFrame:
+    """Concatena frames canônicos (ex.: snapshot + ocorrências virtuais) mantendo o esquema."""
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    return compactar_df(pd.concat(frames, ignore_index=True))
 
 
 # ---------------------------------------------------------
@@ -82,27 +203,98 @@ def kpis_mes(df: pd.DataFrame, inicio: date, fim: date) -> dict:
             "saldo_prev": 0.0,
         }
 
-    periodo = df[df["data_ref"].between(inicio, fim)]
+    periodo = df[entre(df["data_ref"], inicio, fim)]
 
-    realizadas = periodo[periodo["data_efetiva"].notna()]
-    previstas = periodo[periodo["data_efetiva"].isna()]
+    # Um único groupby (tipo × realizado) no lugar de quatro .query()
+    somas = periodo.groupby(["tipo", periodo["data_efetiva"].notna()])["centavos"].sum()
+    return kpis_de_somas(somas)
 
-    rec_real = realizadas.query("tipo == 'receita'")["valor"].sum()
-    des_real = realizadas.query("tipo == 'despesa'")["valor"].sum()
 
-    rec_prev = previstas.query("tipo == 'receita'")["valor"].sum()
-    des_prev = previstas.query("tipo == 'despesa'")["valor"].sum()
+def kpis_de_somas(somas) -> dict:
+    """
+    Somas em centavos indexadas por (tipo, realizado) — Series ou dict —
+    → dict de KPIs em reais (a única conversão para reais).
+    """
+    def pegar(tipo: str, realizado: bool) -> int:
+        return int(somas.get((tipo, realizado), 0))
+
+    rec_real = pegar("receita", True)
+    des_real = pegar("despesa", True)
+    rec_prev = pegar("receita", False)
+    des_prev = pegar("despesa", False)
 
     return {
-        "rec_real": rec_real,
-        "des_real": des_real,
-        "rec_prev": rec_prev,
-        "des_prev": des_prev,
-        "saldo_real": rec_real - des_real,
-        "saldo_prev": rec_prev - des_prev,
+        "rec_real": rec_real / 100,
+        "des_real": des_real / 100,
+        "rec_prev": rec_prev / 100,
+        "des_prev": des_prev / 100,
+        "saldo_real": (rec_real - des_real) / 100,
+        "saldo_prev": (rec_prev - des_prev) / 100,
     }
 
 
+# ---------------------------------------------------------
+# Cubo de KPIs (competência × tipo × realizado)
+# ---------------------------------------------------------
+def cubo_kpis(
+    df: pd.DataFrame,
+    por_conta: bool = False,
+    por_categoria: bool = False,
+) -> pd.DataFrame:
+    """
+    Agrega todo o histórico em UM groupby.
+
+    Índice: competencia ('aaaa-mm') × tipo × realizado [× conta_id] [× categoria_id]
+    Colunas: centavos (soma), qtd (nº de transações)
+
+    KPIs de qualquer mês ou intervalo viram consultas ao cubo (kpis_cubo).
+    """
+    niveis = ["competencia", "tipo", "realizado"]
+    if por_conta:
+        niveis.append("conta_id")
+    if por_categoria:
+        niveis.append("categoria_id")
+
+    if df.empty:
+        idx = pd.MultiIndex.from_arrays([[] for _ in niveis], names=niveis)
+        return pd.DataFrame({"centavos": pd.Series(dtype="int64"), "qtd": pd.Series(dtype="int64")}, index=idx)
+
+    datas = pd.to_datetime(df["data_ref"], errors="coerce")
+    base = pd.DataFrame({
+        "competencia": datas.dt.strftime("%Y-%m"),
+        "tipo": df["tipo"],
+        "realizado": df["data_efetiva"].notna(),
+        "centavos": df["centavos"],
+    })
+    for col, ativo in (("conta_id", por_conta), ("categoria_id", por_categoria)):
+        if ativo:
+            base[col] = df[col].astype(object).fillna("—") if col in df else "—"
+    base = base[datas.notna()]
+
+    return (
+        base.groupby(niveis, sort=True)["centavos"]
+        .agg(centavos="sum", qtd="size")
+    )
+
+
+def kpis_cubo(cubo: pd.DataFrame, comp_ini: str, comp_fim: str | None = None) -> dict:
+    """
+    KPIs (mesmo formato de kpis_mes) para a competência `comp_ini` ou para
+    o intervalo [comp_ini, comp_fim], lidos do cubo.
+    """
+    return kpis_de_somas(somas_cubo(cubo, comp_ini, comp_fim))
+
+
+def somas_cubo(cubo: pd.DataFrame, comp_ini: str, comp_fim: str | None = None) -> dict[tuple[str, bool], int]:
+    """(tipo, realizado) → centavos da competência `comp_ini` ou do intervalo."""
+    comp_fim = comp_fim or comp_ini
+    if cubo.empty:
+        return {}
+    fatia = cubo.loc[comp_ini:comp_fim]
+    somas = fatia.groupby(level=["tipo", "realizado"])["centavos"].sum()
+    return {(str(t), bool(r)): int(v) for (t, r), v in somas.items()}
+
+
 # ---------------------------------------------------------
 # Despesas por categoria
 # ---------------------------------------------------------
@@ -123,7 +315,7 @@ def despesas_por_categoria(
 
     despesas = df[
         (df["tipo"] == "despesa")
-        & (df["data_ref"].between(inicio, fim))
+        & (entre(df["data_ref"], inicio, fim))
     ].copy()
 
     if despesas.empty:
@@ -131,21 +323,118 @@ def despesas_por_categoria(
 
     despesas["Categoria"] = (
         despesas["categoria_id"]
+        .astype(object)
         .map(cat_map)
         .fillna("Sem categoria")
     )
 
     return (
         despesas
-        .groupby("Categoria")["valor"]
+        .groupby("Categoria")["centavos"]
         .sum()
+        .div(100)
         .sort_values(ascending=False)
     )
 
 
 # ---------------------------------------------------------
-# Série de saldo acumulado
+# Série de saldo acumulado (vetorizada)
 # ---------------------------------------------------------
+# Granularidades aceitas → regra do pandas (fim do período)
+FREQUENCIAS = {"D": "D", "W": "W", "M": "ME"}
+
+
+def fluxo_assinado(df: pd.DataFrame) -> pd.Series:
+    """Centavos com sinal (receita +, despesa −), sem apply por linha."""
+    sinal = np.where(df["tipo"].to_numpy() == "receita", 1, -1)
+    return pd.Series(df["centavos"].to_numpy(dtype="int64") * sinal, index=df.index)
+
+
+def saldos_iniciais(contas: list) -> dict[str, int]:
+    """saldo_inicial de cada conta, em centavos."""
+    return {
+        c.get("id"): centavos(c.get("saldo_inicial", 0.0))
+        for c in contas
+        if isinstance(c, dict)
+    }
+
+
+def serie_saldo(
+    df: pd.DataFrame,
+    inicio: date,
+    fim: date,
+    freq: str = "D",
+    conta_id: str | None = None,
+    por_conta: bool = False,
+    incluir_previstas: bool = False,
+    iniciais: dict[str, int] | None = None,
+) -> pd.Series | pd.DataFrame:
+    """
+    Saldo ao final de cada período (freq "D", "W" ou "M") de [inicio, fim].
+
+    - conta_id: restringe a uma conta
+    - por_conta=True: DataFrame com uma coluna por conta; senão, Series total
+    - iniciais (ver saldos_iniciais): abre com saldo_inicial + movimento
+      anterior a `inicio`, como um extrato. Transações de contas fora do
+      dict são ignoradas (mesma regra de SaldosContas).
+      Sem iniciais, acumula a partir de zero em `inicio`.
+
+    Tudo em operações de coluna: groupby diário → reindex → cumsum → resample.
+    """
+    if freq not in FREQUENCIAS:
+        raise ValueError(f"freq deve ser um de {sorted(FREQUENCIAS)}")
+
+    dias = pd.date_range(pd.Timestamp(inicio), pd.Timestamp(fim), freq="D")
+
+    base = df
+    if not base.empty:
+        if not incluir_previstas:
+            base = base[base["data_efetiva"].notna()]
+        if conta_id is not None:
+            base = base[base["conta_id"] == conta_id]
+        if iniciais is not None:
+            base = base[base["conta_id"].isin(list(iniciais))]
+
+    contas = [conta_id] if conta_id is not None else sorted(iniciais or [])
+    if not base.empty:
+        datas = pd.to_datetime(base["data_ref"], errors="coerce")
+        mov = pd.DataFrame({
+            "data": datas,
+            "conta": base["conta_id"].astype(object).fillna("—") if "conta_id" in base else "—",
+            "fluxo": fluxo_assinado(base),
+        }).dropna(subset=["data"])
+        anteriores = mov[mov["data"] < dias[0]] if len(dias) else mov.iloc[0:0]
+        janela = mov[mov["data"].isin(dias)]
+        diario = janela.pivot_table(
+            index="data", columns="conta", values="fluxo", aggfunc="sum", fill_value=0
+        )
+        contas = sorted(set(contas) | set(diario.columns))
+    else:
+        # Colunas tipadas: vazias sem dtype, a abertura e o saldo saem como object
+        anteriores = pd.DataFrame({
+            "conta": pd.Series(dtype=object),
+            "fluxo": pd.Series(dtype="int64"),
+        })
+        diario = pd.DataFrame(dtype="int64")
+
+    diario = diario.reindex(index=dias, columns=contas, fill_value=0).astype("int64")
+
+    if iniciais is not None:
+        abertura = pd.Series({c: iniciais.get(c, 0) for c in contas}, dtype="int64")
+        abertura = abertura.add(anteriores.groupby("conta")["fluxo"].sum(), fill_value=0)
+    else:
+        abertura = pd.Series(0, index=contas, dtype="int64")
+
+    saldo = diario.cumsum().add(abertura.reindex(contas, fill_value=0), axis=1)
+    if freq != "D":
+        saldo = saldo.resample(FREQUENCIAS[freq]).last()
+
+    saldo = saldo.div(100)
+    if por_conta:
+        return saldo
+    return saldo.sum(axis=1).rename("saldo")
+
+
 def serie_saldo_acumulado(
     df: pd.DataFrame,
     inicio: date,
@@ -153,31 +442,27 @@ def serie_saldo_acumulado(
     incluir_previstas: bool = False,
 ) -> pd.Series:
     """
-    Gera série temporal de saldo acumulado.
+    Gera série temporal de saldo acumulado (apenas dias com movimento).
+    Para granularidade, contas ou saldo de abertura, use serie_saldo().
     """
     if df.empty:
         return pd.Series(dtype=float)
 
-    base = df.copy()
+    base = df
 
     if not incluir_previstas:
         base = base[base["data_efetiva"].notna()]
 
-    base = base[base["data_ref"].between(inicio, fim)]
+    base = base[entre(base["data_ref"], inicio, fim)]
 
     if base.empty:
         return pd.Series(dtype=float)
 
-    base["signed"] = base.apply(
-        lambda r: r["valor"] if r["tipo"] == "receita" else -r["valor"],
-        axis=1,
-    )
-
     return (
-        base
-        .groupby("data_ref")["signed"]
+        fluxo_assinado(base)
+        .groupby(base["data_ref"])
         .sum()
         .sort_index()
         .cumsum()
+        .div(100)
     )
-
@@ -0,0 +1,31 @@
+"""
+Base das estruturas derivadas mantidas por delta.
+
+Uma estrutura incremental é construída uma vez por snapshot e depois
+acompanha as escritas de um TransactionStore: cada alteração chega como
+aplicar(antes, depois) — antes=None em criações, depois=None em remoções
+físicas —, a mesma assinatura de TransactionStore.observar().
+
+Os objetos do snapshot (cache_resource) são compartilhados entre sessões:
+conecte sempre uma copia(), nunca o objeto do cache
+(ver snapshot.Derivados, que copia só na primeira escrita).
+"""
+
+import copy
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class Incremental(ABC):
+    @abstractmethod
+    def aplicar(self, antes: Optional[object], depois: Optional[object]) -> None:
+        """Aplica a mudança de uma transação (antes → depois)."""
+
+    def copia(self):
+        """Cópia independente; subclasses com registros compartilhados sobrescrevem."""
+        return copy.deepcopy(self)
+
+    def conectar(self, store):
+        """Passa a acompanhar as alterações feitas em um TransactionStore."""
+        store.observar(self.aplicar)
+        return self
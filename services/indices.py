@@ -0,0 +1,260 @@
+"""
+Índices em memória sobre as transações (construídos uma vez por snapshot).
+
+Todos aceitam registros `Transacao` ou dicts e são mantidos por delta
+(services.incremental) quando uma transação é baixada, estornada ou reagendada.
+"""
+
+import copy
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from services.competencia import competencia_from_date, limites_competencia
+from services.dinheiro import centavos
+from services.incremental import Incremental
+from services.schemas import parse_data
+
+
+def _datas(tx) -> tuple[Optional[date], Optional[date]]:
+    """(prevista, efetiva) já convertidas — usa os slots do registro se houver."""
+    if hasattr(tx, "prevista"):
+        return tx.prevista, tx.efetiva
+    return parse_data(tx.get("data_prevista")), parse_data(tx.get("data_efetiva"))
+
+
+def _achar(txs: list, i: int, j: int, antes, depois) -> Optional[int]:
+    """
+    Posição do registro `antes` em txs[i:j], ou None.
+
+    As linhas são guardadas por posição, não por id (registros legados
+    podem repetir o id ""). O store altera o próprio registro no lugar
+    (depois) ou uma cópia do registro do cache: procura pela identidade
+    e, na falta dela, pelo id.
+    """
+    for k in range(i, j):
+        if txs[k] is depois or txs[k] is antes:
+            return k
+    for k in range(i, j):
+        if txs[k].get("id") == antes.get("id"):
+            return k
+    return None
+
+
+def _posicao(ords: list[int], txs: list, o: int, antes, depois) -> Optional[int]:
+    """_achar() entre os registros de ordinal `o` das listas paralelas (ords, txs)."""
+    return _achar(txs, bisect_left(ords, o), bisect_right(ords, o), antes, depois)
+
+
+# ---------------------------------------------------------
+# Índice por data de referência
+# ---------------------------------------------------------
+class IndiceDatas(Incremental):
+    """
+    Transações não excluídas ordenadas pela data de referência.
+
+    chave="efetiva": efetiva > prevista (mesma regra de filtrar_periodo)
+    chave="prevista": prevista > efetiva (competência da tela de Lançamentos)
+
+    periodo()/competencia() são buscas binárias: O(log n + k).
+    totais() devolve, por competência, a soma em centavos por (tipo, paga)
+    — mantida junto com o índice, sem varrer as transações do mês.
+    """
+
+    def __init__(self, transacoes: Iterable, chave: str = "efetiva"):
+        if chave not in ("efetiva", "prevista"):
+            raise ValueError("chave deve ser 'efetiva' ou 'prevista'")
+        self._chave = chave
+        self._comps: Counter = Counter()
+        self._totais: dict[str, Counter] = {}
+
+        pares = []
+        for tx in transacoes:
+            d = self._ref(tx)
+            if d is None:
+                continue
+            pares.append((d.toordinal(), tx))
+            self._contar(competencia_from_date(d), tx, 1)
+        pares.sort(key=lambda p: p[0])
+        # Listas paralelas: ordinal da data e o registro na mesma posição
+        self._ords: list[int] = [p[0] for p in pares]
+        self._txs: list = [p[1] for p in pares]
+
+    def _ref(self, tx) -> Optional[date]:
+        if tx is None or tx.get("excluido"):
+            return None
+        prev, efet = _datas(tx)
+        return (efet or prev) if self._chave == "efetiva" else (prev or efet)
+
+    # ---------------- consultas ----------------
+    def periodo(self, ini: date, fim: date) -> list:
+        """Transações com data de referência em [ini, fim], em ordem de data."""
+        i = bisect_left(self._ords, ini.toordinal())
+        j = bisect_right(self._ords, fim.toordinal())
+        return self._txs[i:j]
+
+    def competencia(self, comp: str) -> list:
+        """Transações da competência 'aaaa-mm'."""
+        return self.periodo(*limites_competencia(comp))
+
+    def competencias(self) -> list[str]:
+        """Competências com ao menos uma transação (mais recente primeiro)."""
+        return sorted((c for c, n in self._comps.items() if n > 0), reverse=True)
+
+    def totais(self, comp: str) -> dict[tuple[str, bool], int]:
+        """(tipo, paga) → centavos da competência 'aaaa-mm'."""
+        return dict(self._totais.get(comp, {}))
+
+    def __len__(self) -> int:
+        return len(self._txs)
+
+    # ---------------- manutenção incremental ----------------
+    def copia(self) -> "IndiceDatas":
+        """Cópia das listas e totais; os registros continuam compartilhados."""
+        c = copy.copy(self)
+        c._ords, c._txs = list(self._ords), list(self._txs)
+        c._comps = Counter(self._comps)
+        c._totais = {comp: Counter(tot) for comp, tot in self._totais.items()}
+        return c
+
+    def aplicar(self, antes, depois) -> None:
+        d = self._ref(antes)
+        if d is not None:
+            k = _posicao(self._ords, self._txs, d.toordinal(), antes, depois)
+            if k is not None:
+                del self._ords[k]
+                del self._txs[k]
+                self._contar(competencia_from_date(d), antes, -1)
+        d = self._ref(depois)
+        if d is not None:
+            o = d.toordinal()
+            i = bisect_right(self._ords, o)
+            self._ords.insert(i, o)
+            self._txs.insert(i, depois)
+            self._contar(competencia_from_date(d), depois, 1)
+
+    def _contar(self, comp: str, tx, sinal: int) -> None:
+        self._comps[comp] += sinal
+        k = (tx.get("tipo"), bool(tx.get("data_efetiva")))
+        tot = self._totais.setdefault(comp, Counter())
+        tot[k] += sinal * centavos(tx.get("valor", 0))
+        if not tot[k]:
+            del tot[k]
+
+
+# ---------------------------------------------------------
+# Índice de vencimentos (itens em aberto)
+# ---------------------------------------------------------
+class IndiceVencimentos(Incremental):
+    """
+    Transações em aberto (sem data_efetiva, não excluídas, com data_prevista)
+    ordenadas por vencimento, separadas por tipo.
+
+    O índice não depende de "hoje": vencidas/vencendo/próximas são fatias
+    por busca binária (O(log n + k)), então a virada do dia não exige
+    reconstrução. Totais por dia ficam em memória até a próxima alteração.
+    Em aberto sem data_prevista só aparecem em abertas(), ao final, e não
+    entram em totais() (mesma regra do resumo de Contas até aqui).
+    """
+
+    def __init__(self, transacoes: Iterable):
+        self._ords: dict[str, list[int]] = {}
+        self._txs: dict[str, list] = {}
+        self._sem_data: dict[str, list] = {}
+        self._totais: dict[tuple, tuple[int, int, int]] = {}
+
+        pares: dict[str, list] = {}
+        for tx in transacoes:
+            if not self._aberta(tx):
+                continue
+            d = _datas(tx)[0]
+            if d is None:
+                self._sem_data.setdefault(tx.get("tipo"), []).append(tx)
+                continue
+            pares.setdefault(tx.get("tipo"), []).append((d.toordinal(), tx))
+        for tipo, lista in pares.items():
+            lista.sort(key=lambda p: p[0])
+            self._ords[tipo] = [p[0] for p in lista]
+            self._txs[tipo] = [p[1] for p in lista]
+
+    @staticmethod
+    def _aberta(tx) -> bool:
+        # Mesma regra de derivar_status: qualquer data_efetiva = paga
+        return tx is not None and not tx.get("excluido") and not tx.get("data_efetiva")
+
+    # ---------------- consultas ----------------
+    def _fatia(self, tipo: str, ini: Optional[date], fim: Optional[date]) -> list:
+        ords = self._ords.get(tipo, [])
+        i = 0 if ini is None else bisect_left(ords, ini.toordinal())
+        j = len(ords) if fim is None else bisect_right(ords, fim.toordinal())
+        return self._txs.get(tipo, [])[i:j]
+
+    def abertas(self, tipo: str) -> list:
+        """Todas em aberto do tipo, do vencimento mais antigo ao mais distante."""
+        return self._fatia(tipo, None, None) + self._sem_data.get(tipo, [])
+
+    def vencidas(self, tipo: str, hoje: date) -> list:
+        return self._fatia(tipo, None, hoje - timedelta(days=1))
+
+    def vencendo(self, tipo: str, hoje: date) -> list:
+        return self._fatia(tipo, hoje, hoje)
+
+    def proximas(self, tipo: str, hoje: date, dias: int = 7) -> list:
+        """Vencimento em [hoje, hoje + dias]."""
+        return self._fatia(tipo, hoje, hoje + timedelta(days=dias))
+
+    def totais(self, tipo: str, hoje: date, dias: int = 7) -> tuple[int, int, int]:
+        """
+        (em aberto com vencimento, vencidas, próximos `dias`) em centavos;
+        memorizado por (tipo, hoje, dias).
+        """
+        k = (tipo, hoje, dias)
+        if k not in self._totais:
+            def soma(itens) -> int:
+                return sum(centavos(tx.get("valor", 0)) for tx in itens)
+            self._totais[k] = (
+                soma(self._fatia(tipo, None, None)),
+                soma(self.vencidas(tipo, hoje)),
+                soma(self.proximas(tipo, hoje, dias)),
+            )
+        return self._totais[k]
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._txs.values()) + sum(len(v) for v in self._sem_data.values())
+
+    # ---------------- manutenção incremental ----------------
+    def copia(self) -> "IndiceVencimentos":
+        """Cópia das listas; os registros continuam compartilhados."""
+        c = copy.copy(self)
+        c._ords = {t: list(v) for t, v in self._ords.items()}
+        c._txs = {t: list(v) for t, v in self._txs.items()}
+        c._sem_data = {t: list(v) for t, v in self._sem_data.items()}
+        c._totais = {}
+        return c
+
+    def aplicar(self, antes, depois) -> None:
+        self._totais.clear()
+        if self._aberta(antes):
+            tipo, d = antes.get("tipo"), _datas(antes)[0]
+            if d is None:
+                sem_data = self._sem_data.get(tipo, [])
+                k = _achar(sem_data, 0, len(sem_data), antes, depois)
+                if k is not None:
+                    del sem_data[k]
+            else:
+                ords, txs = self._ords.get(tipo, []), self._txs.get(tipo, [])
+                k = _posicao(ords, txs, d.toordinal(), antes, depois)
+                if k is not None:
+                    del ords[k]
+                    del txs[k]
+        if self._aberta(depois):
+            tipo, d = depois.get("tipo"), _datas(depois)[0]
+            if d is None:
+                self._sem_data.setdefault(tipo, []).append(depois)
+            else:
+                o = d.toordinal()
+                ords = self._ords.setdefault(tipo, [])
+                i = bisect_right(ords, o)
+                ords.insert(i, o)
+                self._txs.setdefault(tipo, []).insert(i, depois)
@@ -14,9 +14,13 @@ def is_mobile() -> bool:
 def responsive_columns(desktop: int, mobile: int = 1):
     """
     Retorna colunas responsivas.
+    Sempre devolve `desktop` posições: no mobile elas são distribuídas
+    (em ordem) entre as `mobile` colunas, então cols[i] funciona nos dois modos.
     """
-    cols = mobile if is_mobile() else desktop
-    return st.columns(cols)
+    if not is_mobile():
+        return st.columns(desktop)
+    cols = st.columns(mobile)
+    return [cols[i % mobile] for i in range(desktop)]
 
 
 def responsive_value(desktop, mobile):
@@ -0,0 +1,106 @@
+"""
+Progresso de metas a partir das transações vinculadas.
+
+Uma transação conta para uma meta quando:
+- tem `meta_id` explícito (prioridade), ou
+- sua categoria_id é a `categoria_id` da meta.
+
+Cada categoria vincula no máximo uma meta: se duas metas apontam para a
+mesma categoria (JSON editado à mão), vale a primeira e um aviso é logado.
+
+Só transações efetivadas e não excluídas contam. Sinal do ponto de vista
+da meta: despesa = aporte (dinheiro separado para a meta, +); receita =
+resgate (−).
+
+O agregado (total e aportes por competência) é mantido por delta
+(services.incremental), então uma escrita custa O(1) por transação alterada.
+"""
+
+import logging
+from typing import Iterable, Optional
+
+from services.competencia import competencia_from_date
+from services.dinheiro import centavos, reais
+from services.incremental import Incremental
+from services.schemas import parse_data
+
+logger = logging.getLogger("financeiro")
+
+
+class ProgressoMetas(Incremental):
+    """Acumulado por meta, em centavos, alimentado pelas transações vinculadas."""
+
+    def __init__(self, metas: list, transacoes: Iterable):
+        self._ids = {m.get("id") for m in metas if isinstance(m, dict)}
+        self._por_categoria: dict[str, str] = {}
+        for m in metas:
+            if not isinstance(m, dict) or not m.get("categoria_id"):
+                continue
+            cat = m.get("categoria_id")
+            if cat in self._por_categoria:
+                logger.warning(
+                    f"Categoria {cat} vinculada às metas {self._por_categoria[cat]} e "
+                    f"{m.get('id')}; só a primeira recebe os lançamentos."
+                )
+                continue
+            self._por_categoria[cat] = m.get("id")
+        self._total: dict[str, int] = {mid: 0 for mid in self._ids}
+        self._mensal: dict[str, dict[str, int]] = {mid: {} for mid in self._ids}
+        self._vinculos: dict[str, int] = {mid: 0 for mid in self._ids}
+
+        for tx in transacoes:
+            self._somar(tx, 1)
+
+    # ---------------- regra ----------------
+    def meta_de(self, tx) -> Optional[str]:
+        """Meta à qual a transação está vinculada (ou None)."""
+        if tx is None or tx.get("excluido"):
+            return None
+        mid = tx.get("meta_id")
+        if mid in self._ids:
+            return mid
+        return self._por_categoria.get(tx.get("categoria_id"))
+
+    @staticmethod
+    def contribuicao(tx) -> int:
+        """Efeito na meta, em centavos (0 se não efetivada)."""
+        if not tx.get("data_efetiva"):
+            return 0
+        v = centavos(tx.get("valor", 0.0))
+        return v if tx.get("tipo") == "despesa" else -v
+
+    # ---------------- leitura ----------------
+    def vinculada(self, meta: dict) -> bool:
+        """True se a meta tem categoria vinculada ou alguma transação com meta_id."""
+        mid = meta.get("id")
+        return bool(meta.get("categoria_id")) or self._vinculos.get(mid, 0) > 0
+
+    def acumulado(self, meta_id: str) -> float:
+        return reais(self._total.get(meta_id, 0))
+
+    def aportes_mensais(self, meta_id: str) -> dict[str, float]:
+        """competência → aporte líquido (reais), em ordem cronológica."""
+        mensal = self._mensal.get(meta_id, {})
+        return {c: reais(mensal[c]) for c in sorted(mensal)}
+
+    # ---------------- atualização incremental ----------------
+    def aplicar(self, antes, depois) -> None:
+        self._somar(antes, -1)
+        self._somar(depois, 1)
+
+    def _somar(self, tx, sinal: int) -> None:
+        mid = self.meta_de(tx)
+        if mid is None:
+            return
+        if tx.get("meta_id") == mid:
+            self._vinculos[mid] += sinal
+        v = self.contribuicao(tx)
+        d = parse_data(tx.get("data_efetiva"))
+        if not v or d is None:
+            return
+        self._total[mid] += sinal * v
+        comp = competencia_from_date(d)
+        mensal = self._mensal[mid]
+        mensal[comp] = mensal.get(comp, 0) + sinal * v
+        if not mensal[comp]:
+            del mensal[comp]
@@ -0,0 +1,142 @@
+"""
+Consumo de orçamentos (limite_mensal por categoria) contra as despesas.
+
+Junta orcamentos.json ao cubo competência × tipo × realizado × categoria
+(finance_queries.cubo_kpis(..., por_categoria=True)) — o gasto de todas
+as categorias e meses sai do mesmo groupby, sem laço por orçamento.
+
+Colunas (valores em reais):
+    competencia, orcamento_id, categoria_id, limite,
+    gasto (realizado), previsto (em aberto), comprometido (gasto + previsto),
+    restante (limite - comprometido), pct (gasto / limite),
+    pct_comprometido, nivel ("ok" | "atencao" | "estourado")
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from services.dinheiro import centavos
+
+# A partir desta fração do limite o orçamento entra em atenção
+LIMIAR_ALERTA = 0.8
+
+NIVEIS = ("ok", "atencao", "estourado")
+COLUNAS = [
+    "competencia", "orcamento_id", "categoria_id", "limite",
+    "gasto", "previsto", "comprometido", "restante",
+    "pct", "pct_comprometido", "nivel",
+]
+
+
+def _orcamentos_df(orcamentos: Iterable[dict], apenas_ativos: bool) -> pd.DataFrame:
+    linhas = [
+        {
+            "orcamento_id": o.get("id"),
+            "categoria_id": o.get("categoria_id"),
+            "limite_c": centavos(o.get("limite_mensal", 0)),
+        }
+        for o in orcamentos
+        if isinstance(o, dict) and (o.get("ativo", True) or not apenas_ativos)
+    ]
+    return pd.DataFrame(linhas, columns=["orcamento_id", "categoria_id", "limite_c"])
+
+
+def consumo_orcamentos(
+    cubo: pd.DataFrame,
+    orcamentos: Iterable[dict],
+    competencias: Iterable[str],
+    apenas_ativos: bool = True,
+    limiar: float = LIMIAR_ALERTA,
+) -> pd.DataFrame:
+    """Uma linha por (competência, orçamento). `cubo` precisa de por_categoria=True."""
+    orc = _orcamentos_df(orcamentos, apenas_ativos)
+    comps = sorted(set(competencias))
+    if orc.empty or not comps:
+        return pd.DataFrame(columns=COLUNAS)
+
+    # Despesas do cubo nas competências pedidas: (competencia, categoria) × realizado
+    gastos = pd.DataFrame(columns=["competencia", "categoria_id", "gasto_c", "previsto_c"])
+    if not cubo.empty:
+        idx = cubo.index
+        desp = cubo[(idx.get_level_values("tipo") == "despesa") & idx.get_level_values("competencia").isin(comps)]
+        if not desp.empty:
+            por_estado = (
+                desp["centavos"]
+                .groupby(level=["competencia", "categoria_id", "realizado"])
+                .sum()
+                .unstack("realizado", fill_value=0)
+                .reindex(columns=[True, False], fill_value=0)
+            )
+            gastos = por_estado.set_axis(["gasto_c", "previsto_c"], axis=1).reset_index()
+
+    base = pd.MultiIndex.from_product([comps, orc.index], names=["competencia", "_i"]).to_frame(index=False)
+    base = base.join(orc, on="_i").drop(columns="_i")
+    out = base.merge(gastos, on=["competencia", "categoria_id"], how="left")
+    out[["gasto_c", "previsto_c"]] = out[["gasto_c", "previsto_c"]].fillna(0).astype("int64")
+    return _finalizar(out, limiar)
+
+
+def agregar(consumo: pd.DataFrame, limiar: float = LIMIAR_ALERTA) -> pd.DataFrame:
+    """Soma várias competências por orçamento (limite × nº de meses)."""
+    if consumo.empty:
+        return consumo
+    c = consumo.assign(
+        limite_c=(consumo["limite"] * 100).round().astype("int64"),
+        gasto_c=(consumo["gasto"] * 100).round().astype("int64"),
+        previsto_c=(consumo["previsto"] * 100).round().astype("int64"),
+    )
+    soma = (
+        c.groupby(["orcamento_id", "categoria_id"], sort=False)[["limite_c", "gasto_c", "previsto_c"]]
+        .sum()
+        .reset_index()
+    )
+    comps = sorted(consumo["competencia"].unique())
+    soma.insert(0, "competencia", f"{comps[0]} → {comps[-1]}" if len(comps) > 1 else comps[0])
+    return _finalizar(soma, limiar)
+
+
+def _finalizar(out: pd.DataFrame, limiar: float) -> pd.DataFrame:
+    """Deriva comprometido/restante/percentuais/nível a partir das colunas em centavos."""
+    comprometido_c = out["gasto_c"] + out["previsto_c"]
+    limite = out["limite_c"].where(out["limite_c"] > 0)
+    pct = (out["gasto_c"] / limite).fillna(0.0)
+    pct_comp = (comprometido_c / limite).fillna(0.0)
+
+    nivel = np.select(
+        [pct > 1, (pct >= limiar) | (pct_comp > 1)],
+        ["estourado", "atencao"],
+        default="ok",
+    )
+    res = pd.DataFrame({
+        "competencia": out["competencia"],
+        "orcamento_id": out["orcamento_id"],
+        "categoria_id": out["categoria_id"],
+        "limite": out["limite_c"] / 100,
+        "gasto": out["gasto_c"] / 100,
+        "previsto": out["previsto_c"] / 100,
+        "comprometido": comprometido_c / 100,
+        "restante": (out["limite_c"] - comprometido_c) / 100,
+        "pct": pct,
+        "pct_comprometido": pct_comp,
+        "nivel": pd.Categorical(nivel, categories=NIVEIS),
+    })
+    return res.reset_index(drop=True)
+
+
+def alertas(consumo: pd.DataFrame) -> pd.DataFrame:
+    """Linhas fora do nível "ok", da mais grave para a menos grave."""
+    if consumo.empty:
+        return consumo
+    a = consumo[consumo["nivel"] != "ok"]
+    return a.sort_values(["nivel", "pct_comprometido"], ascending=[False, False])
+
+
+def nivel_badge(nivel: str) -> str:
+    """Representação visual do nível (somente UI)."""
+    return {
+        "ok": "🟢 OK",
+        "atencao": "🟡 Atenção",
+        "estourado": "🔴 Estourado",
+    }.get(nivel, nivel)
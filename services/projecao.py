@@ -0,0 +1,83 @@
+"""
+Projeção de caixa para os próximos N meses.
+
+Parte do saldo atual de cada conta (SaldosContas) e soma, dia a dia, tudo
+o que ainda está em aberto no DataFrame canônico:
+- transações agendadas sem data_efetiva (inclui cada parcela de um
+  parcelamento, que já existe como transação própria)
+- ocorrências virtuais de recorrentes (recorrencia.expandir)
+
+Itens vencidos e não pagos entram no primeiro dia da projeção (supõe-se
+que serão pagos/recebidos agora). Tudo em operações de coluna: uma
+pivot diária por conta → reindex → cumsum.
+"""
+
+from datetime import date
+
+import pandas as pd
+
+from services.finance_core import add_months
+from services.finance_queries import fluxo_assinado
+
+
+def horizonte(hoje: date, meses: int) -> tuple[date, date]:
+    """(início, fim) da projeção: de hoje até hoje + N meses."""
+    return hoje, add_months(hoje, meses)
+
+
+def projetar(
+    df: pd.DataFrame,
+    saldos: dict[str, int],
+    inicio: date,
+    fim: date,
+    incluir_vencidas: bool = True,
+) -> pd.DataFrame:
+    """
+    Saldo projetado (reais) ao final de cada dia de [inicio, fim], uma
+    coluna por conta.
+
+    df: frame canônico (preparar_transacoes_df), já com as virtuais
+    saldos: saldo atual por conta, em centavos (SaldosContas.centavos_por_conta)
+    Contas fora de `saldos` são ignoradas (mesma regra dos saldos).
+    """
+    dias = pd.date_range(pd.Timestamp(inicio), pd.Timestamp(fim), freq="D")
+    contas = sorted(saldos)
+
+    diario = pd.DataFrame()
+    if not df.empty and contas:
+        abertos = df[df["data_efetiva"].isna() & df["conta_id"].isin(contas)]
+        datas = abertos["data_prevista"]
+        if incluir_vencidas:
+            datas = datas.clip(lower=dias[0])
+        mov = pd.DataFrame({
+            "data": datas,
+            "conta": abertos["conta_id"].astype(object),
+            "fluxo": fluxo_assinado(abertos),
+        })
+        mov = mov[mov["data"].isin(dias)]
+        if not mov.empty:
+            diario = mov.pivot_table(
+                index="data", columns="conta", values="fluxo", aggfunc="sum", fill_value=0
+            )
+
+    diario = diario.reindex(index=dias, columns=contas, fill_value=0)
+    abertura = pd.Series(saldos, dtype="int64").reindex(contas, fill_value=0)
+    return diario.cumsum().add(abertura, axis=1).div(100)
+
+
+def mensal(diario: pd.DataFrame) -> pd.DataFrame:
+    """Saldo projetado ao final de cada mês (último dia disponível)."""
+    return diario.resample("ME").last()
+
+
+def resumo_projecao(serie: pd.Series) -> dict:
+    """Saldo final, menor saldo (e data) e primeiro dia negativo de uma série diária."""
+    if serie.empty:
+        return {"final": 0.0, "minimo": 0.0, "data_minimo": None, "primeiro_negativo": None}
+    negativos = serie[serie < 0]
+    return {
+        "final": float(serie.iloc[-1]),
+        "minimo": float(serie.min()),
+        "data_minimo": serie.idxmin().date(),
+        "primeiro_negativo": negativos.index[0].date() if not negativos.empty else None,
+    }
@@ -0,0 +1,139 @@
+"""
+Transações recorrentes (aluguel, salário, assinaturas...).
+
+Uma transação com `recorrente: True` é o MODELO da série: ela própria é a
+primeira ocorrência e as seguintes são geradas sob demanda, sem gravação.
+
+Regra opcional em `recorrencia` (defaults entre parênteses):
+    {"dia": N (dia de data_prevista), "intervalo_meses": K (1), "ate": "aaaa-mm-dd" (sem fim)}
+
+Ocorrências virtuais só viram transações reais (materializar) quando são
+pagas; a transação real guarda `recorrencia_origem = {"id", "data"}` e a
+ocorrência virtual correspondente deixa de ser gerada.
+"""
+
+import calendar
+from datetime import date
+from typing import Iterable, Iterator, Optional
+
+from services.finance_core import add_months
+
+
+# ---------------------------------------------------------
+# Regra
+# ---------------------------------------------------------
+def regra(tx) -> Optional[dict]:
+    """Regra efetiva da série, ou None se a transação não é um modelo válido."""
+    if not tx.get("recorrente") or tx.get("excluido"):
+        return None
+    try:
+        base = date.fromisoformat(str(tx.get("data_prevista"))[:10])
+    except ValueError:
+        return None
+
+    r = tx.get("recorrencia") or {}
+    if not isinstance(r, dict):
+        return None
+    try:
+        ate = date.fromisoformat(r["ate"]) if r.get("ate") else None
+    except (TypeError, ValueError):
+        ate = None
+    # Regra malformada no JSON (dia "abc", intervalo "x"): série ignorada
+    try:
+        dia = int(r.get("dia") or base.day)
+        intervalo = max(int(r.get("intervalo_meses") or 1), 1)
+    except (TypeError, ValueError):
+        return None
+    if not 1 <= dia <= 31:
+        return None
+    return {
+        "base": base,
+        "dia": dia,
+        "intervalo_meses": intervalo,
+        "ate": ate,
+    }
+
+
+def _data_k(r: dict, k: int) -> date:
+    """k-ésima ocorrência (k=0 é o próprio modelo)."""
+    if k == 0:
+        return r["base"]
+    m = add_months(r["base"].replace(day=1), k * r["intervalo_meses"])
+    ultimo = calendar.monthrange(m.year, m.month)[1]
+    return m.replace(day=min(r["dia"], ultimo))
+
+
+def datas(tx, ini: date, fim: date) -> Iterator[date]:
+    """
+    Datas das ocorrências VIRTUAIS (k >= 1) dentro de [ini, fim], em ordem.
+    Gera sob demanda: pula direto para o primeiro mês da janela.
+    """
+    r = regra(tx)
+    if r is None:
+        return
+    limite = min(fim, r["ate"]) if r["ate"] else fim
+    meses = (ini.year - r["base"].year) * 12 + (ini.month - r["base"].month)
+    k = max(1, meses // r["intervalo_meses"])
+    while True:
+        d = _data_k(r, k)
+        if d > limite:
+            return
+        if d >= ini:
+            yield d
+        k += 1
+
+
+# ---------------------------------------------------------
+# Ocorrências virtuais
+# ---------------------------------------------------------
+def ocorrencia(tx, d: date) -> dict:
+    """Ocorrência virtual (dict) do modelo `tx` na data `d`."""
+    base = tx.to_dict() if hasattr(tx, "to_dict") else dict(tx)
+    base.pop("recorrencia", None)
+    base.pop("codigo", None)
+    base.update({
+        "id": f"{tx.get('id')}@{d.isoformat()}",
+        "data_prevista": d.isoformat(),
+        "data_efetiva": None,
+        "recorrente": False,
+        "recorrencia_origem": {"id": tx.get("id"), "data": d.isoformat()},
+        "virtual": True,
+    })
+    return base
+
+
+def materializadas(transacoes: Iterable) -> set[tuple[str, str]]:
+    """(id_modelo, data) das ocorrências que já existem como transação real."""
+    out = set()
+    for tx in transacoes:
+        o = tx.get("recorrencia_origem")
+        if isinstance(o, dict) and not tx.get("excluido"):
+            out.add((o.get("id"), o.get("data")))
+    return out
+
+
+def expandir(transacoes: Iterable, ini: date, fim: date) -> list[dict]:
+    """
+    Ocorrências virtuais de todos os modelos em [ini, fim], exceto as já
+    materializadas. Use junto com a lista real em consultas e KPIs.
+    """
+    transacoes = list(transacoes)
+    feitas = materializadas(transacoes)
+    out = []
+    for tx in transacoes:
+        if not tx.get("recorrente"):
+            continue
+        for d in datas(tx, ini, fim):
+            if (tx.get("id"), d.isoformat()) not in feitas:
+                out.append(ocorrencia(tx, d))
+    return out
+
+
+def materializar(oc: dict, tx_id: str, codigo: Optional[int] = None) -> dict:
+    """Converte a ocorrência virtual em transação real (para gravar)."""
+    real = dict(oc)
+    real.pop("virtual", None)
+    real["id"] = tx_id
+    if codigo is not None:
+        real["codigo"] = codigo
+    return real
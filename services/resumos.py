@@ -0,0 +1,187 @@
+"""
+Resumo persistido por competência (data/resumos.json).
+
+Totais em centavos por competência × tipo × estado × categoria, para que
+o histórico mensal seja lido de um arquivo pequeno:
+
+    {
+      "versao": 1,
+      "sha_transacoes": "<sha de transacoes.json que este resumo reflete>",
+      "competencias": {
+        "2026-10": {
+          "despesa": {"realizado": {"cat1": 12990}, "previsto": {"—": 5000}},
+          "receita": {"realizado": {"cat6": 500000}}
+        }
+      }
+    }
+
+Mesma regra do cubo de KPIs: competência pela data de referência
+(efetiva > prevista), "realizado" quando há data_efetiva, excluídas fora.
+
+Escritas atualizam o resumo em memória por delta (services.incremental)
+e data_loader.salvar_transacoes regrava o arquivo logo depois de
+transacoes.json, marcado com o novo sha. `sha_transacoes` diferente do
+sha atual indica que essa segunda gravação falhou ou que transacoes.json
+foi alterado por outro caminho — carregar() então reconstrói.
+"""
+
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from services.competencia import competencia_from_date
+from services.dinheiro import centavos, reais
+from services.finance_queries import kpis_de_somas
+from services.incremental import Incremental
+from services.schemas import parse_data
+
+VERSAO = 1
+TIPOS = ("receita", "despesa")
+ESTADOS = ("realizado", "previsto")
+SEM_CATEGORIA = "—"
+
+
+def chave(tx) -> Optional[tuple[str, str, str, str, int]]:
+    """(competência, tipo, estado, categoria, centavos) da transação, ou None se não conta."""
+    if tx is None or tx.get("excluido"):
+        return None
+    tipo = str(tx.get("tipo") or "").strip().lower()
+    if tipo not in TIPOS:
+        return None
+    if hasattr(tx, "data_ref"):
+        d, efetiva = tx.data_ref, tx.efetiva
+    else:
+        efetiva = parse_data(tx.get("data_efetiva"))
+        d = efetiva or parse_data(tx.get("data_prevista"))
+    v = centavos(tx.get("valor", 0.0))
+    if d is None or not v:
+        return None
+    estado = "realizado" if efetiva else "previsto"
+    return competencia_from_date(d), tipo, estado, tx.get("categoria_id") or SEM_CATEGORIA, v
+
+
+class Resumos(Incremental):
+    """Totais por competência mantidos em memória e serializados em resumos.json."""
+
+    def __init__(self, conteudo: Optional[dict] = None):
+        self._comps: dict[str, dict] = {}
+        self.sha_transacoes: Optional[str] = None
+        if isinstance(conteudo, dict) and conteudo.get("versao") == VERSAO:
+            self.sha_transacoes = conteudo.get("sha_transacoes")
+            for comp, tipos in (conteudo.get("competencias") or {}).items():
+                for tipo, estados in tipos.items():
+                    for estado, cats in estados.items():
+                        for cat, v in cats.items():
+                            self._somar(comp, tipo, estado, cat, int(v))
+
+    @classmethod
+    def construir(cls, transacoes: Iterable, sha_transacoes: Optional[str] = None) -> "Resumos":
+        """Reconstrução completa (uma passada) a partir das transações."""
+        r = cls()
+        for tx in transacoes:
+            k = chave(tx)
+            if k:
+                r._somar(*k)
+        r.sha_transacoes = sha_transacoes
+        return r
+
+    @classmethod
+    def carregar(cls, conteudo, sha_transacoes: str, transacoes: Iterable) -> "Resumos":
+        """Usa o arquivo se ele reflete `sha_transacoes`; senão reconstrói."""
+        r = cls(conteudo)
+        if r.sha_transacoes and r.sha_transacoes == sha_transacoes:
+            return r
+        return cls.construir(transacoes, sha_transacoes)
+
+    def to_dict(self, sha_transacoes: Optional[str] = None) -> dict:
+        if sha_transacoes is not None:
+            self.sha_transacoes = sha_transacoes
+        return {
+            "versao": VERSAO,
+            "sha_transacoes": self.sha_transacoes,
+            "competencias": {c: self._comps[c] for c in sorted(self._comps)},
+        }
+
+    # ---------------- leitura ----------------
+    def competencias(self) -> list[str]:
+        return sorted(self._comps)
+
+    def somas(self, comp: str) -> dict[tuple[str, bool], int]:
+        """(tipo, realizado) → centavos da competência (formato de finance_queries.somas_cubo)."""
+        c = self._comps.get(comp, {})
+        return {
+            (tipo, estado == "realizado"): sum(c.get(tipo, {}).get(estado, {}).values())
+            for tipo in TIPOS
+            for estado in ESTADOS
+        }
+
+    def totais(self, comp: str) -> dict:
+        """KPIs da competência no formato de finance_queries.kpis_mes (reais)."""
+        return kpis_de_somas(self.somas(comp))
+
+    def por_categoria(self, comp: str, tipo: str = "despesa", estado: Optional[str] = None) -> dict[str, float]:
+        """categoria_id → total (reais); estado=None soma realizado + previsto."""
+        out: dict[str, int] = {}
+        for est, cats in self._comps.get(comp, {}).get(tipo, {}).items():
+            if estado is None or est == estado:
+                for cat, v in cats.items():
+                    out[cat] = out.get(cat, 0) + v
+        return {k: reais(v) for k, v in out.items()}
+
+    def historico(self, ultimas: Optional[int] = None, ate: Optional[str] = None) -> pd.DataFrame:
+        """
+        Uma linha por competência (mais antiga primeiro) com os KPIs em reais.
+        `ate` ('aaaa-mm') corta meses futuros — parcelas e agendadas criam
+        competências só com previsto — antes de pegar as `ultimas`.
+        """
+        comps = self.competencias()
+        if ate is not None:
+            comps = [c for c in comps if c <= ate]
+        if ultimas:
+            comps = comps[-ultimas:]
+        return pd.DataFrame([self.totais(c) for c in comps], index=pd.Index(comps, name="competencia"))
+
+    # ---------------- verificação ----------------
+    def verificar(self, transacoes: Iterable) -> list[dict]:
+        """Diferenças entre o resumo e uma reconstrução completa (vazio = sem deriva)."""
+        esperado = Resumos.construir(transacoes)._plano()
+        atual = self._plano()
+        return [
+            {
+                "competencia": k[0], "tipo": k[1], "estado": k[2], "categoria_id": k[3],
+                "gravado": reais(atual.get(k, 0)), "esperado": reais(esperado.get(k, 0)),
+            }
+            for k in sorted(set(atual) | set(esperado))
+            if atual.get(k, 0) != esperado.get(k, 0)
+        ]
+
+    def _plano(self) -> dict[tuple, int]:
+        return {
+            (comp, tipo, estado, cat): v
+            for comp, tipos in self._comps.items()
+            for tipo, estados in tipos.items()
+            for estado, cats in estados.items()
+            for cat, v in cats.items()
+        }
+
+    # ---------------- atualização incremental ----------------
+    def aplicar(self, antes, depois) -> None:
+        for tx, sinal in ((antes, -1), (depois, 1)):
+            k = chave(tx)
+            if k:
+                self._somar(*k[:4], sinal * k[4])
+
+    def _somar(self, comp: str, tipo: str, estado: str, cat: str, v: int) -> None:
+        cats = self._comps.setdefault(comp, {}).setdefault(tipo, {}).setdefault(estado, {})
+        total = cats.get(cat, 0) + v
+        if total:
+            cats[cat] = total
+            return
+        # Remove chaves zeradas para o arquivo não crescer com lixo
+        cats.pop(cat, None)
+        if not cats:
+            del self._comps[comp][tipo][estado]
+            if not self._comps[comp][tipo]:
+                del self._comps[comp][tipo]
+                if not self._comps[comp]:
+                    del self._comps[comp]
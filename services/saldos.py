@@ -0,0 +1,191 @@
+"""
+Saldos de contas calculados em uma única passada.
+
+Mesma regra de finance_core.saldo_atual():
+- considera apenas transações efetivadas e não excluídas
+- receitas somam, despesas subtraem
+- acumula em centavos inteiros (sem deriva de float nas atualizações)
+
+Depois de construído, o motor é atualizado por delta (antes/depois) quando
+uma transação é baixada, estornada ou excluída — o saldo total fica O(1).
+
+SaldosDiarios responde "saldo da conta X na data D" (extratos, tendência
+do mês) por busca binária sobre somas acumuladas diárias.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from services.dinheiro import centavos, reais
+from services.incremental import Incremental
+from services.schemas import parse_data
+
+
+def contribuicao(tx) -> int:
+    """Efeito da transação no saldo da conta, em centavos (0 se não efetivada/excluída)."""
+    if tx is None or tx.get("excluido") or not tx.get("data_efetiva"):
+        return 0
+    v = centavos(tx.get("valor", 0.0))
+    return v if tx.get("tipo") == "receita" else -v
+
+
+def _dia_efetivo(tx) -> Optional[int]:
+    """Ordinal de data_efetiva (usa o slot do registro se houver)."""
+    d = tx.efetiva if hasattr(tx, "efetiva") else parse_data(tx.get("data_efetiva"))
+    return d.toordinal() if d else None
+
+
+class SaldosContas(Incremental):
+    """
+    Saldo de todas as contas a partir de uma varredura das transações.
+
+    Transações de contas desconhecidas são ignoradas, como na soma
+    `saldo_atual(c, transacoes) for c in contas`.
+    """
+
+    def __init__(self, contas: list, transacoes: Iterable):
+        self._saldos: dict[str, int] = {}
+        for c in contas:
+            if isinstance(c, dict):
+                self._saldos[c.get("id")] = centavos(c.get("saldo_inicial", 0.0))
+
+        for tx in transacoes:
+            v = contribuicao(tx)
+            if v and tx.get("conta_id") in self._saldos:
+                self._saldos[tx.get("conta_id")] += v
+
+        self._total = sum(self._saldos.values())
+
+    # ---------------- leitura ----------------
+    def saldo(self, conta_id: str) -> float:
+        return reais(self._saldos.get(conta_id, 0))
+
+    def total(self) -> float:
+        return reais(self._total)
+
+    def total_centavos(self) -> int:
+        return self._total
+
+    def por_conta(self) -> dict[str, float]:
+        return {k: reais(v) for k, v in self._saldos.items()}
+
+    def centavos_por_conta(self) -> dict[str, int]:
+        return dict(self._saldos)
+
+    # ---------------- atualização incremental ----------------
+    def aplicar(self, antes: Optional[dict], depois: Optional[dict]) -> None:
+        """
+        Aplica a mudança de uma transação (antes → depois).
+        antes=None para criação; depois=None para remoção física.
+        """
+        for tx, sinal in ((antes, -1), (depois, 1)):
+            v = contribuicao(tx)
+            if not v:
+                continue
+            conta_id = tx.get("conta_id")
+            if conta_id in self._saldos:
+                self._saldos[conta_id] += sinal * v
+                self._total += sinal * v
+
+
+class SaldosDiarios(Incremental):
+    """
+    Índice de saldo em qualquer data, por conta.
+
+    Para cada conta guarda os dias com movimento (ordinal, ordenados) e a
+    soma acumulada do fluxo líquido até cada dia, em centavos. Consultas
+    por data são uma busca binária: O(log n).
+
+    Escritas (aplicar) custam O(log n + k), onde k é o número de dias com
+    movimento posteriores ao dia alterado.
+    """
+
+    def __init__(self, contas: list, transacoes: Iterable):
+        self._inicial: dict[str, int] = {}
+        for c in contas:
+            if isinstance(c, dict):
+                self._inicial[c.get("id")] = centavos(c.get("saldo_inicial", 0.0))
+
+        fluxos: dict[str, dict[int, int]] = {cid: {} for cid in self._inicial}
+        for tx in transacoes:
+            v = contribuicao(tx)
+            if not v or tx.get("conta_id") not in fluxos:
+                continue
+            dia = _dia_efetivo(tx)
+            if dia is not None:
+                por_dia = fluxos[tx.get("conta_id")]
+                por_dia[dia] = por_dia.get(dia, 0) + v
+
+        # Listas paralelas por conta: dia com movimento e saldo acumulado até ele
+        self._dias: dict[str, list[int]] = {}
+        self._acum: dict[str, list[int]] = {}
+        for conta_id, por_dia in fluxos.items():
+            dias = sorted(por_dia)
+            acum, total = [], 0
+            for dia in dias:
+                total += por_dia[dia]
+                acum.append(total)
+            self._dias[conta_id] = dias
+            self._acum[conta_id] = acum
+
+    # ---------------- leitura ----------------
+    def saldo_em(self, conta_id: str, d: date) -> float:
+        """Saldo da conta ao final do dia `d`."""
+        return reais(self._centavos_em(conta_id, d.toordinal()))
+
+    def saldo_total_em(self, d: date) -> float:
+        return reais(sum(self._centavos_em(cid, d.toordinal()) for cid in self._dias))
+
+    def serie(self, conta_id: Optional[str], inicio: date, fim: date) -> pd.Series:
+        """
+        Saldo (reais) ao final de cada dia de [inicio, fim], indexado por data.
+        conta_id=None → soma de todas as contas.
+
+        Uma busca binária por conta para abrir a série; os dias seguintes só
+        avançam o ponteiro: O(log n + dias + k).
+        """
+        dias = pd.date_range(pd.Timestamp(inicio), pd.Timestamp(fim), freq="D")
+        contas = list(self._dias) if conta_id is None else [conta_id]
+        total = [0] * len(dias)
+        o0 = inicio.toordinal()
+        for cid in contas:
+            mov = self._dias.get(cid)
+            if mov is None:
+                continue
+            acum, inicial = self._acum[cid], self._inicial[cid]
+            i = bisect_right(mov, o0)
+            for n in range(len(dias)):
+                while i < len(mov) and mov[i] <= o0 + n:
+                    i += 1
+                total[n] += inicial + (acum[i - 1] if i else 0)
+        return pd.Series([reais(c) for c in total], index=dias, dtype="float64", name="saldo")
+
+    # ---------------- atualização incremental ----------------
+    def aplicar(self, antes, depois) -> None:
+        """Mesma assinatura de SaldosContas.aplicar / TransactionStore.observar."""
+        for tx, sinal in ((antes, -1), (depois, 1)):
+            v = contribuicao(tx)
+            if not v or tx.get("conta_id") not in self._dias:
+                continue
+            dia = _dia_efetivo(tx)
+            if dia is not None:
+                self._somar(tx.get("conta_id"), dia, sinal * v)
+
+    def _centavos_em(self, conta_id: str, dia: int) -> int:
+        dias = self._dias.get(conta_id)
+        if dias is None:
+            return 0
+        i = bisect_right(dias, dia)
+        return self._inicial[conta_id] + (self._acum[conta_id][i - 1] if i else 0)
+
+    def _somar(self, conta_id: str, dia: int, v: int) -> None:
+        dias, acum = self._dias[conta_id], self._acum[conta_id]
+        i = bisect_left(dias, dia)
+        if i == len(dias) or dias[i] != dia:
+            dias.insert(i, dia)
+            acum.insert(i, acum[i - 1] if i else 0)
+        for j in range(i, len(acum)):
+            acum[j] += v
@@ -1,22 +1,140 @@
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime
+from typing import Any, Optional
 
-# services/schemas.py
-from dataclasses import dataclass, field
-from typing import Optional
-from datetime import date
+_AUSENTE = object()
 
-@dataclass
+
+def parse_data(v: Any) -> Optional[date]:
+    """ISO (aaaa-mm-dd[...]) ou dd/mm/aaaa → date; None se inválido."""
+    if not v:
+        return None
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    s = str(v).strip()
+    try:
+        return date.fromisoformat(s[:10])
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(s, "%d/%m/%Y").date()
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
 class Transacao:
-    id: str
-    tipo: str  # "despesa" | "receita"
+    """
+    Registro tipado (com __slots__) de uma transação.
+
+    Acesso compatível com dict (get / [] / pop / setdefault) para que o
+    código existente funcione igual com dicts e com registros.
+    Chaves fora do esquema ficam em `extras` (round-trip sem perdas).
+    `ordem` guarda a ordem em que as chaves chegaram, para que to_dict()
+    devolva o JSON na ordem gravada e salvar não reordene os registros.
+
+    `prevista` / `efetiva` são as datas já convertidas para `date`,
+    mantidas em sincronia quando data_prevista / data_efetiva são
+    alteradas via [] (não fazem parte do JSON).
+    """
+    id: str = ""
+    tipo: str = "despesa"  # "despesa" | "receita"
     descricao: str = ""
     valor: float = 0.0
-    data_prevista: Optional[date] = None
-    data_efetiva: Optional[date] = None
+    data_prevista: Optional[str] = None  # ISO aaaa-mm-dd
+    data_efetiva: Optional[str] = None   # ISO aaaa-mm-dd
     conta_id: str = "c1"
     categoria_id: Optional[str] = None
     excluido: bool = False
     parcelamento: Optional[dict] = None
     recorrente: bool = False
+    codigo: Optional[int] = None
+    extras: dict = field(default_factory=dict)
+    ordem: dict = field(default_factory=dict)
+    prevista: Optional[date] = None
+    efetiva: Optional[date] = None
+
+    # ---------------- conversão ----------------
+    @classmethod
+    def from_dict(cls, d: dict) -> "Transacao":
+        """Cria o registro aplicando os mesmos defaults de normalizar_tx()."""
+        t = cls()
+        t.ordem = dict.fromkeys(d)
+        for k, v in d.items():
+            t[k] = v
+        # Defaults entram depois das chaves originais, como no setdefault de normalizar_tx
+        for k in _CAMPOS:
+            if k != "codigo" and k not in t.ordem:
+                t.ordem[k] = None
+        return t
+
+    def to_dict(self) -> dict:
+        """
+        Dict JSON equivalente a normalizar_tx(original), na mesma ordem de chaves.
+        """
+        out = {k: self[k] for k in self.ordem}
+        for k in _CAMPOS:
+            if k not in out and not (k == "codigo" and self.codigo is None):
+                out[k] = getattr(self, k)
+        return out
+
+    def copia(self) -> "Transacao":
+        t = Transacao(*(getattr(self, k) for k in _CAMPOS), extras=dict(self.extras), ordem=dict(self.ordem))
+        t.prevista, t.efetiva = self.prevista, self.efetiva
+        return t
+
+    @property
+    def data_ref(self) -> Optional[date]:
+        """Data de referência: efetiva > prevista."""
+        return self.efetiva or self.prevista
+
+    # ---------------- interface de dict ----------------
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _CAMPOS:
+            return getattr(self, key)
+        return self.extras.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _CAMPOS:
+            return getattr(self, key)
+        return self.extras[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.ordem:
+            self.ordem[key] = None
+        if key in _CAMPOS:
+            setattr(self, key, value)
+            if key in _DATAS:
+                setattr(self, _DATAS[key], parse_data(value))
+        else:
+            self.extras[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in _CAMPOS or key in self.extras
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, default: Any = _AUSENTE) -> Any:
+        if key in _CAMPOS:
+            atual = getattr(self, key)
+            self[key] = _DEFAULTS[key]
+            return atual
+        self.ordem.pop(key, None)
+        if default is _AUSENTE:
+            return self.extras.pop(key)
+        return self.extras.pop(key, default)
+
+
+# Campos do JSON (na ordem do construtor); extras/ordem/prevista/efetiva são internos
+_CAMPOS = tuple(f.name for f in fields(Transacao) if f.name not in ("extras", "ordem", "prevista", "efetiva"))
+_DEFAULTS = {f.name: f.default for f in fields(Transacao) if f.name in _CAMPOS}
+_DATAS = {"data_prevista": "prevista", "data_efetiva": "efetiva"}
+
 
 def validate_transacao_dict(d: dict) -> bool:
     """Validação leve de transação (tipos e valores mínimos)."""
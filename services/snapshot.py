@@ -0,0 +1,277 @@
+"""
+Estruturas derivadas por versão dos dados.
+
+Cada função é chaveada pelo sha do(s) arquivo(s) no GitHub: enquanto o sha
+não muda, todas as sessões e reruns reutilizam o mesmo objeto.
+Os argumentos com prefixo "_" não entram na chave do cache.
+
+IMPORTANTE: os objetos retornados são compartilhados — trate como somente
+leitura. Para alterar, crie um TransactionStore a partir do JSON. Nos
+DataFrames, filtre/derive (pandas copy-on-write) em vez de atribuir colunas.
+
+Estruturas incrementais (saldos, índices, resumos, metas) seguem as
+escritas da página via Derivados: depois de gravar, as cópias atualizadas
+por delta viram "sementes" do novo sha e a função de cache as reaproveita
+em vez de reconstruir do zero.
+"""
+
+import threading
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from services.finance_queries import coluna_status, concatenar, cubo_kpis, preparar_transacoes_df
+from services.orcamentos import consumo_orcamentos
+from services.projecao import horizonte, projetar
+from services.recorrencia import expandir
+
+from services.busca import IndiceBusca
+from services.competencia import limites_competencia
+from services.incremental import Incremental
+from services.indices import IndiceDatas, IndiceVencimentos
+from services.metas import ProgressoMetas
+from services.resumos import Resumos
+from services.saldos import SaldosContas, SaldosDiarios
+from services.schemas import Transacao
+
+# nome → (chave completa da função de cache, estrutura já atualizada)
+_SEMENTES: dict[str, tuple[tuple, Incremental]] = {}
+_SEMENTES_LOCK = threading.Lock()
+
+
+def _colher(nome: str, *chave) -> Incremental | None:
+    """Semente de `nome` gravada para exatamente esta chave (consumida uma vez)."""
+    with _SEMENTES_LOCK:
+        semente = _SEMENTES.get(nome)
+        if semente is None or semente[0] != chave:
+            return None
+        del _SEMENTES[nome]
+        return semente[1]
+
+
+class Derivados:
+    """
+    Estruturas incrementais do snapshot acompanhando um TransactionStore.
+
+    registrar(nome, obter, *chave): `obter()` devolve o objeto em cache desta
+    versão e `chave` são os argumentos da função de cache além do sha de
+    transações. Nada é copiado até a primeira escrita no store; nela cada
+    estrutura registrada é copiada e passa a receber os deltas.
+    Depois de gravar, semear(novo_sha) entrega as cópias ao próximo snapshot.
+    """
+
+    def __init__(self, store):
+        self._registros: dict[str, tuple] = {}
+        self._copias: dict[str, Incremental] = {}
+        store.observar(self._aplicar)
+
+    def registrar(self, nome: str, obter, *chave) -> None:
+        self._registros[nome] = (obter, chave)
+
+    def __getitem__(self, nome: str) -> Incremental:
+        """Versão atual: a cópia atualizada se já houve escrita, senão a do cache."""
+        copia = self._copias.get(nome)
+        return copia if copia is not None else self._registros[nome][0]()
+
+    def semear(self, sha_transacoes: str) -> None:
+        with _SEMENTES_LOCK:
+            for nome, copia in self._copias.items():
+                _SEMENTES[nome] = ((sha_transacoes, *self._registros[nome][1]), copia)
+
+    def _aplicar(self, antes, depois) -> None:
+        for nome, (obter, _) in self._registros.items():
+            if nome not in self._copias:
+                self._copias[nome] = obter().copia()
+            self._copias[nome].aplicar(antes, depois)
+
+
+def seguir_escritas(store, data: dict, registros) -> Derivados:
+    """
+    Derivados das estruturas incrementais deste snapshot (load_all) ligados
+    ao store da página. Após salvar_transacoes, chame .semear(novo_sha).
+    """
+    sha = data["data/transacoes.json"]["sha"]
+    contas = data["data/contas.json"]
+    derivados = Derivados(store)
+    derivados.registrar(
+        "saldos_contas",
+        lambda: saldos_contas(sha, contas["sha"], registros, contas["content"]),
+        contas["sha"],
+    )
+    derivados.registrar(
+        "saldos_diarios",
+        lambda: saldos_diarios(sha, contas["sha"], registros, contas["content"]),
+        contas["sha"],
+    )
+    derivados.registrar(
+        "indice_datas/prevista",
+        lambda: indice_datas(sha, "prevista", registros),
+        "prevista",
+    )
+    derivados.registrar("indice_vencimentos", lambda: indice_vencimentos(sha, registros))
+    resumos = data["data/resumos.json"]
+    derivados.registrar(
+        "resumos",
+        lambda: resumos_snapshot(sha, resumos["sha"], resumos["content"], registros),
+    )
+    metas = data["data/metas.json"]
+    derivados.registrar(
+        "progresso_metas",
+        lambda: progresso_metas(sha, metas["sha"], registros, metas["content"]),
+        metas["sha"],
+    )
+    return derivados
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def transacoes_tipadas(sha_transacoes: str, _itens: list) -> tuple[Transacao, ...]:
+    """
+    Normalização única por versão de transacoes.json: registros `Transacao`
+    (com datas já convertidas) reaproveitados em todos os reruns.
+    Para escrever, use TransactionStore.from_records() (copy-on-write).
+    """
+    return tuple(Transacao.from_dict(x) for x in _itens if isinstance(x, dict))
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def saldos_contas(sha_transacoes: str, sha_contas: str, _transacoes: list, _contas: list) -> SaldosContas:
+    """Saldos de todas as contas (uma passada, ou semente da última escrita)."""
+    semente = _colher("saldos_contas", sha_transacoes, sha_contas)
+    return semente if semente is not None else SaldosContas(_contas, _transacoes)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def saldos_diarios(sha_transacoes: str, sha_contas: str, _transacoes: list, _contas: list) -> SaldosDiarios:
+    """Saldo por conta e por data (somas acumuladas diárias) para esta versão dos dados."""
+    semente = _colher("saldos_diarios", sha_transacoes, sha_contas)
+    return semente if semente is not None else SaldosDiarios(_contas, _transacoes)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def indice_datas(sha_transacoes: str, chave: str, _transacoes) -> IndiceDatas:
+    """Transações ordenadas por data de referência (ver IndiceDatas)."""
+    semente = _colher(f"indice_datas/{chave}", sha_transacoes, chave)
+    return semente if semente is not None else IndiceDatas(_transacoes, chave=chave)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def indice_vencimentos(sha_transacoes: str, _transacoes) -> IndiceVencimentos:
+    """Itens em aberto ordenados por vencimento (ver IndiceVencimentos)."""
+    semente = _colher("indice_vencimentos", sha_transacoes)
+    return semente if semente is not None else IndiceVencimentos(_transacoes)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def indice_busca(
+    sha_transacoes: str,
+    sha_categorias: str,
+    sha_contas: str,
+    _transacoes,
+    _categorias: list,
+    _contas: list,
+) -> IndiceBusca:
+    """Busca textual (descrição, categoria, conta) desta versão dos dados."""
+    return IndiceBusca(_transacoes, _categorias, _contas)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def frame_transacoes(sha_transacoes: str, _transacoes) -> pd.DataFrame:
+    """
+    DataFrame canônico (finance_queries.preparar_transacoes_df) desta versão
+    de transacoes.json — parse e normalização uma vez, compartilhado por
+    todas as páginas e sessões.
+    """
+    itens = [t.to_dict() if hasattr(t, "to_dict") else t for t in _transacoes]
+    return preparar_transacoes_df(itens)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def frame_com_status(sha_transacoes: str, hoje: date, _transacoes) -> pd.DataFrame:
+    """
+    frame_transacoes + coluna `status` (categórica) vetorizada. Chave:
+    versão dos dados + dia — recalcula só quando um dos dois muda.
+    """
+    df = frame_transacoes(sha_transacoes, _transacoes)
+    return df.assign(status=coluna_status(df, hoje))
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def cubo_kpis_snapshot(
+    sha_transacoes: str,
+    _transacoes,
+    por_conta: bool = False,
+    por_categoria: bool = False,
+) -> pd.DataFrame:
+    """
+    Cubo competência × tipo × realizado (ver finance_queries.cubo_kpis)
+    construído uma vez por versão de transacoes.json.
+    """
+    df = frame_transacoes(sha_transacoes, _transacoes)
+    return cubo_kpis(df, por_conta=por_conta, por_categoria=por_categoria)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def resumos_snapshot(sha_transacoes: str, sha_resumos: str, _conteudo, _transacoes) -> Resumos:
+    """
+    Resumo por competência desta versão: o de resumos.json se ele reflete
+    sha_transacoes, a semente da última escrita ou, por fim, reconstruído.
+    """
+    # A semente vale para o sha de transações, qualquer que seja o sha do
+    # arquivo (salvar_transacoes regrava resumos.json junto com a escrita)
+    semente = _colher("resumos", sha_transacoes)
+    if semente is not None:
+        semente.sha_transacoes = sha_transacoes
+        return semente
+    return Resumos.carregar(_conteudo, sha_transacoes, _transacoes)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def projecao_caixa(
+    sha_transacoes: str,
+    sha_contas: str,
+    hoje: date,
+    meses: int,
+    _transacoes,
+    _contas: list,
+) -> pd.DataFrame:
+    """
+    Saldo diário projetado por conta para os próximos `meses` (ver
+    services.projecao). Chave: versão dos dados + dia + horizonte.
+    """
+    inicio, fim = horizonte(hoje, meses)
+    # Virtuais desde o início do mês: as vencidas não pagas também contam
+    virtuais = expandir(_transacoes, inicio.replace(day=1), fim)
+    df = concatenar(frame_transacoes(sha_transacoes, _transacoes), preparar_transacoes_df(virtuais))
+    saldos = saldos_contas(sha_transacoes, sha_contas, _transacoes, _contas).centavos_por_conta()
+    return projetar(df, saldos, inicio, fim)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def consumo_orcamentos_snapshot(
+    sha_transacoes: str,
+    sha_orcamentos: str,
+    competencias: tuple[str, ...],
+    _transacoes,
+    _orcamentos: list,
+) -> pd.DataFrame:
+    """
+    Gasto × limite por orçamento nas competências pedidas (ver
+    services.orcamentos), sobre o cubo por categoria desta versão.
+    Recorrências virtuais das competências entram como previstas.
+    """
+    cubo = cubo_kpis_snapshot(sha_transacoes, _transacoes, por_categoria=True)
+    if competencias:
+        inicio = limites_competencia(min(competencias))[0]
+        fim = limites_competencia(max(competencias))[1]
+        virtuais = preparar_transacoes_df(expandir(_transacoes, inicio, fim))
+        if not virtuais.empty:
+            cubo = cubo.add(cubo_kpis(virtuais, por_categoria=True), fill_value=0)
+    return consumo_orcamentos(cubo, _orcamentos, competencias)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def progresso_metas(sha_transacoes: str, sha_metas: str, _transacoes, _metas: list) -> ProgressoMetas:
+    """Acumulado por meta (transações vinculadas) para esta versão dos dados."""
+    semente = _colher("progresso_metas", sha_transacoes, sha_metas)
+    return semente if semente is not None else ProgressoMetas(_metas, _transacoes)
@@ -30,11 +30,21 @@ def derivar_status(data_prevista: str | None, data_efetiva: str | None) -> str:
     except Exception:
         return "planejada"
 
-    hoje = date.today()
+    return status_em(d, None, date.today())
 
-    if d < hoje:
+
+def status_em(prevista: date | None, efetiva, hoje: date) -> str:
+    """
+    Mesma regra de derivar_status com datas já convertidas e `hoje`
+    fixado pelo chamador (uma leitura do relógio por rerun, não por linha).
+    """
+    if efetiva:
+        return "paga"
+    if prevista is None:
+        return "planejada"
+    if prevista < hoje:
         return "vencida"
-    if d == hoje:
+    if prevista == hoje:
         return "vencendo"
     return "planejada"
 
@@ -1,8 +1,16 @@
 
 # services/ui.py
+from typing import Any, Callable, Optional, Sequence
+
 import streamlit as st
 from services.layout import is_mobile
 
+# Itens por página oferecidos nas listas paginadas
+TAMANHOS_PAGINA = (10, 25, 50, 100)
+
+# rótulo → (chave de ordenação, decrescente); chave None = ordem recebida
+Ordenacoes = dict[str, tuple[Optional[Callable[[Any], Any]], bool]]
+
 
 def section(title: str, caption: str | None = None):
     st.subheader(title)
@@ -20,15 +28,106 @@ def card(title: str, lines: list[str]):
             st.write(l)
 
 
-def responsive_dataframe(df):
+def responsive_dataframe(df, chave: str | None = None):
     """
     Tabela no desktop → cartões no mobile
+    (com `chave`, os cartões são paginados)
     """
     if is_mobile():
-        for row in df.to_dict(orient="records"):
+        linhas = df.to_dict(orient="records")
+        if chave:
+            linhas = paginar(linhas, chave)
+        for row in linhas:
             with st.container(border=True):
                 for k, v in row.items():
                     st.write(f"**{k}:** {v}")
     else:
         st.dataframe(df, use_container_width=True)
 
+
+# ---------------------------------------------------------
+# Listas paginadas
+# ---------------------------------------------------------
+def _mudar_pagina(chave: str, delta: int) -> None:
+    st.session_state[chave] = st.session_state.get(chave, 1) + delta
+
+
+def paginar(
+    itens: Sequence,
+    chave: str,
+    ordenacoes: Ordenacoes | None = None,
+    tamanhos: Sequence[int] = TAMANHOS_PAGINA,
+) -> list:
+    """
+    Controles de ordenação, itens por página e navegação; devolve só a
+    fatia da página atual. Ordenação e fatiamento acontecem aqui (no
+    servidor), então a página cria widgets apenas para os itens visíveis.
+
+    `chave` identifica a lista no session_state (uma por lista na página).
+    A página é ajustada ao total quando filtros reduzem a lista.
+    """
+    mobile = is_mobile()
+    cols = st.columns(2) if ordenacoes and not mobile else [st.container(), st.container()]
+
+    rotulo = None
+    if ordenacoes:
+        rotulo = cols[0].selectbox("Ordenar por", list(ordenacoes), key=f"{chave}-ordem")
+        fn, desc = ordenacoes[rotulo]
+        if fn is not None:
+            itens = sorted(itens, key=fn, reverse=desc)
+
+    tamanho = cols[1].selectbox("Itens por página", list(tamanhos), key=f"{chave}-tamanho")
+
+    total = len(itens)
+    paginas = max(1, -(-total // tamanho))
+    k_pagina = f"{chave}-pagina"
+    pagina = min(max(1, st.session_state.get(k_pagina, 1)), paginas)
+    # Nova ordenação ou novo tamanho de página: volta ao início
+    if st.session_state.get(f"{chave}-visao", (rotulo, tamanho)) != (rotulo, tamanho):
+        pagina = 1
+    st.session_state[f"{chave}-visao"] = (rotulo, tamanho)
+    st.session_state[k_pagina] = pagina
+
+    ini = (pagina - 1) * tamanho
+    fim = min(ini + tamanho, total)
+
+    if paginas > 1:
+        nav = st.columns([1, 3, 1])
+        nav[0].button(
+            "◀",
+            key=f"{chave}-anterior",
+            disabled=pagina <= 1,
+            on_click=_mudar_pagina,
+            args=(k_pagina, -1),
+        )
+        nav[1].caption(f"Página {pagina} de {paginas} · itens {ini + 1}–{fim} de {total}")
+        nav[2].button(
+            "▶",
+            key=f"{chave}-proxima",
+            disabled=pagina >= paginas,
+            on_click=_mudar_pagina,
+            args=(k_pagina, 1),
+        )
+
+    return list(itens[ini:fim])
+
+
+def lista_paginada(
+    itens: Sequence,
+    chave: str,
+    desktop: Callable[[Any], None],
+    mobile: Callable[[Any], None] | None = None,
+    ordenacoes: Ordenacoes | None = None,
+    vazio: str = "Nenhum item.",
+) -> None:
+    """
+    Lista paginada (ver paginar) renderizando cada item visível com
+    `desktop` ou, no modo mobile, com `mobile` (cartão).
+    """
+    if not itens:
+        st.info(vazio)
+        return
+    render = mobile if (mobile and is_mobile()) else desktop
+    for item in paginar(itens, chave, ordenacoes):
+        render(item)
+
@@ -1,9 +1,14 @@
 
 # services/utils.py
+import numpy as np
 import streamlit as st
 import pandas as pd
 from datetime import date, datetime
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from services.dinheiro import centavos, centavos_series, fmt_centavos
+from services.finance_queries import parse_datas
 
 
 # ---------------------------------------------------------
@@ -15,17 +20,25 @@ def fmt_brl(v: Any) -> str:
     - Aceita int, float, str numérica; fallback para 0.0 quando inválido.
     - Negativos exibem prefixo '-'.
     - Usa separadores padrão brasileiro (ponto para milhar, vírgula para decimal).
+    - Formata a partir de centavos inteiros (sem arredondamento de float).
     """
-    try:
-        val = float(v)
-    except (ValueError, TypeError):
-        val = 0.0
+    return fmt_centavos(centavos(v))
+
+
+def fmt_brl_series(s: pd.Series) -> pd.Series:
+    """
+    fmt_brl para uma coluna inteira: centavos vetorizados e cada valor
+    distinto formatado uma única vez.
+    """
+    return _por_valores_unicos(centavos_series(s), lambda u: fmt_centavos(int(u)))
 
-    abs_val = abs(val)
-    s = f"{abs_val:,.2f}"
-    s = s.replace(",", "X").replace(".", ",").replace("X", ".")
-    prefix = "-" if val < 0 else ""
-    return f"{prefix}R$ {s}"
+
+def _por_valores_unicos(s: pd.Series, fmt: Callable[[Any], str], vazio: str = "—") -> pd.Series:
+    """Aplica `fmt` só aos valores distintos de `s` (factorize); nulos viram `vazio`."""
+    codigos, unicos = pd.factorize(s)
+    textos = np.array([fmt(u) for u in unicos] + [vazio], dtype=object)
+    # código -1 (nulo) cai no último elemento: `vazio`
+    return pd.Series(textos[codigos], index=s.index)
 
 
 # ---------------------------------------------------------
@@ -36,10 +49,11 @@ def parse_date_safe(d: Any) -> Optional[date]:
     Converte para `date` aceitando:
       - date
       - datetime (usa .date())
-      - string no formato ISO (ou reconhecível pelo pandas)
+      - string 'aaaa-mm-dd[...]' ou 'dd/mm/aaaa' (caminho rápido, com cache)
+      - outras strings reconhecíveis pelo pandas
     Retorna None se inválido.
     """
-    if d is None:
+    if d is None or d is pd.NaT:
         return None
 
     try:
@@ -47,12 +61,33 @@ def parse_date_safe(d: Any) -> Optional[date]:
             return d
         if isinstance(d, datetime):
             return d.date()
-        # pandas lida com variadas strings, inclusive ISO
-        return pd.to_datetime(d, errors="coerce").date()
+        if isinstance(d, str):
+            return _parse_date_str(d)
+        return _parse_date_pandas(d)
     except Exception:
         return None
 
 
+@lru_cache(maxsize=4096)
+def _parse_date_str(s: str) -> Optional[date]:
+    """Strings de data: formatos do app sem pandas; o resto cai no pandas."""
+    s = s.strip()
+    try:
+        if len(s) >= 10 and s[4] == "-" and s[7] == "-":
+            return date.fromisoformat(s[:10])
+        if len(s) == 10 and s[2] == "/" and s[5] == "/":
+            return date(int(s[6:]), int(s[3:5]), int(s[:2]))
+    except ValueError:
+        pass
+    return _parse_date_pandas(s)
+
+
+def _parse_date_pandas(d: Any) -> Optional[date]:
+    # pandas lida com variadas strings, inclusive ISO; inválido → NaT
+    ts = pd.to_datetime(d, errors="coerce")
+    return None if pd.isna(ts) else ts.date()
+
+
 def fmt_date_br(d: Any) -> str:
     """
     Formata qualquer data como 'dd/mm/aaaa' ou '—' quando inválida.
@@ -64,8 +99,11 @@ def fmt_date_br(d: Any) -> str:
 def fmt_series_date_br(s: pd.Series) -> pd.Series:
     """
     Formata uma Series de datas para 'dd/mm/aaaa', com tolerância a valores inválidos.
+    Conversão vetorizada (ISO, depois dd/mm/aaaa) e strftime só nas datas distintas.
     """
-    return s.apply(fmt_date_br)
+    if not pd.api.types.is_datetime64_any_dtype(s):
+        s = parse_datas(s)
+    return _por_valores_unicos(s, lambda d: d.strftime("%d/%m/%Y"))
 
 
 # ---------------------------------------------------------
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os módulos são importados como `services.*`, a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
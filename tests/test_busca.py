@@ -0,0 +1,73 @@
+from services.busca import IndiceBusca, normalizar, trigramas
+from services.schemas import Transacao
+
+CATEGORIAS = [{"id": "cat2", "nome": "Alimentação"}, {"id": "cat3", "nome": "Transporte"}]
+CONTAS = [{"id": "c1", "nome": "Nubank"}]
+
+
+def _indice(extra=()):
+    itens = [
+        {"id": "a", "descricao": "Café da manhã", "categoria_id": "cat2", "conta_id": "c1", "data_prevista": "2026-01-05"},
+        {"id": "b", "descricao": "Padaria", "categoria_id": "cat2", "conta_id": "c1", "data_prevista": "2026-01-20"},
+        {"id": "c", "descricao": "Uber aeroporto", "categoria_id": "cat3", "conta_id": "c1", "data_prevista": "2026-01-10"},
+        {"id": "d", "descricao": "Supermercado", "categoria_id": "cat2", "conta_id": "c1", "data_prevista": "2026-01-15"},
+        {"id": "x", "descricao": "Café excluído", "excluido": True, "data_prevista": "2026-01-30"},
+        *extra,
+    ]
+    return IndiceBusca([Transacao.from_dict(x) for x in itens], CATEGORIAS, CONTAS)
+
+
+def test_normalizar():
+    assert normalizar("  Café  da Manhã! ") == "cafe da manha"
+    assert normalizar(None) == ""
+    assert "  c" in trigramas("cafe")
+
+
+def test_acentos_e_caixa():
+    idx = _indice()
+    assert len(idx) == 4
+    assert [i for i, _ in idx.buscar("CAFE")] == ["a"]
+    assert [i for i, _ in idx.buscar("manha")] == ["a"]
+
+
+def test_descricao_pesa_mais_que_categoria():
+    idx = _indice([{"id": "e", "descricao": "Restaurante alimentacao", "categoria_id": "cat3", "data_prevista": "2026-01-01"}])
+    ids = [i for i, _ in idx.buscar("alimentacao")]
+    # Descrição primeiro; empates de categoria pela data mais recente
+    assert ids == ["e", "b", "d", "a"]
+
+
+def test_prefixo_trecho_e_erro_de_digitacao():
+    idx = _indice()
+    assert [i for i, _ in idx.buscar("super")] == ["d"]
+    assert [i for i, _ in idx.buscar("mercado")] == ["d"]
+    assert [i for i, _ in idx.buscar("aeroprto")] == ["c"]
+    exato = dict(idx.buscar("padaria"))["b"]
+    prefixo = dict(idx.buscar("pada"))["b"]
+    assert exato > prefixo
+
+
+def test_todos_os_termos_precisam_casar():
+    idx = _indice()
+    assert [i for i, _ in idx.buscar("uber nubank")] == ["c"]
+    assert idx.buscar("uber padaria") == []
+    assert idx.buscar("") == []
+    assert idx.buscar("zzzz") == []
+
+
+def test_universo_e_limite():
+    idx = _indice()
+    assert [i for i, _ in idx.buscar("nubank", ids={"a", "c"})] == ["c", "a"]
+    assert len(idx.buscar("nubank", limite=2)) == 2
+    assert len(idx.buscar("nubank", limite=None)) == 4
+    assert [t.id for t in idx.transacoes("padaria")] == ["b"]
+
+
+def test_ids_repetidos_sao_documentos_distintos():
+    legados = [
+        {"id": "", "descricao": "Farmácia centro", "data_prevista": "2026-01-02"},
+        {"id": "", "descricao": "Farmácia bairro", "data_prevista": "2026-01-03"},
+    ]
+    idx = _indice(legados)
+    assert [t.descricao for t in idx.transacoes("farmacia")] == ["Farmácia bairro", "Farmácia centro"]
+    assert [t.descricao for t in idx.transacoes("farmacia centro")] == ["Farmácia centro"]
@@ -0,0 +1,65 @@
+from services.data_loader import DEFAULTS, salvar_transacoes
+from services.finance_core import TransactionStore
+from services.resumos import Resumos
+
+
+class GitHubFalso:
+    def __init__(self, falhar=()):
+        self.puts = []
+        self._falhar = set(falhar)
+
+    def put_json(self, path, obj, message, sha=None):
+        if path in self._falhar:
+            raise RuntimeError("409")
+        self.puts.append((path, obj, message, sha))
+        return f"sha-{len(self.puts)}"
+
+
+ITENS = [
+    {"id": "a", "tipo": "despesa", "valor": 12.5, "data_prevista": "2026-01-10", "categoria_id": "cat2"},
+    {"id": "b", "tipo": "receita", "valor": 100.0, "data_prevista": "2026-01-05"},
+]
+
+
+def _store_com_resumos():
+    store = TransactionStore.from_list(ITENS)
+    resumos = Resumos.construir(store, "sha-0").copia().conectar(store)
+    store.baixar("a")
+    return store, resumos
+
+
+def test_grava_resumos_com_o_novo_sha():
+    store, resumos = _store_com_resumos()
+    gh = GitHubFalso()
+    novo = salvar_transacoes(gh, store, "[u1] Baixa a", "sha-0", resumos=resumos, sha_resumos="r-0")
+
+    assert novo == "sha-1"
+    assert [(p, m, s) for p, _, m, s in gh.puts] == [
+        ("data/transacoes.json", "[u1] Baixa a", "sha-0"),
+        ("data/resumos.json", "[u1] Baixa a (resumos)", "r-0"),
+    ]
+    conteudo = gh.puts[1][1]
+    assert conteudo["sha_transacoes"] == "sha-1"
+    # O próximo carregamento usa o arquivo: nada a reconstruir, sem deriva
+    carregado = Resumos.carregar(conteudo, "sha-1", ())
+    assert carregado.verificar(store) == []
+    # O objeto em memória não é alterado pela gravação
+    assert resumos.sha_transacoes == "sha-0"
+
+
+def test_falha_em_resumos_nao_desfaz_a_escrita():
+    store, resumos = _store_com_resumos()
+    gh = GitHubFalso(falhar={"data/resumos.json"})
+    assert salvar_transacoes(gh, store, "msg", "sha-0", resumos=resumos, sha_resumos="r-0") == "sha-1"
+    assert [p for p, *_ in gh.puts] == ["data/transacoes.json"]
+
+
+def test_sem_resumos_grava_so_transacoes():
+    gh = GitHubFalso()
+    salvar_transacoes(gh, TransactionStore.from_list(ITENS), "msg", "sha-0")
+    assert [p for p, *_ in gh.puts] == ["data/transacoes.json"]
+
+
+def test_default_de_resumos_e_versionado():
+    assert Resumos(DEFAULTS["data/resumos.json"]).competencias() == []
+    assert DEFAULTS["data/resumos.json"]["versao"] == 1
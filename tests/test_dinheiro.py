@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from services.dinheiro import centavos, centavos_series, fmt_centavos, reais
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    (0.125, 13),
+    ("0.125", 13),
+    (Decimal("0.125"), 13),
+    (1.005, 101),
+    (2.675, 268),
+    (-0.125, -13),
+    (192.49, 19249),
+    (0.1 + 0.2, 30),
+    (5, 500),
+    ("  12,5 ", 0),
+    (None, 0),
+    (True, 0),
+    (float("nan"), 0),
+    ("abc", 0),
+])
+def test_centavos(valor, esperado):
+    assert centavos(valor) == esperado
+
+
+def test_series_segue_a_mesma_regra():
+    valores = [0.125, 1.005, 2.675, -0.125, 192.49, 0.1 + 0.2, 3, None, "7.5", "x", float("inf")]
+    s = pd.Series(valores, dtype=object)
+    assert centavos_series(s).tolist() == [centavos(v) if v != float("inf") else 0 for v in valores]
+    assert centavos_series(s).dtype == "int64"
+
+
+def test_reais_e_formatacao():
+    assert reais(19249) == 192.49
+    assert fmt_centavos(123456) == "R$ 1.234,56"
+    assert fmt_centavos(-50) == "-R$ 0,50"
+    assert fmt_centavos(0) == "R$ 0,00"
+
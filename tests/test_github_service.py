@@ -0,0 +1,227 @@
+import base64
+import io
+import json
+import tarfile
+import threading
+from datetime import timedelta
+
+import pytest
+import requests
+import streamlit as st
+
+import github_service
+from github_service import GitHubService
+
+
+def _resposta(status=200, corpo=b"{}", headers=None, ms=10):
+    r = requests.Response()
+    r.status_code = status
+    r._content = corpo if isinstance(corpo, bytes) else json.dumps(corpo).encode()
+    r.headers.update(headers or {})
+    r.elapsed = timedelta(milliseconds=ms)
+    return r
+
+
+class SessaoFalsa:
+    """Substitui requests.Session: devolve respostas prontas e registra as chamadas."""
+
+    def __init__(self, *respostas):
+        self.respostas = list(respostas)
+        self.chamadas = []
+
+    def request(self, method, url, **kwargs):
+        self.chamadas.append((method, url, kwargs.get("params")))
+        r = self.respostas.pop(0) if len(self.respostas) > 1 else self.respostas[0]
+        return r() if callable(r) else r
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    monkeypatch.setattr(github_service.time, "sleep", lambda s: None)
+    monkeypatch.setattr(github_service, "sleep", lambda s: None)
+
+
+def _gh(*respostas, **kw):
+    gh = GitHubService("tok", "dono/repo", "main", **kw)
+    gh.session = SessaoFalsa(*respostas)
+    return gh
+
+
+# ---------------------------------------------------------
+# Pool e retry (user-027)
+# ---------------------------------------------------------
+def test_adapter_com_pool_e_retry_so_de_5xx_em_leitura():
+    gh = GitHubService("tok", "dono/repo", pool_size=4, max_retries=3)
+    adapter = gh.session.get_adapter("https://api.github.com/x")
+    assert adapter is gh.session.get_adapter("http://exemplo/x")
+    assert adapter._pool_maxsize == 4
+    retry = adapter.max_retries
+    assert (retry.total, retry.connect, retry.read, retry.status) == (3, 0, 0, 3)
+    assert set(retry.status_forcelist) == {502, 503, 504}
+    assert retry.allowed_methods == frozenset({"GET", "HEAD"})
+    assert retry.raise_on_status is False
+
+
+def test_warm_up_mede_conexao_nova_e_pool():
+    gh = _gh(_resposta(ms=180), _resposta(ms=25))
+    assert gh.warm_up() == (180.0, 25.0)
+    assert len(gh.session.chamadas) == 2
+
+
+def test_rate_limit_em_todas_as_tentativas_nao_quebra_o_warm_up():
+    limitado = _resposta(429, b"", {"Retry-After": "0"})
+    gh = _gh(limitado, max_retries=2)
+    assert gh._request("GET", "https://api.github.com/x") is limitado
+    assert len(gh.session.chamadas) == 3
+    assert gh.warm_up() is None
+
+
+def test_warm_up_com_falha_de_conexao():
+    def falha():
+        raise requests.exceptions.ConnectionError("sem rede")
+
+    assert _gh(falha).warm_up() is None
+
+
+def test_cliente_compartilhado_por_token_repo_branch(monkeypatch):
+    from services import app_context
+
+    monkeypatch.setattr(st, "secrets", {"http_pool_size": 3})
+    monkeypatch.setattr(GitHubService, "warm_up", lambda self: None)
+    app_context.get_github_service.clear()
+    try:
+        a = app_context.get_github_service("tok", "dono/repo", "main")
+        assert app_context.get_github_service("tok", "dono/repo", "main") is a
+        assert app_context.get_github_service("tok", "dono/repo", "dev") is not a
+        assert a.session.get_adapter("https://api.github.com")._pool_maxsize == 3
+    finally:
+        app_context.get_github_service.clear()
+
+
+# ---------------------------------------------------------
+# Single-flight (user-028)
+# ---------------------------------------------------------
+def _conteudo(obj, sha="s1"):
+    b64 = base64.b64encode(json.dumps(obj).encode()).decode()
+    return _resposta(200, {"content": b64, "sha": sha})
+
+
+class SessaoLenta(SessaoFalsa):
+    """Segura cada GET até `liberar`; a resposta segue a ordem de chegada."""
+
+    def __init__(self, *respostas):
+        super().__init__(*respostas)
+        self.liberar = threading.Event()
+        self.chegadas = threading.Semaphore(0)
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            r = super().request(method, url, **kwargs)
+        self.chegadas.release()
+        self.liberar.wait(5)
+        return r
+
+
+def _ler_em_threads(gh, n):
+    out = []
+    ts = [threading.Thread(target=lambda: out.append(gh.get_json("data/x.json"))) for _ in range(n)]
+    for t in ts:
+        t.start()
+    return ts, out
+
+
+def test_leituras_concorrentes_compartilham_um_get(monkeypatch):
+    esperando = threading.Semaphore(0)
+
+    class Evento(threading.Event):
+        def wait(self, timeout=None):
+            esperando.release()
+            return super().wait(timeout)
+
+    class EmAndamento(github_service._InFlight):
+        def __init__(self):
+            super().__init__()
+            self.done = Evento()
+
+    monkeypatch.setattr(github_service, "_InFlight", EmAndamento)
+    gh = _gh()
+    gh.session = SessaoLenta(_conteudo([1, 2]))
+    ts, out = _ler_em_threads(gh, 8)
+    assert gh.session.chegadas.acquire(timeout=5)
+    # Só libera o GET depois que os outros 7 estão aguardando o resultado
+    for _ in range(7):
+        assert esperando.acquire(timeout=5)
+    gh.session.liberar.set()
+    for t in ts:
+        t.join()
+    assert len(gh.session.chamadas) == 1
+    assert [o for o, _ in out] == [[1, 2]] * 8
+    # Cada chamador recebe sua própria cópia
+    out[0][0].append(3)
+    assert out[1][0] == [1, 2]
+    assert gh._inflight == {}
+
+
+def test_geracao_faz_parte_da_chave_em_andamento():
+    gh = _gh()
+    gh.session = SessaoLenta(_conteudo([1], "s1"), _conteudo([2], "s2"))
+    antigos, out_antigo = _ler_em_threads(gh, 1)
+    assert gh.session.chegadas.acquire(timeout=5)
+    with gh._inflight_lock:
+        assert list(gh._inflight) == [("data/x.json", "main", 0)]
+
+    gh._nova_geracao("data/x.json")
+    novos, out_novo = _ler_em_threads(gh, 1)
+    # A leitura nova emite o próprio GET em vez de aguardar o anterior
+    assert gh.session.chegadas.acquire(timeout=5)
+    gh.session.liberar.set()
+    for t in antigos + novos:
+        t.join()
+    # Dois GETs: a leitura posterior à escrita não esperou pela anterior
+    assert len(gh.session.chamadas) == 2
+    assert out_antigo == [([1], "s1")]
+    assert out_novo == [([2], "s2")]
+
+
+def test_put_json_sobe_a_geracao():
+    gh = _gh(_resposta(201, {"content": {"sha": "novo"}}))
+    assert gh.put_json("data/x.json", [1], "msg", sha="velho") == "novo"
+    assert gh._geracoes == {"data/x.json": 1}
+
+
+# ---------------------------------------------------------
+# Bootstrap via tarball (user-026)
+# ---------------------------------------------------------
+def _tarball(arquivos: dict) -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for nome, raw in arquivos.items():
+            info = tarfile.TarInfo(f"dono-repo-abc123/{nome}")
+            info.size = len(raw)
+            tar.addfile(info, io.BytesIO(raw))
+    return buf.getvalue()
+
+
+def test_tarball_extrai_json_de_data_com_sha_de_blob():
+    raw = _tarball({
+        "data/contas.json": b'[{"id": "c1"}]\n',
+        "data/ruim.json": b"{nao e json",
+        "data/notas.txt": b"x",
+        "app.py": b"print()",
+    })
+    r = _resposta(200, b"")
+    r.raw = io.BytesIO(raw)
+    gh = _gh(r)
+    out = gh.download_archive("data/")
+    # Mesmo sha de `git hash-object` (e da Contents API)
+    assert out == {"data/contas.json": ([{"id": "c1"}], "de8f4af8bb418ea8e3c652042493f450e388cfdf")}
+    assert gh.session.chamadas[0][1].endswith("/repos/dono/repo/tarball/main")
+
+
+def test_tarball_com_erro_http():
+    r = _resposta(404, b"")
+    r.raw = io.BytesIO(b"")
+    gh = _gh(r)
+    with pytest.raises(RuntimeError):
+        gh.download_archive()
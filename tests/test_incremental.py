@@ -0,0 +1,34 @@
+import pytest
+
+from services.incremental import Incremental
+
+
+def test_subclasse_sem_aplicar_falha_ao_instanciar():
+    class SemAplicar(Incremental):
+        pass
+
+    with pytest.raises(TypeError):
+        SemAplicar()
+
+
+def test_conectar_e_copia():
+    class Contador(Incremental):
+        def __init__(self):
+            self.n = 0
+
+        def aplicar(self, antes, depois):
+            self.n += 1
+
+    class Store:
+        def __init__(self):
+            self.observadores = []
+
+        def observar(self, fn):
+            self.observadores.append(fn)
+
+    store = Store()
+    c = Contador().conectar(store)
+    store.observadores[0](None, {})
+    copia = c.copia()
+    copia.aplicar(None, {})
+    assert (c.n, copia.n) == (1, 2)
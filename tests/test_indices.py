@@ -0,0 +1,173 @@
+from datetime import date
+
+import pytest
+
+from services.finance_core import TransactionStore
+from services.indices import IndiceDatas, IndiceVencimentos
+from services.schemas import Transacao
+
+
+def _registros():
+    itens = [
+        {"id": "a", "tipo": "despesa", "valor": 10.0, "data_prevista": "2026-01-05"},
+        {"id": "b", "tipo": "receita", "valor": 20.0, "data_prevista": "2026-01-20", "data_efetiva": "2026-02-02"},
+        {"id": "c", "tipo": "despesa", "valor": 30.0, "data_prevista": "2026-02-10", "data_efetiva": "2026-02-11"},
+        {"id": "d", "tipo": "despesa", "valor": 40.0, "data_prevista": "2026-03-01", "excluido": True},
+        {"id": "e", "tipo": "despesa", "valor": 50.0},
+        # Legados sem id: mesmo id "" repetido
+        {"id": "", "tipo": "despesa", "valor": 1.0, "data_prevista": "2026-01-05"},
+        {"id": "", "tipo": "despesa", "valor": 2.0, "data_prevista": "2026-01-05"},
+    ]
+    return tuple(Transacao.from_dict(x) for x in itens)
+
+
+def _ids(txs):
+    return [(t.get("id"), t.get("valor")) for t in txs]
+
+
+def _igual(a: IndiceDatas, b: IndiceDatas) -> bool:
+    return a.competencias() == b.competencias() and all(
+        sorted(_ids(a.competencia(c))) == sorted(_ids(b.competencia(c))) for c in b.competencias()
+    )
+
+
+def test_chave_efetiva_e_prevista():
+    regs = _registros()
+    efetiva = IndiceDatas(regs)
+    prevista = IndiceDatas(regs, "prevista")
+    assert len(efetiva) == 5
+    assert [t.id for t in efetiva.competencia("2026-02")] == ["b", "c"]
+    assert [t.id for t in prevista.competencia("2026-01")] == ["a", "", "", "b"]
+    assert efetiva.competencias() == ["2026-02", "2026-01"]
+    assert _ids(efetiva.periodo(date(2026, 1, 5), date(2026, 1, 5))) == [("a", 10.0), ("", 1.0), ("", 2.0)]
+    assert efetiva.periodo(date(2025, 1, 1), date(2025, 12, 31)) == []
+    with pytest.raises(ValueError):
+        IndiceDatas(regs, "competencia")
+
+
+def test_aplicar_igual_a_reconstrucao():
+    regs = _registros()
+    store = TransactionStore.from_records(regs)
+    idx = IndiceDatas(regs, "prevista").conectar(store)
+
+    store.reagendar("a", "2026-03-15")
+    store.baixar("a")
+    store.estornar("c")
+    store.excluir("b")
+    store.reagendar("e", "2026-01-31")
+    store.criar({"id": "f", "tipo": "receita", "valor": 5.0, "data_prevista": "2026-01-05"})
+
+    assert _igual(idx, IndiceDatas(store, "prevista"))
+    assert [t.id for t in idx.competencia("2026-03")] == ["a"]
+
+
+def test_ids_repetidos_removem_o_registro_certo():
+    regs = _registros()
+    idx = IndiceDatas(regs)
+    segundo = regs[6]
+    depois = segundo.copia()
+    depois["data_prevista"] = "2026-04-01"
+    idx.aplicar(segundo, depois)
+    assert _ids(idx.competencia("2026-01")) == [("a", 10.0), ("", 1.0)]
+    assert _ids(idx.competencia("2026-04")) == [("", 2.0)]
+
+
+def test_copia_nao_altera_o_original():
+    regs = _registros()
+    original = IndiceDatas(regs)
+    c = original.copia()
+    c.aplicar(regs[0], None)
+    assert len(original) == 5 and len(c) == 4
+    assert "a" in [t.id for t in original.competencia("2026-01")]
+
+
+def test_totais_por_competencia():
+    idx = IndiceDatas(_registros(), "prevista")
+    assert idx.totais("2026-01") == {("despesa", False): 1300, ("receita", True): 2000}
+    assert idx.totais("2026-02") == {("despesa", True): 3000}
+    assert idx.totais("2025-12") == {}
+
+
+def test_totais_seguem_as_escritas():
+    regs = _registros()
+    store = TransactionStore.from_records(regs)
+    idx = IndiceDatas(regs, "prevista").conectar(store)
+
+    store.baixar("a")
+    store.reagendar("c", "2026-01-31")
+    store.excluir("b")
+    store.criar({"id": "f", "tipo": "receita", "valor": 0.1, "data_prevista": "2026-02-01"})
+
+    novo = IndiceDatas(store, "prevista")
+    for comp in ("2026-01", "2026-02", "2026-03"):
+        assert idx.totais(comp) == novo.totais(comp)
+    assert idx.totais("2026-01") == {("despesa", False): 300, ("despesa", True): 4000}
+    assert idx.competencias() == ["2026-02", "2026-01"]
+
+
+# ---------------------------------------------------------
+# IndiceVencimentos
+# ---------------------------------------------------------
+HOJE = date(2026, 1, 10)
+
+
+def _abertas():
+    itens = [
+        {"id": "v1", "tipo": "despesa", "valor": 10.0, "data_prevista": "2026-01-05"},
+        {"id": "h1", "tipo": "despesa", "valor": 20.0, "data_prevista": "2026-01-10"},
+        {"id": "p1", "tipo": "despesa", "valor": 30.0, "data_prevista": "2026-01-17"},
+        {"id": "l1", "tipo": "despesa", "valor": 40.0, "data_prevista": "2026-03-01"},
+        {"id": "s1", "tipo": "despesa", "valor": 99.0},
+        {"id": "pg", "tipo": "despesa", "valor": 5.0, "data_prevista": "2026-01-05", "data_efetiva": "2026-01-05"},
+        {"id": "r1", "tipo": "receita", "valor": 7.0, "data_prevista": "2026-01-08"},
+    ]
+    return tuple(Transacao.from_dict(x) for x in itens)
+
+
+def _estado(idx: IndiceVencimentos):
+    return {
+        tipo: ([t.id for t in idx.abertas(tipo)], idx.totais(tipo, HOJE))
+        for tipo in ("despesa", "receita")
+    }
+
+
+def test_vencimentos_fatias_e_totais():
+    idx = IndiceVencimentos(_abertas())
+    assert len(idx) == 6
+    # Sem data_prevista: só no fim de abertas(), fora dos totais
+    assert [t.id for t in idx.abertas("despesa")] == ["v1", "h1", "p1", "l1", "s1"]
+    assert [t.id for t in idx.vencidas("despesa", HOJE)] == ["v1"]
+    assert [t.id for t in idx.vencendo("despesa", HOJE)] == ["h1"]
+    assert [t.id for t in idx.proximas("despesa", HOJE)] == ["h1", "p1"]
+    assert idx.totais("despesa", HOJE) == (10000, 1000, 5000)
+    assert idx.totais("receita", HOJE) == (700, 700, 0)
+    assert idx.abertas("transferencia") == []
+
+
+def test_vencimentos_aplicar_igual_a_reconstrucao():
+    regs = _abertas()
+    store = TransactionStore.from_records(regs)
+    idx = IndiceVencimentos(regs).conectar(store)
+    idx.totais("despesa", HOJE)
+
+    store.baixar("v1")
+    store.reagendar("s1", "2026-01-12")
+    store.estornar("pg")
+    store.excluir("l1")
+    store.criar({"id": "n1", "tipo": "receita", "valor": 1.0})
+
+    assert _estado(idx) == _estado(IndiceVencimentos(store))
+    assert idx.totais("despesa", HOJE) == (15400, 500, 14900)
+
+
+def test_vencimentos_sem_data_com_ids_repetidos():
+    itens = [
+        {"id": "", "tipo": "despesa", "valor": 1.0},
+        {"id": "", "tipo": "despesa", "valor": 2.0},
+    ]
+    regs = tuple(Transacao.from_dict(x) for x in itens)
+    idx = IndiceVencimentos(regs)
+    depois = regs[1].copia()
+    depois["data_efetiva"] = "2026-01-10"
+    idx.aplicar(regs[1], depois)
+    assert [t.valor for t in idx.abertas("despesa")] == [1.0]
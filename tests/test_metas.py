@@ -0,0 +1,59 @@
+import logging
+
+from services.finance_core import TransactionStore
+from services.metas import ProgressoMetas
+from services.schemas import Transacao
+
+METAS = [
+    {"id": "m1", "nome": "Viagem", "categoria_id": "cat9"},
+    {"id": "m2", "nome": "Reserva"},
+]
+
+
+def _registros():
+    itens = [
+        {"id": "a", "tipo": "despesa", "valor": 100.0, "data_efetiva": "2026-01-05", "categoria_id": "cat9"},
+        {"id": "b", "tipo": "despesa", "valor": 50.0, "data_efetiva": "2026-02-05", "categoria_id": "cat9"},
+        {"id": "c", "tipo": "receita", "valor": 30.0, "data_efetiva": "2026-02-20", "categoria_id": "cat9"},
+        {"id": "d", "tipo": "despesa", "valor": 20.0, "data_prevista": "2026-03-01", "categoria_id": "cat9"},
+        # meta_id explícito tem prioridade sobre a categoria
+        {"id": "e", "tipo": "despesa", "valor": 0.3, "data_efetiva": "2026-01-10", "categoria_id": "cat9", "meta_id": "m2"},
+        {"id": "f", "tipo": "despesa", "valor": 10.0, "data_efetiva": "2026-01-10", "categoria_id": "cat9", "excluido": True},
+    ]
+    return tuple(Transacao.from_dict(x) for x in itens)
+
+
+def test_acumulado_e_aportes():
+    p = ProgressoMetas(METAS, _registros())
+    assert p.acumulado("m1") == 120.0
+    assert p.aportes_mensais("m1") == {"2026-01": 100.0, "2026-02": 20.0}
+    assert p.acumulado("m2") == 0.3
+    assert p.vinculada(METAS[0]) and p.vinculada(METAS[1])
+    assert not p.vinculada({"id": "m3"})
+    assert p.acumulado("m3") == 0
+
+
+def test_aplicar_igual_a_reconstrucao():
+    regs = _registros()
+    store = TransactionStore.from_records(regs)
+    p = ProgressoMetas(METAS, regs).conectar(store)
+
+    store.baixar("d")
+    store.estornar("a")
+    store.excluir("e")
+    store.criar({"id": "g", "tipo": "despesa", "valor": 5.0, "data_efetiva": "2026-04-01", "meta_id": "m2"})
+
+    novo = ProgressoMetas(METAS, store)
+    for mid in ("m1", "m2"):
+        assert p.acumulado(mid) == novo.acumulado(mid)
+        assert p.aportes_mensais(mid) == novo.aportes_mensais(mid)
+    assert "2026-01" not in p.aportes_mensais("m1")
+
+
+def test_categoria_duplicada_vale_a_primeira(caplog):
+    metas = METAS + [{"id": "m3", "nome": "Outra", "categoria_id": "cat9"}]
+    with caplog.at_level(logging.WARNING, logger="financeiro"):
+        p = ProgressoMetas(metas, _registros())
+    assert p.acumulado("m1") == 120.0
+    assert p.acumulado("m3") == 0
+    assert "cat9" in caplog.text
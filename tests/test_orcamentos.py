@@ -0,0 +1,63 @@
+from services.finance_queries import cubo_kpis, preparar_transacoes_df
+from services.orcamentos import agregar, alertas, consumo_orcamentos
+
+ORCAMENTOS = [
+    {"id": "o1", "categoria_id": "cat2", "limite_mensal": 100.0},
+    {"id": "o2", "categoria_id": "cat3", "limite_mensal": 50.0},
+    {"id": "o3", "categoria_id": "cat5", "limite_mensal": 10.0, "ativo": False},
+    {"id": "o4", "categoria_id": "cat4", "limite_mensal": 0},
+]
+
+
+def _cubo():
+    df = preparar_transacoes_df([
+        {"id": "a", "tipo": "despesa", "valor": 85.0, "data_efetiva": "2026-01-05", "categoria_id": "cat2"},
+        {"id": "b", "tipo": "despesa", "valor": 20.0, "data_prevista": "2026-01-25", "categoria_id": "cat2"},
+        {"id": "c", "tipo": "despesa", "valor": 60.0, "data_efetiva": "2026-01-07", "categoria_id": "cat3"},
+        {"id": "d", "tipo": "receita", "valor": 999.0, "data_efetiva": "2026-01-07", "categoria_id": "cat3"},
+        {"id": "e", "tipo": "despesa", "valor": 10.0, "data_efetiva": "2026-02-07", "categoria_id": "cat2"},
+    ])
+    return cubo_kpis(df, por_categoria=True)
+
+
+def _linha(consumo, comp, oid):
+    return consumo[(consumo["competencia"] == comp) & (consumo["orcamento_id"] == oid)].iloc[0]
+
+
+def test_consumo_por_competencia():
+    c = consumo_orcamentos(_cubo(), ORCAMENTOS, ["2026-02", "2026-01", "2026-01"])
+    # Só ativos; uma linha por (competência, orçamento)
+    assert len(c) == 6
+    assert set(c["orcamento_id"]) == {"o1", "o2", "o4"}
+
+    o1 = _linha(c, "2026-01", "o1")
+    assert (o1["gasto"], o1["previsto"], o1["comprometido"], o1["restante"]) == (85.0, 20.0, 105.0, -5.0)
+    assert o1["nivel"] == "atencao"
+    assert _linha(c, "2026-01", "o2")["nivel"] == "estourado"
+    assert _linha(c, "2026-02", "o2")["gasto"] == 0.0
+    assert _linha(c, "2026-02", "o1")["nivel"] == "ok"
+    # Limite zero não divide por zero
+    assert _linha(c, "2026-01", "o4")["pct"] == 0.0
+
+
+def test_inativos_e_vazios():
+    c = consumo_orcamentos(_cubo(), ORCAMENTOS, ["2026-01"], apenas_ativos=False)
+    assert "o3" in set(c["orcamento_id"])
+    assert consumo_orcamentos(_cubo(), [], ["2026-01"]).empty
+    assert consumo_orcamentos(_cubo(), ORCAMENTOS, []).empty
+    vazio = consumo_orcamentos(cubo_kpis(preparar_transacoes_df([]), por_categoria=True), ORCAMENTOS, ["2026-01"])
+    assert vazio["gasto"].eq(0).all()
+
+
+def test_alertas_do_mais_grave_ao_menos_grave():
+    c = consumo_orcamentos(_cubo(), ORCAMENTOS, ["2026-01"])
+    a = alertas(c)
+    assert list(a["orcamento_id"]) == ["o2", "o1"]
+
+
+def test_agregar_soma_limites_dos_meses():
+    c = consumo_orcamentos(_cubo(), ORCAMENTOS, ["2026-01", "2026-02"])
+    total = agregar(c)
+    o1 = total[total["orcamento_id"] == "o1"].iloc[0]
+    assert o1["competencia"] == "2026-01 → 2026-02"
+    assert (o1["limite"], o1["gasto"], o1["previsto"]) == (200.0, 95.0, 20.0)
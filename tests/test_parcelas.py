@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from services.dinheiro import centavos
+from services.finance_core import _AlocadorIds, gerar_parcelas, novos_ids
+
+
+def _base(**kw):
+    item = {
+        "id": "base", "tipo": "despesa", "descricao": "TV", "valor": 10.0,
+        "data_prevista": "2026-01-31", "data_efetiva": "2026-01-31", "conta_id": "c1", "codigo": 40,
+    }
+    item.update(kw)
+    return item
+
+
+def test_datas_codigos_e_grupo():
+    ps = gerar_parcelas(_base(), 3)
+    assert [p["data_prevista"] for p in ps] == ["2026-01-31", "2026-02-28", "2026-03-31"]
+    assert [p["codigo"] for p in ps] == [40, 41, 42]
+    assert [p["parcelamento"]["parcela"] for p in ps] == [1, 2, 3]
+    assert len({p["parcelamento"]["grupo_id"] for p in ps}) == 1
+    assert all(p["data_efetiva"] is None and p["descricao"] == "TV" for p in ps)
+    assert len({p["id"] for p in ps}) == 3
+
+
+def _valores(total, n):
+    return [p["valor"] for p in gerar_parcelas(_base(valor=total), n)]
+
+
+def test_resto_na_ultima_parcela():
+    assert _valores(10.0, 3) == [3.33, 3.33, 3.34]
+    vs = _valores(1000.0, 600)
+    assert vs[:-1] == [1.66] * 599
+    assert vs[-1] == 5.66
+    assert sum(centavos(v) for v in vs) == 100000
+
+
+def test_ultima_parcela_nunca_negativa():
+    assert _valores(9.0, 3) == [3.0, 3.0, 3.0]
+    assert _valores(0.02, 3) == [0.0, 0.0, 0.02]
+    for total in (0.05, 1.0, 99.99, 1000.0):
+        for n in (2, 7, 600):
+            vs = _valores(total, n)
+            assert min(vs) >= 0 and len(set(vs[:-1])) == 1
+            assert sum(centavos(v) for v in vs) == centavos(total)
+
+
+def test_intervalo_em_dias_e_sem_codigo():
+    ps = gerar_parcelas(_base(codigo=None, parcelamento={"grupo_id": "g1"}), 2, intervalo_dias=15)
+    assert [p["data_prevista"] for p in ps] == ["2026-01-31", "2026-02-15"]
+    assert all(p["codigo"] is None for p in ps)
+    assert {p["parcelamento"]["grupo_id"] for p in ps} == {"g1"}
+
+
+def test_qtd_invalida():
+    with pytest.raises(ValueError):
+        gerar_parcelas(_base(), 0)
+
+
+def test_ids_monotonicos_e_unicos():
+    ids = novos_ids("tx", 500)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 500
+    assert all(i.startswith("tx-") for i in ids)
+
+
+def test_alocador_sem_colisao_entre_threads():
+    alocador = _AlocadorIds()
+    out: list[str] = []
+
+    def gerar():
+        for _ in range(200):
+            out.extend(alocador.proximos("tx", 3))
+
+    ts = [threading.Thread(target=gerar) for _ in range(4)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert len(out) == len(set(out)) == 2400
@@ -0,0 +1,64 @@
+from datetime import date
+
+import pandas as pd
+
+from services.finance_queries import preparar_transacoes_df
+from services.projecao import horizonte, mensal, projetar, resumo_projecao
+
+HOJE = date(2026, 1, 15)
+
+
+def _df():
+    return preparar_transacoes_df([
+        # Vencida e não paga: entra no primeiro dia
+        {"id": "v", "tipo": "despesa", "valor": 30.0, "data_prevista": "2026-01-10", "conta_id": "c1"},
+        {"id": "a", "tipo": "despesa", "valor": 100.0, "data_prevista": "2026-01-20", "conta_id": "c1"},
+        {"id": "r", "tipo": "receita", "valor": 50.0, "data_prevista": "2026-02-01", "conta_id": "c2"},
+        # Já paga: está no saldo atual, não na projeção
+        {"id": "p", "tipo": "despesa", "valor": 999.0, "data_prevista": "2026-01-20",
+         "data_efetiva": "2026-01-14", "conta_id": "c1"},
+        # Conta desconhecida e fora do horizonte: ignoradas
+        {"id": "o", "tipo": "despesa", "valor": 7.0, "data_prevista": "2026-01-20", "conta_id": "c9"},
+        {"id": "f", "tipo": "despesa", "valor": 7.0, "data_prevista": "2026-06-01", "conta_id": "c1"},
+    ])
+
+
+def test_horizonte():
+    assert horizonte(date(2026, 1, 31), 1) == (date(2026, 1, 31), date(2026, 2, 28))
+
+
+def test_projetar_por_conta():
+    ini, fim = horizonte(HOJE, 1)
+    diario = projetar(_df(), {"c1": 10000, "c2": 0}, ini, fim)
+    assert list(diario.columns) == ["c1", "c2"]
+    assert len(diario) == 32
+    c1, c2 = diario["c1"], diario["c2"]
+    assert c1[pd.Timestamp("2026-01-15")] == 70.0
+    assert c1[pd.Timestamp("2026-01-19")] == 70.0
+    assert c1[pd.Timestamp("2026-01-20")] == -30.0
+    assert c2[pd.Timestamp("2026-01-31")] == 0.0
+    assert c2.iloc[-1] == 50.0
+
+
+def test_sem_vencidas_e_sem_movimento():
+    ini, fim = horizonte(HOJE, 1)
+    diario = projetar(_df(), {"c1": 10000}, ini, fim, incluir_vencidas=False)
+    assert diario["c1"].iloc[0] == 100.0
+    assert diario["c1"].iloc[-1] == 0.0
+
+    vazio = projetar(preparar_transacoes_df([]), {"c1": 500}, ini, fim)
+    assert (vazio["c1"] == 5.0).all()
+
+
+def test_mensal_e_resumo():
+    ini, fim = horizonte(HOJE, 1)
+    diario = projetar(_df(), {"c1": 10000, "c2": 0}, ini, fim)
+    assert mensal(diario)["c1"].tolist() == [-30.0, -30.0]
+
+    r = resumo_projecao(diario.sum(axis=1))
+    assert r["final"] == 20.0
+    assert r["minimo"] == -30.0
+    assert r["data_minimo"] == date(2026, 1, 20)
+    assert r["primeiro_negativo"] == date(2026, 1, 20)
+
+    assert resumo_projecao(pd.Series(dtype=float))["primeiro_negativo"] is None
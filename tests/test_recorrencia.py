@@ -0,0 +1,60 @@
+from datetime import date
+
+from services.recorrencia import datas, expandir, materializar, ocorrencia, regra
+
+
+def _modelo(**kw):
+    tx = {
+        "id": "alug", "tipo": "despesa", "descricao": "Aluguel", "valor": 1500.0,
+        "data_prevista": "2026-01-31", "recorrente": True, "codigo": 7,
+    }
+    tx.update(kw)
+    return tx
+
+
+def test_regra_defaults():
+    r = regra(_modelo())
+    assert r == {"base": date(2026, 1, 31), "dia": 31, "intervalo_meses": 1, "ate": None}
+
+
+def test_regra_invalida_ou_malformada():
+    assert regra(_modelo(recorrente=False)) is None
+    assert regra(_modelo(excluido=True)) is None
+    assert regra(_modelo(data_prevista="sem data")) is None
+    assert regra(_modelo(recorrencia="mensal")) is None
+    assert regra(_modelo(recorrencia={"dia": "abc"})) is None
+    assert regra(_modelo(recorrencia={"intervalo_meses": "x"})) is None
+    assert regra(_modelo(recorrencia={"dia": 40})) is None
+    # `ate` inválido vira série sem fim
+    assert regra(_modelo(recorrencia={"ate": "31/12"}))["ate"] is None
+
+
+def test_dia_31_cai_no_ultimo_dia_do_mes():
+    ds = list(datas(_modelo(), date(2026, 1, 1), date(2026, 5, 31)))
+    assert ds == [date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30), date(2026, 5, 31)]
+    bissexto = list(datas(_modelo(data_prevista="2028-01-31"), date(2028, 2, 1), date(2028, 2, 29)))
+    assert bissexto == [date(2028, 2, 29)]
+
+
+def test_intervalo_ate_e_janela_distante():
+    tx = _modelo(data_prevista="2026-01-10", recorrencia={"intervalo_meses": 3, "ate": "2027-01-10"})
+    assert list(datas(tx, date(2026, 1, 1), date(2030, 1, 1))) == [
+        date(2026, 4, 10), date(2026, 7, 10), date(2026, 10, 10), date(2027, 1, 10),
+    ]
+    # Janela muito à frente: começa direto no mês certo
+    mensal = _modelo(data_prevista="2026-01-10")
+    assert list(datas(mensal, date(2126, 3, 1), date(2126, 3, 31))) == [date(2126, 3, 10)]
+
+
+def test_ocorrencia_e_materializadas():
+    tx = _modelo()
+    oc = ocorrencia(tx, date(2026, 2, 28))
+    assert oc["id"] == "alug@2026-02-28"
+    assert oc["virtual"] and not oc["recorrente"] and "codigo" not in oc
+    assert oc["recorrencia_origem"] == {"id": "alug", "data": "2026-02-28"}
+
+    real = materializar(oc, "tx-1", codigo=9)
+    assert "virtual" not in real and real["id"] == "tx-1" and real["codigo"] == 9
+
+    virtuais = expandir([tx, real], date(2026, 2, 1), date(2026, 3, 31))
+    assert [v["data_prevista"] for v in virtuais] == ["2026-03-31"]
@@ -0,0 +1,110 @@
+from services.finance_core import TransactionStore, gerar_parcelas
+from services.finance_queries import cubo_kpis, kpis_de_somas, preparar_transacoes_df, somas_cubo
+from services.resumos import Resumos, chave
+from services.schemas import Transacao
+
+
+def _registros():
+    itens = [
+        {"id": "s1", "tipo": "receita", "valor": 5000.0, "data_efetiva": "2026-01-05", "categoria_id": "cat6"},
+        {"id": "m1", "tipo": "despesa", "valor": 129.9, "data_prevista": "2026-01-10", "categoria_id": "cat2"},
+        {"id": "m2", "tipo": "despesa", "valor": 0.1, "data_prevista": "2026-01-12", "data_efetiva": "2026-02-01", "categoria_id": "cat2"},
+        {"id": "x", "tipo": "despesa", "valor": 10.0, "data_prevista": "2026-01-10", "excluido": True},
+        {"id": "t", "tipo": "transferencia", "valor": 10.0, "data_prevista": "2026-01-10"},
+        {"id": "z", "tipo": "despesa", "valor": 0, "data_prevista": "2026-01-10"},
+        {"id": "sc", "tipo": " Despesa ", "valor": 50.0, "data_prevista": "2026-01-20"},
+    ]
+    return tuple(Transacao.from_dict(x) for x in itens)
+
+
+def test_chave():
+    assert chave(None) is None
+    assert chave({"tipo": "despesa", "valor": 1.0}) is None
+    assert chave({"tipo": "despesa", "valor": 1.0, "data_prevista": "2026-01-31"}) == (
+        "2026-01", "despesa", "previsto", "—", 100,
+    )
+
+
+def test_construir_e_totais():
+    r = Resumos.construir(_registros(), "sha1")
+    assert r.competencias() == ["2026-01", "2026-02"]
+    assert r.totais("2026-01") == {
+        "rec_real": 5000.0, "des_real": 0.0, "rec_prev": 0.0, "des_prev": 179.9,
+        "saldo_real": 5000.0, "saldo_prev": -179.9,
+    }
+    assert r.por_categoria("2026-01") == {"cat2": 129.9, "—": 50.0}
+    assert r.por_categoria("2026-02", estado="realizado") == {"cat2": 0.1}
+    assert list(r.historico().index) == ["2026-01", "2026-02"]
+    assert list(r.historico(ultimas=1).index) == ["2026-02"]
+
+
+def test_somas_em_centavos_iguais_ao_cubo():
+    regs = _registros()
+    r = Resumos.construir(regs)
+    cubo = cubo_kpis(preparar_transacoes_df([x.to_dict() for x in regs]))
+    for comp in ("2026-01", "2026-02", "2026-03"):
+        cubo_somas = somas_cubo(cubo, comp)
+        assert {k: v for k, v in r.somas(comp).items() if v} == {k: v for k, v in cubo_somas.items() if v}
+
+    # Somar em centavos e converter uma vez: 0,10 + 0,20 = 0,30 exato
+    virtuais = cubo_kpis(preparar_transacoes_df([
+        {"id": "v", "tipo": "despesa", "valor": 0.2, "data_efetiva": "2026-02-03"},
+    ]))
+    somas = r.somas("2026-02")
+    for k, v in somas_cubo(virtuais, "2026-02").items():
+        somas[k] = somas.get(k, 0) + v
+    assert kpis_de_somas(somas)["des_real"] == 0.3
+
+
+def test_historico_ignora_parcelas_futuras():
+    base = {"id": "p", "tipo": "despesa", "valor": 2400.0, "data_prevista": "2026-01-10"}
+    passado = {"id": "s", "tipo": "receita", "valor": 100.0, "data_efetiva": "2025-12-05"}
+    parcelas = gerar_parcelas(base, 24)
+    r = Resumos.construir([Transacao.from_dict(x) for x in [passado, *parcelas]])
+    assert r.competencias()[-1] == "2027-12"
+
+    h = r.historico(ultimas=12, ate="2026-01")
+    assert list(h.index) == ["2025-12", "2026-01"]
+    assert h.loc["2025-12", "rec_real"] == 100.0
+    assert list(r.historico(ultimas=3, ate="2026-06").index) == ["2026-04", "2026-05", "2026-06"]
+
+
+def test_carregar_usa_o_arquivo_so_no_mesmo_sha():
+    regs = _registros()
+    conteudo = Resumos.construir(regs).to_dict("sha1")
+    assert conteudo["sha_transacoes"] == "sha1"
+
+    # Arquivo do mesmo sha é usado como está (sem reler as transações)
+    r = Resumos.carregar(conteudo, "sha1", ())
+    assert r.verificar(regs) == []
+
+    r = Resumos.carregar(conteudo, "sha2", regs[:1])
+    assert r.sha_transacoes == "sha2"
+    assert r.competencias() == ["2026-01"]
+
+    assert Resumos({"versao": 99, "competencias": {"2026-01": {}}}).competencias() == []
+
+
+def test_verificar_sem_deriva_apos_escritas():
+    regs = _registros()
+    store = TransactionStore.from_records(regs)
+    r = Resumos.construir(regs, "sha1").conectar(store)
+
+    store.baixar("m1")
+    store.estornar("s1")
+    store.reagendar("sc", "2026-03-01")
+    store.excluir("m2")
+    store.criar({"id": "n", "tipo": "receita", "valor": 1.0, "data_prevista": "2026-03-02", "categoria_id": "cat7"})
+
+    assert r.verificar(store) == []
+    assert "2026-02" not in r.to_dict()["competencias"]
+
+
+def test_verificar_aponta_deriva():
+    regs = _registros()
+    r = Resumos.construir(regs[:1])
+    diff = r.verificar(regs[:2])
+    assert diff == [{
+        "competencia": "2026-01", "tipo": "despesa", "estado": "previsto", "categoria_id": "cat2",
+        "gravado": 0.0, "esperado": 129.9,
+    }]
@@ -0,0 +1,141 @@
+from datetime import date
+
+import pandas as pd
+
+from services.finance_core import TransactionStore, saldo_atual
+from services.finance_queries import preparar_transacoes_df, saldos_iniciais, serie_saldo
+from services.saldos import SaldosContas, SaldosDiarios, contribuicao
+from services.schemas import Transacao
+
+CONTAS = [
+    {"id": "c1", "nome": "Corrente", "saldo_inicial": 100.10},
+    {"id": "c2", "nome": "Poupança", "saldo_inicial": 0.0},
+]
+
+
+def _registros():
+    itens = [
+        {"id": "r1", "tipo": "receita", "valor": 0.1, "data_efetiva": "2026-01-01", "conta_id": "c1"},
+        {"id": "r2", "tipo": "receita", "valor": 0.2, "data_efetiva": "2026-01-02", "conta_id": "c1"},
+        {"id": "d1", "tipo": "despesa", "valor": 50.0, "data_prevista": "2026-01-03", "conta_id": "c1"},
+        {"id": "d2", "tipo": "despesa", "valor": 20.0, "data_efetiva": "2026-01-04", "conta_id": "c2"},
+        {"id": "x1", "tipo": "receita", "valor": 99.0, "data_efetiva": "2026-01-05", "conta_id": "c1", "excluido": True},
+        {"id": "o1", "tipo": "receita", "valor": 7.0, "data_efetiva": "2026-01-06", "conta_id": "c9"},
+    ]
+    return tuple(Transacao.from_dict(x) for x in itens)
+
+
+def test_contribuicao():
+    assert contribuicao(None) == 0
+    assert contribuicao({"tipo": "receita", "valor": 1.5}) == 0
+    assert contribuicao({"tipo": "receita", "valor": 1.5, "data_efetiva": "2026-01-01"}) == 150
+    assert contribuicao({"tipo": "despesa", "valor": 1.5, "data_efetiva": "2026-01-01"}) == -150
+
+
+def test_mesma_regra_de_saldo_atual():
+    regs = _registros()
+    s = SaldosContas(CONTAS, regs)
+    for c in CONTAS:
+        assert s.saldo(c["id"]) == round(saldo_atual(c, list(regs)), 2)
+    # Centavos inteiros: 100,10 + 0,10 + 0,20 sem deriva de float
+    assert s.centavos_por_conta() == {"c1": 10040, "c2": -2000}
+    assert s.total_centavos() == 8040
+    assert s.total() == 80.40
+    assert s.saldo("c9") == 0
+
+
+def test_aplicar_igual_a_reconstrucao():
+    regs = _registros()
+    store = TransactionStore.from_records(regs)
+    s = SaldosContas(CONTAS, regs).conectar(store)
+
+    store.baixar("d1")
+    store.estornar("r2")
+    store.excluir("d2")
+    store.criar({"id": "n1", "tipo": "receita", "valor": 12.34, "data_efetiva": "2026-02-01", "conta_id": "c2"})
+    novo = store.get("r1").to_dict()
+    novo["conta_id"] = "c2"
+    store.atualizar(novo)
+
+    reconstruido = SaldosContas(CONTAS, store)
+    assert s.centavos_por_conta() == reconstruido.centavos_por_conta()
+    assert s.total_centavos() == reconstruido.total_centavos()
+
+
+# ---------------------------------------------------------
+# SaldosDiarios
+# ---------------------------------------------------------
+INICIO, FIM = date(2025, 12, 25), date(2026, 2, 10)
+
+
+def _estado(s: SaldosDiarios):
+    return {
+        conta: s.serie(conta, INICIO, FIM).tolist()
+        for conta in ("c1", "c2", None)
+    }
+
+
+def test_saldo_em_datas():
+    s = SaldosDiarios(CONTAS, _registros())
+    assert s.saldo_em("c1", date(2025, 12, 31)) == 100.10
+    assert s.saldo_em("c1", date(2026, 1, 1)) == 100.20
+    assert s.saldo_em("c1", date(2026, 1, 3)) == 100.40
+    assert s.saldo_em("c2", date(2026, 1, 4)) == -20.0
+    assert s.saldo_total_em(date(2026, 12, 31)) == SaldosContas(CONTAS, _registros()).total()
+    assert s.saldo_em("c9", date(2026, 1, 6)) == 0
+
+
+def test_serie_igual_a_serie_saldo():
+    regs = _registros()
+    serie = SaldosDiarios(CONTAS, regs).serie(None, INICIO, FIM)
+    assert serie.dtype == "float64"
+    assert isinstance(serie.index, pd.DatetimeIndex)
+    esperado = serie_saldo(
+        preparar_transacoes_df([r.to_dict() for r in regs]), INICIO, FIM, iniciais=saldos_iniciais(CONTAS)
+    )
+    pd.testing.assert_series_equal(serie, esperado, check_freq=False, check_index_type=False)
+
+
+def test_diarios_aplicar_igual_a_reconstrucao():
+    regs = _registros()
+    store = TransactionStore.from_records(regs)
+    s = SaldosDiarios(CONTAS, regs).conectar(store)
+
+    store.baixar("d1")
+    store.estornar("r2")
+    store.excluir("d2")
+    store.criar({"id": "n1", "tipo": "receita", "valor": 12.34, "data_efetiva": "2025-12-30", "conta_id": "c2"})
+    store.criar({"id": "n2", "tipo": "despesa", "valor": 1.0, "data_efetiva": "2026-01-01", "conta_id": "c1"})
+    novo = store.get("r1").to_dict()
+    novo["conta_id"] = "c2"
+    novo["data_efetiva"] = "2026-02-01"
+    store.atualizar(novo)
+
+    assert _estado(s) == _estado(SaldosDiarios(CONTAS, store))
+
+
+def test_copia_nao_altera_o_original():
+    regs = _registros()
+    original = SaldosDiarios(CONTAS, regs)
+    c = original.copia()
+    c.aplicar(regs[0], None)
+    assert original.saldo_em("c1", FIM) == 100.40
+    assert c.saldo_em("c1", FIM) == 100.30
+
+
+def test_serie_saldo_janela_sem_movimento():
+    vazio = preparar_transacoes_df([])
+    iniciais = saldos_iniciais(CONTAS)
+
+    serie = serie_saldo(vazio, INICIO, FIM, iniciais=iniciais)
+    assert serie.dtype == "float64"
+    assert isinstance(serie.index, pd.DatetimeIndex)
+    assert (serie == 100.10).all()
+
+    por_conta = serie_saldo(vazio, INICIO, FIM, por_conta=True, iniciais=iniciais)
+    assert (por_conta.dtypes == "float64").all()
+    assert isinstance(por_conta.index, pd.DatetimeIndex)
+
+    semanal = serie_saldo(vazio, INICIO, FIM, freq="W", iniciais=iniciais)
+    assert semanal.dtype == "float64"
+    assert serie_saldo(vazio, INICIO, FIM).dtype == "float64"
@@ -0,0 +1,85 @@
+from datetime import date
+
+import pytest
+import streamlit as st
+
+from services import snapshot
+from services.finance_core import TransactionStore
+from services.resumos import Resumos
+from services.saldos import SaldosContas, SaldosDiarios
+
+
+@pytest.fixture(autouse=True)
+def limpar():
+    st.cache_resource.clear()
+    snapshot._SEMENTES.clear()
+    yield
+    st.cache_resource.clear()
+    snapshot._SEMENTES.clear()
+
+
+def _data(itens):
+    return {
+        "data/transacoes.json": {"content": itens, "sha": "t1"},
+        "data/contas.json": {"content": [{"id": "c1", "saldo_inicial": 10.0}], "sha": "c1"},
+        "data/resumos.json": {"content": {}, "sha": "r1"},
+        "data/metas.json": {"content": [], "sha": "m1"},
+    }
+
+
+ITENS = [
+    {"id": "a", "tipo": "despesa", "valor": 3.0, "data_prevista": "2026-01-10", "conta_id": "c1"},
+    {"id": "b", "tipo": "receita", "valor": 5.0, "data_prevista": "2026-01-12", "conta_id": "c1"},
+]
+
+
+def test_colher_exige_a_chave_exata():
+    s = SaldosContas([], [])
+    snapshot._SEMENTES["saldos_contas"] = (("t2", "c1"), s)
+    assert snapshot._colher("saldos_contas", "t2", "outro") is None
+    assert snapshot._colher("saldos_contas", "t2", "c1") is s
+    assert snapshot._colher("saldos_contas", "t2", "c1") is None
+
+
+def test_sem_escrita_nada_e_copiado():
+    data = _data(ITENS)
+    regs = snapshot.transacoes_tipadas("t1", ITENS)
+    derivados = snapshot.seguir_escritas(TransactionStore.from_records(regs), data, regs)
+    assert derivados["saldos_contas"] is snapshot.saldos_contas("t1", "c1", regs, data["data/contas.json"]["content"])
+    derivados.semear("t2")
+    assert snapshot._SEMENTES == {}
+
+
+def test_semente_vira_o_snapshot_do_novo_sha():
+    data = _data(ITENS)
+    contas = data["data/contas.json"]["content"]
+    regs = snapshot.transacoes_tipadas("t1", ITENS)
+    store = TransactionStore.from_records(regs)
+    derivados = snapshot.seguir_escritas(store, data, regs)
+    do_cache = snapshot.saldos_contas("t1", "c1", regs, contas)
+
+    store.baixar("a")
+    store.baixar("b")
+    atual = derivados["saldos_contas"]
+    assert atual is not do_cache
+    # O objeto do cache (compartilhado entre sessões) não é alterado
+    assert do_cache.total_centavos() == 1000
+    assert atual.total_centavos() == 1200
+
+    derivados.semear("t2")
+    novos = snapshot.transacoes_tipadas("t2", store.to_list())
+    assert snapshot.saldos_contas("t2", "c1", novos, contas) is atual
+    assert atual.centavos_por_conta() == SaldosContas(contas, novos).centavos_por_conta()
+
+    diarios = snapshot.saldos_diarios("t2", "c1", novos, contas)
+    assert diarios is derivados["saldos_diarios"]
+    # baixar() data a efetivação no dia de hoje
+    hoje = date.today()
+    assert diarios.saldo_em("c1", hoje) == SaldosDiarios(contas, novos).saldo_em("c1", hoje) == 12.0
+
+    # resumos.json foi regravado junto: outro sha de arquivo, mesma semente
+    resumos = snapshot.resumos_snapshot("t2", "r2", {}, novos)
+    assert resumos is derivados["resumos"]
+    assert resumos.sha_transacoes == "t2"
+    assert resumos.verificar(novos) == []
+    assert resumos.to_dict()["competencias"] == Resumos.construir(novos).to_dict()["competencias"]
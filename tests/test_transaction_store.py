@@ -0,0 +1,77 @@
+from services.finance_core import TransactionStore
+from services.schemas import Transacao
+
+
+def _itens():
+    return [
+        {"id": "t1", "tipo": "despesa", "descricao": "Mercado", "valor": 100.0,
+         "data_prevista": "2026-01-10", "conta_id": "c1", "codigo": 1},
+        {"id": "t2", "tipo": "receita", "descricao": "Salário", "valor": 5000.0,
+         "data_prevista": "2026-01-05", "data_efetiva": "2026-01-05", "conta_id": "c1", "codigo": 2},
+    ]
+
+
+def test_indices_por_id_e_codigo():
+    store = TransactionStore.from_list(_itens() + ["lixo", None])
+    assert len(store) == 2
+    assert store.get("t2").descricao == "Salário"
+    assert store.por_codigo(1).id == "t1"
+    assert store.proximo_codigo() == 3
+    assert store.get("nao-existe") is None
+
+
+def test_to_list_preserva_ordem_das_chaves():
+    item = {"valor": 10.0, "id": "x", "descricao": "A", "extra": 1, "tipo": "receita"}
+    out = TransactionStore.from_list([item]).to_list()[0]
+    assert list(out)[:5] == ["valor", "id", "descricao", "extra", "tipo"]
+    assert out["extra"] == 1
+    assert "codigo" not in out
+
+
+def test_to_dict_de_registro_construido_direto():
+    out = Transacao(id="x", valor=1.0).to_dict()
+    assert out["id"] == "x"
+    assert {"tipo", "descricao", "data_prevista", "excluido"} <= set(out)
+
+
+def test_from_records_copia_na_primeira_escrita():
+    registros = tuple(Transacao.from_dict(x) for x in _itens())
+    a = TransactionStore.from_records(registros)
+    b = TransactionStore.from_records(registros)
+
+    assert a.baixar("t1")
+    assert a.get("t1").data_efetiva
+    assert a.get("t1") is not registros[0]
+    # Registro compartilhado e o outro store continuam intactos
+    assert registros[0].data_efetiva is None
+    assert b.get("t1") is registros[0]
+    # Registro não alterado continua compartilhado
+    assert a.get("t2") is registros[1]
+
+
+def test_observadores_recebem_antes_e_depois():
+    store = TransactionStore.from_records(tuple(Transacao.from_dict(x) for x in _itens()))
+    eventos = []
+    store.observar(lambda antes, depois: eventos.append((antes, depois)))
+
+    store.baixar("t1")
+    antes, depois = eventos[-1]
+    assert antes.data_efetiva is None and depois.data_efetiva
+    assert depois is store.get("t1")
+
+    store.criar({"id": "t3", "tipo": "despesa", "valor": 1.0, "data_prevista": "2026-02-01"})
+    assert eventos[-1][0] is None and eventos[-1][1].id == "t3"
+
+    assert store.excluir("t2")
+    assert not store.excluir("t2")
+    assert eventos[-1][1].excluido and len(eventos) == 3
+
+
+def test_atualizar_reindexa_codigo():
+    store = TransactionStore.from_list(_itens())
+    novo = store.get("t1").to_dict()
+    novo["codigo"] = 9
+    assert store.atualizar(novo)
+    assert store.por_codigo(9).id == "t1"
+    assert store.por_codigo(1) is None
+    assert store.get("t1").get("atualizado_em")